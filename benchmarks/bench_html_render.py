@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+HTML 渲染基准测试
+用合成的分析结果渲染日报页和索引页（与生产相同的路径：关键 CSS 提取、逐段渲染、流式压缩和写入），
+输出不同条目数下的总耗时和每条耗时，每条耗时基本不变即说明渲染时间随条目数线性增长
+
+    python benchmarks/bench_html_render.py
+    python benchmarks/bench_html_render.py --items 1000 5000 20000 --repeat 5
+"""
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.html_generator import HTMLGenerator
+from benchmarks.synthetic import synthetic_result
+
+# 条目平均分布到的分类数
+CATEGORY_COUNT = 10
+
+
+def best_of(func, repeat: int) -> float:
+    """多次运行取最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML 渲染基准测试")
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 5000, 20000], help="条目数")
+    parser.add_argument("--repeat", type=int, default=3, help="每组重复次数")
+    args = parser.parse_args()
+
+    output_dir = Path(tempfile.mkdtemp())
+    generator = HTMLGenerator(str(output_dir))
+    print("\n📊 HTML 渲染基准（取多次运行的最短耗时）")
+    print(f"{'条目数':>8}{'日报页':>12}{'每条':>10}{'索引页':>12}{'每条':>10}{'页面大小':>12}")
+    for count in args.items:
+        per_category = max(1, count // CATEGORY_COUNT)
+        count = per_category * CATEGORY_COUNT
+        result = synthetic_result(CATEGORY_COUNT, per_category)
+        entries = [
+            {"date": "2026-01-13", "url": f"{i}.html", "summary": f"第 {i} 天的摘要 <b>&</b>"}
+            for i in range(count)
+        ]
+        daily = best_of(lambda: generator.write_daily_page(result), args.repeat)
+        index = best_of(lambda: generator._render_index_page(
+            output_dir / "index.html", root="", title="AI Daily", heading="📅 资讯归档", entries=entries
+        ), args.repeat)
+        size = (output_dir / f"{result['date']}.html").stat().st_size
+        print(f"{count:>8}{daily * 1000:>10.1f}ms{daily / count * 1e6:>8.1f}µs"
+              f"{index * 1000:>10.1f}ms{index / count * 1e6:>8.1f}µs{size / 1024:>10.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
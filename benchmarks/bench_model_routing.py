@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+模型分级路由基准测试
+对比「全部使用大模型」与「按阶段分级路由」两种策略的延迟、token 和估算费用
+
+    python benchmarks/bench_model_routing.py                 # 本地模拟 API（按模型模拟延迟）
+    python benchmarks/bench_model_routing.py --entries 60 --time-scale 0.2
+    python benchmarks/bench_model_routing.py --live          # 使用 .env 中配置的真实端点
+"""
+import io
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.claude_analyzer import ClaudeAnalyzer
+from src.analysis_cache import AnalysisCache
+from src.model_router import ModelRouter
+from src.rate_limiter import RateLimiter
+from src.telemetry import LLMLedger, summarize
+from benchmarks.mock_api import MockAnthropicServer
+
+SINGLE_MODEL_POLICY = "*=large"
+# 默认对比的分级策略（MODEL_ROUTING 默认不启用快速模型）
+TIERED_POLICY = "entries=fast,*=large"
+
+_TOPICS = [
+    ("Anthropic releases new Claude model with longer context", "model"),
+    ("OpenAI launches ChatGPT feature for enterprise users", "product"),
+    ("New paper on reasoning benchmarks from DeepMind researchers", "research"),
+    ("Show HN: open source CLI agent framework written in Rust", "tools"),
+    ("AI startup raises $200M Series C at $2B valuation", "funding"),
+    ("EU regulators open investigation into AI copyright policy", "events"),
+]
+
+
+def synthetic_content(count: int, date: str = "2026-01-13") -> dict:
+    """生成 count 条合成资讯的多源内容"""
+    entries = []
+    for i in range(count):
+        title, _ = _TOPICS[i % len(_TOPICS)]
+        entries.append({
+            "title": f"{title} (#{i})",
+            "link": f"https://example.com/news/{i}",
+            "summary": f"{title}. " * 8,
+            "source": "benchmark"
+        })
+    return {
+        "title": f"AI 资讯日报 - {date}",
+        "link": "https://example.com",
+        "content": "\n\n".join(f"## {e['title']}\n\n{e['summary']}" for e in entries),
+        "entries": entries
+    }
+
+
+def run_policy(policy: str, content: dict, base_url: str = None, api_key: str = None, verbose: bool = False) -> dict:
+    """用指定路由策略完整分析一次（空缓存、不限流），返回耗时和调用统计"""
+    workdir = Path(tempfile.mkdtemp())
+    ledger = LLMLedger(workdir / "ledger.jsonl")
+
+    with contextlib.redirect_stdout(sys.stdout if verbose else io.StringIO()):
+        analyzer = ClaudeAnalyzer(
+            api_key=api_key,
+            base_url=base_url,
+            rate_limiter=RateLimiter(rpm=0, tpm=0),
+            cache=AnalysisCache(workdir / "cache"),
+            ledger=ledger,
+            model_router=ModelRouter.from_config(policy)
+        )
+        start = time.monotonic()
+        with analyzer:
+            analyzer.analyze(content, "2026-01-13")
+        elapsed = time.monotonic() - start
+
+    records = list(ledger.read())
+    costs = [r["cost_usd"] for r in records if r.get("cost_usd") is not None]
+    return {
+        "policy": policy,
+        "elapsed": elapsed,
+        "calls": len(records),
+        "input_tokens": sum(r["input_tokens"] for r in records),
+        "output_tokens": sum(r["output_tokens"] for r in records),
+        "cost_usd": sum(costs) if costs else None,
+        "stages": summarize(records, "stage"),
+    }
+
+
+def print_report(results: list, time_scale: float):
+    """打印对比报告"""
+    unit = "" if time_scale == 1 else f"（模拟延迟已缩放 ×{time_scale}）"
+    print(f"\n📊 模型分级路由基准{unit}")
+    print(f"{'策略':<58}{'耗时':>8}{'调用':>6}{'输入':>9}{'输出':>8}{'费用':>10}")
+    for result in results:
+        cost = "-" if result["cost_usd"] is None else f"${result['cost_usd']:.4f}"
+        print(f"{result['policy']:<60}{result['elapsed']:>8.2f}s{result['calls']:>6}"
+              f"{result['input_tokens']:>9}{result['output_tokens']:>8}{cost:>10}")
+        for stage, stats in result["stages"].items():
+            print(f"   {stage:<20} 调用 {stats['calls']:>3}  延迟 p50 {stats['latency_ms']['p50']:.0f}ms"
+                  f"  p90 {stats['latency_ms']['p90']:.0f}ms")
+
+    baseline, tiered = results
+    if baseline["elapsed"] and baseline["cost_usd"] and tiered["cost_usd"] is not None:
+        print(f"\n分级路由: 耗时 {tiered['elapsed'] / baseline['elapsed']:.0%}，"
+              f"费用 {tiered['cost_usd'] / baseline['cost_usd']:.0%}（相对单一大模型）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模型分级路由基准测试")
+    parser.add_argument("--entries", type=int, default=40, help="合成资讯条数")
+    parser.add_argument("--policy", default=TIERED_POLICY, help="分级路由策略")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="模拟延迟缩放比例")
+    parser.add_argument("--live", action="store_true", help="使用真实 API 端点")
+    parser.add_argument("--verbose", action="store_true", help="输出分析日志")
+    args = parser.parse_args()
+
+    content = synthetic_content(args.entries)
+    server = None if args.live else MockAnthropicServer(time_scale=args.time_scale)
+    base_url = server.url if server else None
+    api_key = "mock-key" if server else None
+    try:
+        results = [
+            run_policy(policy, content, base_url, api_key, args.verbose)
+            for policy in (SINGLE_MODEL_POLICY, args.policy)
+        ]
+    finally:
+        if server:
+            server.close()
+    print_report(results, 1 if args.live else args.time_scale)
+
+
+if __name__ == "__main__":
+    main()
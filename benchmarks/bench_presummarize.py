@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+抽取式预摘要基准测试
+对比长原文直接截断与先做 TextRank 预摘要两种方式的输入 token、预摘要耗时和分析延迟
+
+    python benchmarks/bench_presummarize.py                  # 本地模拟 API（首 token 延迟随输入长度增加）
+    python benchmarks/bench_presummarize.py --tokens 2000 8000 20000 --ratio 0.3
+    python benchmarks/bench_presummarize.py --live           # 使用 .env 中配置的真实端点
+"""
+import io
+import sys
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import SUMMARY_COMPRESSION_RATIO, PROMPT_TOKEN_BUDGET
+from src.claude_analyzer import ClaudeAnalyzer
+from src.analysis_cache import AnalysisCache
+from src.rate_limiter import RateLimiter
+from src.telemetry import LLMLedger
+from src.text_summarizer import summarize
+from src.token_budget import estimate_tokens
+from benchmarks.mock_api import MockAnthropicServer
+
+_SUBJECTS = ["Anthropic", "OpenAI", "Google DeepMind", "Meta", "Mistral", "DeepSeek", "Qwen team", "NVIDIA"]
+_EVENTS = [
+    "released a new reasoning model that tops the coding benchmarks",
+    "published a paper on long-context retrieval with sparse attention",
+    "announced cheaper API pricing for batch inference workloads",
+    "open-sourced an agent framework with tool calling and memory",
+    "shipped a multimodal model that understands video and audio",
+]
+_CHATTER = [
+    "Several people on Discord discussed whether the results are reproducible.",
+    "One user shared a screenshot of the new settings page.",
+    "The thread drifted into a debate about keyboard shortcuts.",
+    "Someone asked if the meetup next week is still happening.",
+    "A few members posted memes about the release timing.",
+]
+
+
+def synthetic_issue(tokens: int, seed: int = 0) -> str:
+    """生成约 tokens 个 token 的 smol.ai 风格长文：少量反复提及的要闻夹杂大量闲聊"""
+    rng = random.Random(seed)
+    lines = []
+    while estimate_tokens("\n".join(lines)) < tokens:
+        thread = f"(thread #{len(lines)})"
+        if rng.random() < 0.3:
+            lines.append(f"- {rng.choice(_SUBJECTS)} {rng.choice(_EVENTS)} {thread}.")
+        else:
+            lines.append(f"- {rng.choice(_CHATTER)[:-1]} {thread}.")
+    return "\n".join(lines)
+
+
+def run_case(text: str, presummarize: bool, base_url: str = None, api_key: str = None, verbose: bool = False) -> dict:
+    """分析一次单源长文（空缓存、不限流），返回输入 token、预摘要耗时和分析耗时"""
+    workdir = Path(tempfile.mkdtemp())
+    ledger = LLMLedger(workdir / "ledger.jsonl")
+    content = {"title": "AI News", "link": "https://news.smol.ai/", "content": text}
+
+    with contextlib.redirect_stdout(sys.stdout if verbose else io.StringIO()):
+        analyzer = ClaudeAnalyzer(
+            api_key=api_key,
+            base_url=base_url,
+            rate_limiter=RateLimiter(rpm=0, tpm=0),
+            cache=AnalysisCache(workdir / "cache"),
+            ledger=ledger
+        )
+        analyzer.presummarize = presummarize
+        start = time.monotonic()
+        with analyzer:
+            analyzer.analyze(content, "2026-01-13")
+        elapsed = time.monotonic() - start
+
+    records = list(ledger.read())
+    return {
+        "elapsed": elapsed,
+        "input_tokens": sum(r["input_tokens"] for r in records),
+        "ttft_ms": sum(r["ttft_ms"] or 0 for r in records),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抽取式预摘要基准测试")
+    parser.add_argument("--tokens", type=int, nargs="+", default=[2000, 5000, 10000, 30000], help="原文 token 数")
+    parser.add_argument("--ratio", type=float, default=SUMMARY_COMPRESSION_RATIO, help="压缩比")
+    parser.add_argument("--time-scale", type=float, default=0.2, help="模拟延迟缩放比例")
+    parser.add_argument("--live", action="store_true", help="使用真实 API 端点")
+    parser.add_argument("--verbose", action="store_true", help="输出分析日志")
+    args = parser.parse_args()
+
+    server = None if args.live else MockAnthropicServer(time_scale=args.time_scale)
+    base_url = server.url if server else None
+    api_key = "mock-key" if server else None
+
+    scale = "" if args.live or args.time_scale == 1 else f"（模拟延迟已缩放 ×{args.time_scale}）"
+    print(f"\n📊 抽取式预摘要基准：压缩比 {args.ratio}，提示词预算 {PROMPT_TOKEN_BUDGET} tokens{scale}")
+    print(f"{'原文':>8}{'摘要':>8}{'预摘要耗时':>12}{'输入(截断)':>12}{'输入(预摘要)':>13}"
+          f"{'首token(截断)':>15}{'首token(预摘要)':>16}{'耗时(截断)':>12}{'耗时(预摘要)':>13}")
+    try:
+        # 预热：首次调用包含建立连接等开销
+        run_case(synthetic_issue(200), False, base_url, api_key)
+        for size in args.tokens:
+            text = synthetic_issue(size)
+            start = time.perf_counter()
+            compressed = summarize(text, ratio=args.ratio, max_tokens=PROMPT_TOKEN_BUDGET)
+            compress_ms = (time.perf_counter() - start) * 1000
+
+            baseline = run_case(text, False, base_url, api_key, args.verbose)
+            result = run_case(text, True, base_url, api_key, args.verbose)
+            print(f"{compressed.original_tokens:>8}{compressed.summary_tokens:>8}{compress_ms:>10.1f}ms"
+                  f"{baseline['input_tokens']:>12}{result['input_tokens']:>13}"
+                  f"{baseline['ttft_ms']:>13.0f}ms{result['ttft_ms']:>14.0f}ms"
+                  f"{baseline['elapsed']:>11.2f}s{result['elapsed']:>12.2f}s")
+    finally:
+        if server:
+            server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+资讯相关度排序基准测试
+在不同规模的合成候选集上测量 BM25 排序耗时
+
+    python benchmarks/bench_ranking.py
+    python benchmarks/bench_ranking.py --sizes 1000 10000 50000
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import KEYWORDS, MAX_PROMPT_ENTRIES
+from src.ranking import BM25Ranker
+
+_FILLER = (
+    "the a new show hn open source compiler kernel database network storage server browser "
+    "rust python go startup release update performance security cloud team users data"
+).split()
+_SOURCES = ["AI News (smol.ai)", "Hacker News: Newest", "Hacker News: Newest: \"agent plugin\""]
+
+
+def synthetic_entries(count: int, seed: int = 42) -> list:
+    """生成合成 RSS 条目：大部分是无关资讯，少量包含 KEYWORDS"""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(count):
+        words = rng.choices(_FILLER, k=90)
+        if rng.random() < 0.2:
+            words += rng.choices(KEYWORDS, k=rng.randint(1, 4))
+            rng.shuffle(words)
+        entries.append({
+            "title": " ".join(words[:10]).capitalize(),
+            "summary": " ".join(words[10:]),
+            "link": f"https://example.com/news/{i}",
+            "source": rng.choice(_SOURCES)
+        })
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="资讯相关度排序基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 20000], help="候选集规模")
+    parser.add_argument("--repeat", type=int, default=3, help="每个规模重复次数（取最小值）")
+    args = parser.parse_args()
+
+    ranker = BM25Ranker()
+    print(f"📊 BM25 排序基准（查询词 {len(ranker.terms)} 个，选取前 {MAX_PROMPT_ENTRIES} 条）")
+    print(f"{'候选数':>10}{'耗时(ms)':>12}{'每千条(ms)':>14}")
+    for size in args.sizes:
+        entries = synthetic_entries(size)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            ranker.rank(entries, MAX_PROMPT_ENTRIES)
+            timings.append(time.perf_counter() - start)
+        best = min(timings) * 1000
+        print(f"{size:>10}{best:>12.1f}{best / size * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
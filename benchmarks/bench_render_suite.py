@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+渲染基准套件
+用可配置规模（分类数 × 每类条目数 × 标签数 × 摘要长度）的合成分析结果，
+测量页面、索引、分享卡片（含本地渲染）和小红书封面各生成环节的耗时，并与 JSON 基线比较：
+
+    python benchmarks/bench_render_suite.py                      # 与基线比较
+    python benchmarks/bench_render_suite.py --save               # 写入新基线
+    python benchmarks/bench_render_suite.py --check              # 超出容差时返回非零退出码
+    python benchmarks/bench_render_suite.py --items 5 100 --tags 6 --summary-chars 200
+
+基线默认保存在 benchmarks/baselines/render_suite.json，修改渲染代码或用例列表时连同新基线一起提交，
+评审时即可看到耗时变化。基线记录生成时的环境（含本地卡片渲染的字体）和一段固定负载的校准耗时：
+比较时按校准耗时的比值换算机器快慢，只比较相对变化；卡片字体不同时跳过 card_render_local 用例，
+Python 版本、系统或架构不同时只打印对比、不判定回归。没有中文字体时可以用 --font 指定任意 TrueType 字体测量卡片渲染。
+"""
+import io
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import contextlib
+from datetime import date, timedelta
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.html_generator import HTMLGenerator
+from src.image_generator import ImageGenerator
+from src.card_renderer import CardRenderer, CardRendererUnavailable, find_cjk_font
+from src.xiaohongshu_generator import XiaohongshuGenerator
+from benchmarks.synthetic import synthetic_result
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "render_suite.json"
+# 预先写入索引的天数（update_index 在已有一年历史的站点上测量）
+INDEX_HISTORY_DAYS = 365
+START_DATE = date(2025, 1, 1)
+
+
+def measure(func, repeat: int, setup=None) -> dict:
+    """先预热一次，再运行 repeat 次，返回最短和中位耗时（秒）；setup 每次运行前调用，不计入耗时"""
+    timings = []
+    for run in range(repeat + 1):
+        state = setup() if setup else None
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func(state)
+            elapsed = time.perf_counter() - start
+        if run:
+            timings.append(elapsed)
+    return {"best": min(timings), "median": statistics.median(timings)}
+
+
+def calibrate(repeat: int) -> float:
+    """固定的纯 Python 负载（字符串拼接、字典和 JSON 序列化）的中位耗时，用来换算不同机器的快慢"""
+    def workload(_):
+        rows = [{"title": f"资讯 {i}", "tags": [str(i % 7), str(i % 11)], "score": i * 0.5} for i in range(20000)]
+        json.dumps(rows, ensure_ascii=False)
+        "".join(row["title"] for row in sorted(rows, key=lambda row: -row["score"]))
+
+    return measure(workload, max(repeat, 3))["median"]
+
+
+def run_suite(args, workdir: str) -> dict:
+    """运行全部用例（输出写在 workdir 下），返回 {用例名: {"best", "median"}}"""
+    results = {}
+    for items in args.items:
+        label = f"{args.categories}x{items}x{args.tags}x{args.summary_chars}"
+        result = synthetic_result(args.categories, items, args.tags, args.summary_chars, START_DATE)
+
+        def fresh_generator():
+            return HTMLGenerator(tempfile.mkdtemp(dir=workdir))
+
+        results[f"generate_daily[{label}]"] = measure(
+            lambda generator: generator.generate_daily(result), args.repeat, setup=fresh_generator
+        )
+
+        # 一年历史的站点上追加新的一天
+        history = HTMLGenerator(tempfile.mkdtemp(dir=workdir))
+        with contextlib.redirect_stdout(io.StringIO()):
+            history.rebuild_index([
+                synthetic_result(2, 3, 2, 40, START_DATE + timedelta(days=d)) for d in range(INDEX_HISTORY_DAYS)
+            ])
+        next_days = iter(range(INDEX_HISTORY_DAYS, INDEX_HISTORY_DAYS + args.repeat + 1))
+
+        def update_next(_):
+            day = START_DATE + timedelta(days=next(next_days))
+            history.update_index(day.isoformat(), {**result, "date": day.isoformat()})
+
+        results[f"update_index[{label}]"] = measure(update_next, args.repeat)
+
+        image_generator = ImageGenerator()
+        markdown = image_generator._build_card_markdown(result)
+        results[f"image_build_card_markdown[{label}]"] = measure(
+            lambda _: image_generator._build_card_markdown(result), args.repeat
+        )
+        results[f"image_calculate_dimensions[{label}]"] = measure(
+            lambda _: image_generator._calculate_dimensions(markdown), args.repeat
+        )
+
+        # 本地卡片渲染（需要 Pillow 和字体，默认按查找顺序选择中文字体）
+        try:
+            renderer = CardRenderer(font_path=args.font)
+        except CardRendererUnavailable as e:
+            print(f"⚠️ 跳过本地卡片渲染: {e}")
+        else:
+            width, _, _, card_config = image_generator._calculate_dimensions(markdown)
+            results[f"card_render_local[{label}]"] = measure(
+                lambda _: renderer.render(
+                    markdown, width, padding=card_config["padding"], font_scale=card_config["fontScale"],
+                    min_height=ImageGenerator.MIN_HEIGHT, max_height=ImageGenerator.MAX_HEIGHT
+                ),
+                args.repeat
+            )
+
+        xhs_generator = XiaohongshuGenerator(tempfile.mkdtemp(dir=workdir))
+        results[f"xiaohongshu_generate[{label}]"] = measure(
+            lambda _: xhs_generator.generate(result), args.repeat
+        )
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float, scale: float = 1.0, skip: tuple = (),
+            min_seconds: float = 0.0) -> list:
+    """
+    打印与基线的对比，返回超出容差的用例
+
+    Args:
+        scale: 本机相对基线机器的耗时比（校准耗时之比），基线耗时乘以它之后再比较
+        skip: 不参与比较的用例名前缀（如卡片字体不同时的 card_render_local）
+        min_seconds: 基线耗时低于它的用例只打印变化、不判定回归（计时噪声大于实际差异）
+    """
+    regressions = []
+    print(f"\n{'用例':<58}{'中位耗时':>12}{'基线':>12}{'变化':>10}")
+    for name, timing in results.items():
+        base = baseline.get(name)
+        current = f"{timing['median'] * 1000:.3f}ms"
+        if not base:
+            print(f"{name:<58}{current:>12}{'-':>12}{'新增':>10}")
+            continue
+        if name.startswith(skip):
+            print(f"{name:<58}{current:>12}{base['median'] * 1000:>10.3f}ms{'跳过':>10}")
+            continue
+        expected = base["median"] * scale
+        ratio = timing["median"] / expected if expected else 1.0
+        flag = ""
+        if ratio > 1 + tolerance and expected >= min_seconds:
+            regressions.append(name)
+            flag = " ⚠️"
+        print(f"{name:<58}{current:>12}{base['median'] * 1000:>10.3f}ms{(ratio - 1) * 100:>+9.0f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="渲染基准套件")
+    parser.add_argument("--categories", type=int, default=8, help="分类数")
+    parser.add_argument("--items", type=int, nargs="+", default=[5, 50, 500], help="每个分类的条目数（可多组）")
+    parser.add_argument("--tags", type=int, default=4, help="每条资讯的标签数")
+    parser.add_argument("--summary-chars", type=int, default=80, help="每条摘要的字符数")
+    parser.add_argument("--font", default=None, help="本地卡片渲染使用的字体（默认按查找顺序选择中文字体）")
+    parser.add_argument("--repeat", type=int, default=5, help="每个用例的运行次数")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="基线文件路径")
+    parser.add_argument("--save", action="store_true", help="把本次结果写入基线")
+    parser.add_argument("--check", action="store_true", help="有用例超出容差时返回非零退出码")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的变慢比例（默认 0.25）")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="基线耗时低于该毫秒数的用例不判定回归（默认 1）")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-render-")
+    try:
+        results = run_suite(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    baseline_path = Path(args.baseline)
+    font = args.font or find_cjk_font()
+    environment = {
+        "python": ".".join(platform.python_version_tuple()[:2]),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "card_font": Path(font).name if font else None,
+        "calibration": round(calibrate(args.repeat), 6)
+    }
+    baseline, baseline_environment = {}, {}
+    if baseline_path.exists():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        baseline, baseline_environment = data.get("results", {}), data.get("environment", {})
+
+    # 按校准耗时换算机器快慢；基线没有校准耗时（旧格式）时无法换算，只打印对比
+    comparable = bool(baseline_environment.get("calibration"))
+    scale = environment["calibration"] / baseline_environment["calibration"] if comparable else 1.0
+    for key in ("python", "system", "machine"):
+        if baseline and baseline_environment.get(key) != environment[key]:
+            print(f"⚠️ 基线的 {key} 为 {baseline_environment.get(key)}，本次为 {environment[key]}，只打印对比、不判定回归")
+            comparable = False
+    skip = ()
+    if baseline_environment.get("card_font") != environment["card_font"]:
+        print(f"⚠️ 基线的卡片字体为 {baseline_environment.get('card_font')}，本次为 {environment['card_font']}，"
+              f"跳过 card_render_local 用例")
+        skip = ("card_render_local",)
+    if baseline_environment.get("calibration"):
+        print(f"📏 本机校准耗时为基线的 {scale:.2f} 倍，基线耗时按此换算后比较")
+    elif baseline:
+        print("⚠️ 基线没有记录校准耗时，无法换算机器快慢，只打印对比、不判定回归")
+
+    regressions = compare(results, baseline, args.tolerance, scale, skip, args.min_ms / 1000)
+    if regressions and not comparable:
+        print(f"\n⚠️ {len(regressions)} 个用例比基线慢 {args.tolerance:.0%} 以上，但运行环境与基线不同，不判定回归")
+        regressions = []
+
+    if args.save:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "environment": environment,
+            "repeat": args.repeat,
+            "results": {name: {k: round(v, 6) for k, v in timing.items()} for name, timing in results.items()}
+        }
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n✅ 基线已保存: {baseline_path}")
+
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} 个用例比基线慢 {args.tolerance:.0%} 以上")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+搜索索引基准测试
+用合成的多天分析结果逐天增量建立搜索索引，并与一次性全量重建对比，
+输出每天的增量耗时、分片数量和大小，以及典型查询需要下载的字节数
+
+    python benchmarks/bench_search_index.py
+    python benchmarks/bench_search_index.py --days 2000 --items 30
+"""
+import sys
+import gzip
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import date, timedelta
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import CATEGORIES
+from src.build_manifest import BuildManifest
+from src.search_index import SearchIndex, shard_key
+from src.pre_classifier import tokenize
+
+QUERIES = ["Claude Agent", "开源模型", "gpt-5 推理", "多模态 benchmark"]
+
+
+def make_vocabulary(rng: random.Random):
+    """英文词表 + 常用汉字（按 Zipf 分布抽样，贴近真实资讯的词频）"""
+    base = ["claude", "gpt-5", "gemini", "llama", "agent", "benchmark", "open-source", "rag",
+            "transformer", "inference", "gpu", "nvidia", "anthropic", "openai", "deepseek", "qwen"]
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    latin = base + ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(6000)]
+    hanzi = list("模型开源发布推理训练数据智能体多模态芯片算力融资论文评测代码安全对齐语音图像视频机器人"
+                 "搜索应用企业产品平台用户性能成本参数架构框架工具部署服务云端终端研究团队公司")
+    hanzi += [chr(0x4E00 + rng.randrange(0x5000)) for _ in range(800)]
+    return latin, hanzi
+
+
+def zipf_pick(rng: random.Random, words, count: int):
+    return [words[min(int(rng.paretovariate(1.1)) - 1, len(words) - 1)] for _ in range(count)]
+
+
+def synthetic_day(rng: random.Random, vocabulary, day: date, items: int) -> dict:
+    """一天的合成结果：items 条资讯，标题、摘要、标签混合中英文"""
+    latin, hanzi = vocabulary
+    categories = [{"key": key, "name": cat["name"], "icon": cat["icon"], "items": []} for key, cat in CATEGORIES.items()]
+
+    def sentence(n_latin, n_hanzi):
+        return " ".join(zipf_pick(rng, latin, n_latin)) + " " + "".join(zipf_pick(rng, hanzi, n_hanzi))
+
+    for i in range(items):
+        categories[i % len(categories)]["items"].append({
+            "title": sentence(3, 8),
+            "summary": sentence(6, 30),
+            "url": f"https://example.com/{day}/{i}",
+            "tags": zipf_pick(rng, latin, 3)
+        })
+    return {
+        "date": day.isoformat(),
+        "summary": [sentence(4, 20) for _ in range(3)],
+        "keywords": zipf_pick(rng, latin, 5),
+        "categories": categories
+    }
+
+
+def shard_stats(search_dir: Path):
+    """分片文件大小（原始、gzip）"""
+    sizes, gz_sizes = {}, {}
+    for path in search_dir.glob("*.json"):
+        data = path.read_bytes()
+        sizes[path.stem] = len(data)
+        gz_sizes[path.stem] = len(gzip.compress(data))
+    return sizes, gz_sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="搜索索引基准测试")
+    parser.add_argument("--days", type=int, default=1200, help="天数")
+    parser.add_argument("--items", type=int, default=20, help="每天的资讯条数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng)
+    start_day = date(2023, 1, 1)
+    results = [synthetic_day(rng, vocabulary, start_day + timedelta(days=i), args.items) for i in range(args.days)]
+
+    # 逐天增量更新
+    incremental_dir = tempfile.mkdtemp()
+    index = SearchIndex(incremental_dir, BuildManifest(incremental_dir, changed_path=f"{incremental_dir}/changed.txt"))
+    timings, touched = [], []
+    for result in results:
+        t = time.perf_counter()
+        touched.append(index.add(result))
+        timings.append(time.perf_counter() - t)
+
+    # 一次性全量重建
+    rebuild_dir = tempfile.mkdtemp()
+    rebuilt = SearchIndex(rebuild_dir, BuildManifest(rebuild_dir, changed_path=f"{rebuild_dir}/changed.txt"))
+    t = time.perf_counter()
+    rebuilt.rebuild(results)
+    rebuild_time = time.perf_counter() - t
+
+    sizes, gz_sizes = shard_stats(index.search_dir)
+    shard_sizes = sorted(size for key, size in sizes.items() if key != "meta")
+    last = timings[-100:]
+
+    print(f"\n📊 搜索索引基准（{args.days} 天 × {args.items} 条资讯）")
+    print(f"   增量更新: 平均 {statistics.mean(timings) * 1000:.1f}ms/天，"
+          f"最后 100 天平均 {statistics.mean(last) * 1000:.1f}ms/天，每天改写 {statistics.mean(touched):.0f} 个分片")
+    print(f"   全量重建: {rebuild_time:.2f}s（逐天增量合计 {sum(timings):.2f}s）")
+    print(f"   分片: {len(shard_sizes)} 个，合计 {sum(shard_sizes) / 1024:.0f}KB"
+          f"（gzip {sum(gz_sizes.values()) / 1024:.0f}KB），"
+          f"中位数 {statistics.median(shard_sizes) / 1024:.1f}KB，最大 {shard_sizes[-1] / 1024:.1f}KB")
+
+    print(f"\n{'查询':<20}{'分片':>6}{'下载':>10}{'gzip':>10}{'结果':>8}")
+    for query in QUERIES:
+        keys = {shard_key(term) for term in tokenize(query)}
+        raw = sum(sizes.get(key, 0) for key in keys)
+        gz = sum(gz_sizes.get(key, 0) for key in keys)
+        hits = len(index.search(query))
+        print(f"{query:<20}{len(keys):>6}{raw / 1024:>8.1f}KB{gz / 1024:>8.1f}KB{hits:>8}")
+
+    same = all(
+        (index.search_dir / path.name).read_bytes() == path.read_bytes()
+        for path in rebuilt.search_dir.glob("*.json")
+    )
+    print(f"\n   增量结果与全量重建一致: {'是' if same else '否'}")
+
+
+if __name__ == "__main__":
+    main()
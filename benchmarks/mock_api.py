@@ -0,0 +1,138 @@
+"""
+本地模拟的 Anthropic Messages API，供基准测试使用
+按模型模拟首 token 延迟（含按输入长度计算的预填充时间）和生成速度，按请求的工具返回结构合法的结果
+"""
+import re
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Tuple
+
+from src.config import CATEGORIES, THEMES
+from src.token_budget import estimate_tokens
+
+# 模型名关键字 -> (首 token 延迟秒数, 每秒输出 token 数)，按公开测评的量级粗略设置
+MODEL_SPEEDS = {
+    "haiku": (0.4, 150.0),
+    "sonnet": (0.9, 60.0),
+    "opus": (1.5, 30.0),
+}
+DEFAULT_SPEED = (0.9, 60.0)
+# 预填充速度（每秒输入 token 数），首 token 延迟随输入长度增加
+PREFILL_TOKENS_PER_SECOND = 4000.0
+
+_ENTRY_RE = re.compile(r"^\[(\d+)\] (.*)$", re.MULTILINE)
+
+
+def model_speed(model: str) -> Tuple[float, float]:
+    """返回模型的 (首 token 延迟, 生成速度)"""
+    for keyword, speed in MODEL_SPEEDS.items():
+        if keyword in (model or ""):
+            return speed
+    return DEFAULT_SPEED
+
+
+def _prompt_text(body: Dict[str, Any]) -> str:
+    return "".join(
+        message["content"] if isinstance(message["content"], str) else json.dumps(message["content"])
+        for message in body.get("messages", [])
+    )
+
+
+def _tool_input(tool_name: str, prompt: str) -> Dict[str, Any]:
+    """按工具名生成结构合法的模拟结果"""
+    categories = list(CATEGORIES)
+    if tool_name == "submit_entries":
+        return {"items": [
+            {
+                "id": int(index),
+                "category": categories[int(index) % len(categories)],
+                "title": title[:40],
+                "summary": f"{title[:60]}，模拟的一句话核心要点"
+            }
+            for index, title in _ENTRY_RE.findall(prompt)
+        ]}
+    summary = ["模拟的今日核心要点一", "模拟的今日核心要点二", "模拟的今日核心要点三"]
+    if tool_name == "submit_daily_summary":
+        return {"theme": next(iter(THEMES)), "summary": summary}
+    return {
+        "status": "success",
+        "theme": next(iter(THEMES)),
+        "summary": summary,
+        "categories": [{"key": categories[0], "items": [{"title": "模拟资讯", "summary": "模拟摘要"}]}]
+    }
+
+
+class MockAnthropicServer:
+    """
+    模拟 API 服务（只支持流式 /v1/messages 请求）
+
+    time_scale 缩放模拟延迟，便于快速运行；报告中的延迟按同一比例缩放
+    """
+
+    def __init__(self, time_scale: float = 1.0):
+        self.time_scale = time_scale
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._server.block_on_close = False
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length))
+                with mock._lock:
+                    mock.requests += 1
+
+                prompt = _prompt_text(body)
+                tool_name = (body.get("tool_choice") or {}).get("name", "")
+                tool_input = _tool_input(tool_name, prompt)
+                input_json = json.dumps(tool_input, ensure_ascii=False)
+                input_tokens = estimate_tokens(prompt + json.dumps(body.get("tools", []), ensure_ascii=False))
+                output_tokens = min(estimate_tokens(input_json), body.get("max_tokens", 4096))
+
+                ttft, speed = model_speed(body.get("model", ""))
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                time.sleep((ttft + input_tokens / PREFILL_TOKENS_PER_SECOND) * mock.time_scale)
+
+                def send(data):
+                    self.wfile.write(f"event: {data['type']}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                send({"type": "message_start", "message": {
+                    "id": "msg_mock", "type": "message", "role": "assistant", "model": body.get("model"),
+                    "content": [], "stop_reason": None, "stop_sequence": None,
+                    "usage": {"input_tokens": input_tokens, "output_tokens": 1}
+                }})
+                send({"type": "content_block_start", "index": 0, "content_block": {
+                    "type": "tool_use", "id": "toolu_mock", "name": tool_name, "input": {}
+                }})
+                send({"type": "content_block_delta", "index": 0, "delta": {
+                    "type": "input_json_delta", "partial_json": input_json
+                }})
+                time.sleep(output_tokens / speed * mock.time_scale)
+                send({"type": "content_block_stop", "index": 0})
+                send({"type": "message_delta", "delta": {"stop_reason": "tool_use", "stop_sequence": None},
+                      "usage": {"output_tokens": output_tokens}})
+                send({"type": "message_stop"})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
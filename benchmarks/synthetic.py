@@ -0,0 +1,61 @@
+"""
+合成分析结果
+基准测试和页面生成测试共用：分类数 × 每类条目数 × 标签数 × 摘要长度均可配置，
+摘要中包含需要 HTML 转义的字符（&、<、>）
+"""
+from datetime import date
+from typing import Union
+
+from src.config import CATEGORIES
+
+SENTENCE = "模型发布与开源生态持续升温，Agent 框架 & 推理成本 <下降> 明显。"
+
+
+def synthetic_result(
+    categories: int,
+    items: int,
+    tags: int = 4,
+    summary_chars: int = 80,
+    day: Union[date, str] = "2026-01-13",
+    theme: str = "blue"
+) -> dict:
+    """
+    生成合成分析结果
+
+    Args:
+        categories: 分类数（超过内置分类数时循环使用分类名）
+        items: 每个分类的条目数
+        tags: 每条资讯的标签数
+        summary_chars: 每条摘要的字符数
+        day: 日期
+        theme: 页面主题
+
+    Returns:
+        与 ClaudeAnalyzer 输出结构相同的分析结果
+    """
+    cat_defs = list(CATEGORIES.items())
+    summary = (SENTENCE * (summary_chars // len(SENTENCE) + 1))[:summary_chars]
+    result_categories = []
+    for c in range(categories):
+        key, cat = cat_defs[c % len(cat_defs)]
+        result_categories.append({
+            "key": f"{key}-{c}",
+            "name": cat["name"],
+            "icon": cat["icon"],
+            "items": [
+                {
+                    "title": f"资讯 {c}-{i}：Anthropic 发布 Claude 新版本",
+                    "summary": summary,
+                    "url": f"https://example.com/{day}/{c}/{i}?ref=bench&id={i}",
+                    "tags": [f"tag{t}" for t in range(tags)]
+                }
+                for i in range(items)
+            ]
+        })
+    return {
+        "date": str(day),
+        "theme": theme,
+        "summary": [f"核心要点 {i}：{SENTENCE}" for i in range(5)],
+        "keywords": ["Claude", "GPT-5", "Agent", "开源", "推理"],
+        "categories": result_categories
+    }
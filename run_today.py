@@ -14,6 +14,8 @@ sys.path.insert(0, str(project_root))
 
 from src.rss_fetcher import RSSFetcher
 from src.html_generator import HTMLGenerator
+from src.result_archive import ResultArchive
+from src.precompress import precompress_changed
 
 
 def main():
@@ -90,9 +92,12 @@ def main():
     print("[步骤 3] 生成 HTML 页面...")
 
     # 生成 HTML
+    ResultArchive().save(result)
     generator = HTMLGenerator()
     generator.generate_css()
     html_path = generator.generate_daily(result)
+    precompress_changed(generator.manifest)
+    generator.manifest.save()
 
     print(f"✅ 生成成功: {html_path}")
     print()
@@ -0,0 +1,153 @@
+"""
+单条资讯分析缓存模块
+以「规范化 URL + 内容哈希」为键缓存每条资讯的分类和摘要，
+相邻几天重复出现的资讯无需再次调用 LLM
+"""
+import os
+import json
+import hashlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from src.config import ANALYSIS_CACHE_DIR, ANALYSIS_CACHE_MAX_AGE_DAYS
+
+# 不影响内容的追踪参数，规范化 URL 时去除
+TRACKING_PARAMS = {"ref", "source", "fbclid", "gclid", "mc_cid", "mc_eid"}
+
+
+def canonical_url(url: str) -> str:
+    """
+    规范化 URL：小写协议和主机、去掉默认端口、片段、追踪参数和末尾斜杠，查询参数排序
+
+    Args:
+        url: 原始链接
+
+    Returns:
+        规范化后的链接
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (scheme, parts.port) in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def content_hash(entry: Dict[str, Any]) -> str:
+    """计算条目标题和正文的内容哈希（忽略空白差异；有 full_summary 时使用完整摘要，不受摘录长度影响）"""
+    summary = entry.get("full_summary") or entry.get("summary", "")
+    text = " ".join(f"{entry.get('title', '')}\n{summary}".split())
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def entry_cache_key(entry: Dict[str, Any]) -> str:
+    """条目缓存键：规范化 URL + 内容哈希"""
+    return f"{canonical_url(entry.get('link', ''))}#{content_hash(entry)[:16]}"
+
+
+class AnalysisCache:
+    """单条资讯分析结果缓存（JSON 文件存储）"""
+
+    FILENAME = "entries.json"
+
+    def __init__(self, cache_dir: str = None, max_age_days: int = None):
+        """
+        Args:
+            cache_dir: 缓存目录
+            max_age_days: 超过该天数未被使用的缓存在保存时淘汰
+        """
+        self.cache_dir = Path(cache_dir or ANALYSIS_CACHE_DIR)
+        self.path = self.cache_dir / self.FILENAME
+        self.max_age_days = ANALYSIS_CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 分析缓存读取失败，忽略缓存: {e}")
+            self._entries = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """查询条目的缓存分析结果，命中时刷新使用时间"""
+        record = self._entries.get(entry_cache_key(entry))
+        if record is None:
+            return None
+        record["used"] = datetime.now().isoformat()
+        self._dirty = True
+        return dict(record["analysis"])
+
+    def put(self, entry: Dict[str, Any], analysis: Dict[str, Any], llm_labelled: bool = True):
+        """
+        写入条目的分析结果
+
+        Args:
+            entry: 原始条目
+            analysis: 分析结果
+            llm_labelled: 分类是否由 LLM 给出（本地预分类器给出的分类为 False，不用于训练和评估预分类器）
+        """
+        now = datetime.now().isoformat()
+        self._entries[entry_cache_key(entry)] = {
+            "url": canonical_url(entry.get("link", "")),
+            "title": entry.get("title", ""),
+            "summary": entry.get("summary", ""),
+            "analysis": analysis,
+            "llm_labelled": llm_labelled,
+            "created": now,
+            "used": now
+        }
+        self._dirty = True
+
+    def items(self, llm_labelled_only: bool = False) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        遍历 (原始条目的标题、摘要和链接, 分析结果)
+
+        Args:
+            llm_labelled_only: 只返回分类由 LLM 给出的记录（旧版本写入、没有该标记的记录也跳过）
+        """
+        for record in self._entries.values():
+            if llm_labelled_only and not record.get("llm_labelled", False):
+                continue
+            entry = {"title": record.get("title", ""), "summary": record.get("summary", ""), "link": record.get("url", "")}
+            yield entry, record["analysis"]
+
+    def evict(self) -> int:
+        """淘汰过期缓存，返回淘汰条数"""
+        if self.max_age_days <= 0:
+            return 0
+        cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+        expired = [key for key, record in self._entries.items() if record.get("used", "") < cutoff]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._dirty = True
+        return len(expired)
+
+    def save(self):
+        """淘汰过期缓存并原子写入磁盘"""
+        self.evict()
+        if not self._dirty:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,126 @@
+"""
+归档索引模块
+按月分片保存首页和归档页使用的条目（日期、链接、首条摘要、时间戳），取代只保留 30 天的 .index.json：
+- index/YYYY-MM.json：当月条目（日期从新到旧），每天只读写当月分片
+- index/months.json：月份列表及条目数（从新到旧）
+首次运行时自动导入旧的 .index.json
+"""
+import json
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from src.build_manifest import BuildManifest, get_build_manifest
+
+INDEX_DIRNAME = "index"
+MONTHS_FILENAME = "months.json"
+LEGACY_INDEX_FILENAME = ".index.json"
+
+
+def _read_json(path: Path, default):
+    if not path.exists():
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠️ 索引文件损坏，已忽略: {path}")
+        return default
+
+
+def _dump(data) -> str:
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+class ArchiveIndex:
+    """按月分片的归档索引"""
+
+    def __init__(self, output_dir: str, manifest: BuildManifest = None):
+        """
+        Args:
+            output_dir: 站点输出目录
+            manifest: 写文件用的构建清单，默认使用输出目录的共享清单
+        """
+        self.output_dir = Path(output_dir)
+        self.index_dir = self.output_dir / INDEX_DIRNAME
+        self.manifest = manifest or get_build_manifest(self.output_dir)
+        self.migrated = self._migrate_legacy()
+
+    def shard_path(self, month: str) -> Path:
+        return self.index_dir / f"{month}.json"
+
+    def load_shard(self, month: str) -> List[Dict[str, Any]]:
+        """读取一个月的条目（日期从新到旧）"""
+        return _read_json(self.shard_path(month), [])
+
+    def months(self) -> List[Dict[str, Any]]:
+        """月份列表 [{"month": "YYYY-MM", "count": 条目数}]，从新到旧"""
+        return _read_json(self.index_dir / MONTHS_FILENAME, [])
+
+    def get(self, date: str) -> Optional[Dict[str, Any]]:
+        """读取某天的条目"""
+        return next((entry for entry in self.load_shard(date[:7]) if entry["date"] == date), None)
+
+    def add(self, entry: Dict[str, Any]) -> bool:
+        """
+        写入或替换一天的条目，只读写当月分片和月份列表
+
+        Returns:
+            是否新增了月份
+        """
+        month = entry["date"][:7]
+        shard = [e for e in self.load_shard(month) if e["date"] != entry["date"]]
+        shard.append(entry)
+        shard.sort(key=lambda e: e["date"], reverse=True)
+        self.manifest.write(self.shard_path(month), _dump(shard))
+
+        months = self.months()
+        is_new = all(m["month"] != month for m in months)
+        months = [m for m in months if m["month"] != month] + [{"month": month, "count": len(shard)}]
+        self._write_months(months)
+        return is_new
+
+    def rebuild(self, entries: List[Dict[str, Any]]):
+        """用完整的条目列表重写全部分片"""
+        shards: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in entries:
+            shards.setdefault(entry["date"][:7], []).append(entry)
+        for month, shard in shards.items():
+            shard.sort(key=lambda e: e["date"], reverse=True)
+            self.manifest.write(self.shard_path(month), _dump(shard))
+        self._write_months([{"month": month, "count": len(shard)} for month, shard in shards.items()])
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """最新的 limit 条条目，只读取需要的分片"""
+        entries = []
+        for month in self.months():
+            if len(entries) >= limit:
+                break
+            entries.extend(self.load_shard(month["month"]))
+        return entries[:limit]
+
+    def neighbors(self, month: str) -> Dict[str, Optional[str]]:
+        """相邻月份：{"newer": 较新的月份, "older": 较早的月份}"""
+        names = [m["month"] for m in self.months()]
+        if month not in names:
+            return {"newer": None, "older": None}
+        i = names.index(month)
+        return {
+            "newer": names[i - 1] if i > 0 else None,
+            "older": names[i + 1] if i + 1 < len(names) else None
+        }
+
+    def _write_months(self, months: List[Dict[str, Any]]):
+        months.sort(key=lambda m: m["month"], reverse=True)
+        self.manifest.write(self.index_dir / MONTHS_FILENAME, _dump(months))
+
+    def _migrate_legacy(self) -> bool:
+        """没有分片时导入旧的 .index.json（只保留了最近 30 天），返回是否导入"""
+        legacy = self.output_dir / LEGACY_INDEX_FILENAME
+        if (self.index_dir / MONTHS_FILENAME).exists() or not legacy.exists():
+            return False
+        entries = [e for e in _read_json(legacy, []) if isinstance(e, dict) and e.get("date")]
+        if not entries:
+            return False
+        self.rebuild(entries)
+        print(f"✅ 已从 {LEGACY_INDEX_FILENAME} 导入 {len(entries)} 条索引")
+        return True
@@ -0,0 +1,228 @@
+"""
+构建清单模块
+记录每个生成文件的内容哈希，内容没变的文件不再重写，部署时只需要上传变更的文件：
+- 写入采用「临时文件 + rename」，页面不会出现写了一半的状态
+- 本次运行变更的文件列表写入 BUILD_CHANGED_FILES_PATH，供部署步骤使用（列表中已不存在的文件表示被删除）
+- 清单在 save() 时落盘，生成结束后需要调用一次
+- OUTPUT_DIR 的清单保存在 BUILD_MANIFEST_PATH（.cache 中，与变更文件列表一起在多次运行间保留），
+  其他输出目录（测试、临时重建）的清单和变更文件列表保存在输出目录下
+"""
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Union
+
+from src.config import OUTPUT_DIR, BUILD_CHANGED_FILES_PATH, BUILD_MANIFEST_PATH
+
+# 非默认输出目录的清单文件名（保存在输出目录中）；也是旧版本 OUTPUT_DIR 清单的位置
+MANIFEST_FILENAME = ".build-manifest.json"
+# 非默认输出目录的变更文件列表文件名
+CHANGED_FILENAME = ".changed_files.txt"
+# 流式写入的文件缓冲区大小
+STREAM_BUFFER_SIZE = 256 * 1024
+
+
+def atomic_write(path: Union[str, Path], data: bytes):
+    """先写同目录下的临时文件再 rename，覆盖目标文件"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class BuildManifest:
+    """生成文件的内容哈希清单"""
+
+    def __init__(self, output_dir: str = None, path: str = None, changed_path: str = None):
+        """
+        Args:
+            output_dir: 站点输出目录，清单中的路径相对该目录记录
+            path: 清单文件路径，默认 OUTPUT_DIR 使用 BUILD_MANIFEST_PATH，其他目录为输出目录下的 MANIFEST_FILENAME
+            changed_path: 变更文件列表路径，默认 OUTPUT_DIR 使用 BUILD_CHANGED_FILES_PATH，其他目录为输出目录下的 CHANGED_FILENAME
+        """
+        self.output_dir = Path(output_dir or OUTPUT_DIR)
+        legacy_path = self.output_dir / MANIFEST_FILENAME
+        is_default_output = self.output_dir.resolve() == Path(OUTPUT_DIR).resolve()
+        if path:
+            self.path = Path(path)
+        elif is_default_output:
+            self.path = Path(BUILD_MANIFEST_PATH)
+        else:
+            self.path = legacy_path
+        if changed_path:
+            self.changed_path = Path(changed_path)
+        else:
+            self.changed_path = Path(BUILD_CHANGED_FILES_PATH) if is_default_output else self.output_dir / CHANGED_FILENAME
+        self.hashes: Dict[str, str] = {}
+        # 本次运行变更的文件，字典只用键（保持写入顺序，判断是否已记录为 O(1)）
+        self.changed: Dict[str, None] = {}
+        self.unchanged = 0
+        self._lock = threading.Lock()
+
+        # 兼容旧版本保存在输出目录中的清单
+        load_path = self.path if self.path.exists() or path else legacy_path
+        if load_path.exists():
+            try:
+                with open(load_path, "r", encoding="utf-8") as f:
+                    self.hashes = json.load(f).get("files", {})
+            except (OSError, ValueError, AttributeError):
+                print(f"⚠️ 构建清单损坏，将重新生成: {load_path}")
+                self.hashes = {}
+
+    def _key(self, path: Path) -> str:
+        """清单中的文件键：输出目录内的文件用相对路径，其他用绝对路径"""
+        try:
+            return path.resolve().relative_to(self.output_dir.resolve()).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def write(self, path: Union[str, Path], content: Union[str, bytes]) -> bool:
+        """
+        内容变化时写入文件
+
+        Args:
+            path: 文件路径
+            content: 文本（按 UTF-8 编码）或二进制内容
+
+        Returns:
+            是否实际写入
+        """
+        path = Path(path)
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+        key = self._key(path)
+
+        with self._lock:
+            # 哈希相同且文件还在（大小一致）时跳过；文件被删除或改动过则重写
+            if self.hashes.get(key) == digest and path.exists() and path.stat().st_size == len(data):
+                self.unchanged += 1
+                return False
+
+            atomic_write(path, data)
+            self.hashes[key] = digest
+            self.changed[key] = None
+        return True
+
+    def write_stream(self, path: Union[str, Path], chunks: Iterable[Union[str, bytes]]) -> bool:
+        """
+        逐段写入文件：边写同目录下的临时文件边计算哈希，完整内容不需要常驻内存；
+        内容与清单记录相同（且原文件还在）时丢弃临时文件，否则 rename 覆盖
+
+        Args:
+            path: 文件路径
+            chunks: 逐段产出的文本（按 UTF-8 编码）或二进制内容
+
+        Returns:
+            是否实际写入
+        """
+        path = Path(path)
+        key = self._key(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb", buffering=STREAM_BUFFER_SIZE) as f:
+                for chunk in chunks:
+                    data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                    digest.update(data)
+                    size += len(data)
+                    f.write(data)
+                f.flush()
+                with self._lock:
+                    unchanged = (self.hashes.get(key) == digest.hexdigest()
+                                 and path.exists() and path.stat().st_size == size)
+                if not unchanged:
+                    os.fsync(f.fileno())
+
+            if unchanged:
+                os.unlink(tmp_path)
+                with self._lock:
+                    self.unchanged += 1
+                return False
+
+            os.chmod(tmp_path, 0o644)
+            with self._lock:
+                os.replace(tmp_path, path)
+                self.hashes[key] = digest.hexdigest()
+                self.changed[key] = None
+            return True
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def remove(self, path: Union[str, Path]) -> bool:
+        """
+        删除文件并从清单中移除；删除的文件同样记入变更列表，部署步骤据此删除线上的副本
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            是否实际删除
+        """
+        path = Path(path)
+        key = self._key(path)
+        with self._lock:
+            self.hashes.pop(key, None)
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                return False
+            self.changed[key] = None
+            return True
+
+    def merge(self, hashes: Dict[str, str], changed: List[str], unchanged: int = 0):
+        """合并其他进程（如并行重建的工作进程）写入的文件记录"""
+        with self._lock:
+            self.hashes.update(hashes)
+            self.changed.update(dict.fromkeys(changed))
+            self.unchanged += unchanged
+
+    def _save_manifest(self):
+        data = json.dumps({"files": dict(sorted(self.hashes.items()))}, ensure_ascii=False, indent=2)
+        atomic_write(self.path, data.encode("utf-8"))
+
+    def save(self) -> List[str]:
+        """
+        保存清单并写出本次运行的变更文件列表（每行一个路径）
+
+        Returns:
+            变更文件列表
+        """
+        with self._lock:
+            self._save_manifest()
+            atomic_write(self.changed_path, "".join(f"{key}\n" for key in self.changed).encode("utf-8"))
+        print(f"🗂️ 构建清单: {len(self.changed)} 个文件变更，{self.unchanged} 个未变化")
+        return list(self.changed)
+
+
+_manifests: Dict[str, BuildManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_build_manifest(output_dir: str = None) -> BuildManifest:
+    """获取输出目录对应的共享构建清单（同一进程内的生成器共用）"""
+    key = str(Path(output_dir or OUTPUT_DIR).resolve())
+    with _manifests_lock:
+        if key not in _manifests:
+            _manifests[key] = BuildManifest(output_dir)
+        return _manifests[key]
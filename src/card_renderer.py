@@ -0,0 +1,282 @@
+"""
+本地卡片渲染模块
+用 Pillow 把 ImageGenerator._build_card_markdown 生成的精简 Markdown 绘制成分享卡片，不依赖网络：
+- 版式与 Firefly 卡片一致：渐变背景上的圆角内容卡片，标题、日期、分类标题、列表、粗体行和关键词
+- 字体对象按 (路径, 字号) 缓存，字符宽度按 (字体, 字号, 字符) 缓存，换行只做查表累加
+- 图片高度按实际排版结果计算，不依赖估算
+
+字体查找顺序：CARD_FONT_PATH → 项目 assets/fonts/ 下的字体 → 常见系统中文字体。
+"""
+import io
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.config import CARD_FONT_PATH
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = ImageDraw = ImageFont = None
+
+FONT_DIR = Path(__file__).parent.parent / "assets" / "fonts"
+FONT_SUFFIXES = (".ttf", ".otf", ".ttc")
+SYSTEM_CJK_FONTS = [
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSerifCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/opentype/source-han-sans/SourceHanSans-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/System/Library/Fonts/STHeiti Medium.ttc",
+    "C:/Windows/Fonts/msyh.ttc",
+    "C:/Windows/Fonts/simhei.ttf",
+]
+
+# 版式版本：修改配色、字号或排版规则时加一，使图片缓存失效
+CARD_LAYOUT_VERSION = 1
+
+# 配色
+BACKGROUND_TOP = (255, 246, 236)
+BACKGROUND_BOTTOM = (250, 222, 205)
+CARD_COLOR = (255, 255, 255)
+ACCENT_COLOR = (214, 96, 64)
+MUTED_COLOR = (120, 120, 120)
+DEFAULT_TEXT_COLOR = "rgba(0,0,0,0.8)"
+
+# 各类文本相对正文字号的比例
+BASE_FONT_SIZE = 16
+SIZE_RATIOS = {"title": 2.0, "subtitle": 1.2, "heading": 1.15, "bullet": 1.0, "bold": 1.0, "text": 1.0, "keywords": 0.9}
+LINE_HEIGHT_RATIO = 1.6
+
+# 不放在行首的标点（放不下时悬挂在上一行末尾）
+_NO_LINE_START = set("，。、；：！？）》」』】,.;:!?)")
+# 换行单位：连续的拉丁字母数字（及常见符号）、连续空白、单个其他字符
+_TOKEN_RE = re.compile(r"[A-Za-z0-9#@+&%'_./:\-]+|\s+|.")
+_RGBA_RE = re.compile(r"rgba?\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*(?:,\s*([\d.]+)\s*)?\)")
+
+
+class CardRendererUnavailable(RuntimeError):
+    """未安装 Pillow 或找不到中文字体"""
+
+
+@lru_cache(maxsize=1)
+def find_cjk_font() -> Optional[str]:
+    """按查找顺序返回第一个存在的中文字体路径"""
+    candidates = [CARD_FONT_PATH] if CARD_FONT_PATH else []
+    if FONT_DIR.exists():
+        candidates += sorted(str(p) for p in FONT_DIR.iterdir() if p.suffix.lower() in FONT_SUFFIXES)
+    candidates += SYSTEM_CJK_FONTS
+    for path in candidates:
+        if Path(path).is_file():
+            return path
+    return None
+
+
+@lru_cache(maxsize=32)
+def _load_font(path: str, size: int):
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=65536)
+def _char_width(path: str, size: int, char: str) -> float:
+    return _load_font(path, size).getlength(char)
+
+
+def text_width(path: str, size: int, text: str) -> float:
+    """文本宽度（逐字符查缓存累加，中文排版下与整体测量的差异可以忽略）"""
+    return sum(_char_width(path, size, ch) for ch in text)
+
+
+def wrap_text(text: str, path: str, size: int, max_width: float) -> List[str]:
+    """
+    按宽度折行：拉丁单词不拆开（单词本身超宽时按字符拆），行首标点悬挂到上一行
+
+    Args:
+        text: 文本
+        path: 字体路径
+        size: 字号
+        max_width: 最大行宽（像素）
+
+    Returns:
+        各行文本
+    """
+    lines, current, current_width = [], "", 0.0
+    for token in _TOKEN_RE.findall(text):
+        if token.isspace() and not current:
+            continue
+        width = text_width(path, size, token)
+        if current_width + width <= max_width or token in _NO_LINE_START or token.isspace():
+            current += token
+            current_width += width
+            continue
+        if current:
+            lines.append(current.rstrip())
+            current, current_width = "", 0.0
+        # 单个 token 超过整行宽度：按字符拆
+        for ch in token:
+            ch_width = _char_width(path, size, ch)
+            if current and current_width + ch_width > max_width:
+                lines.append(current)
+                current, current_width = "", 0.0
+            current += ch
+            current_width += ch_width
+    if current.strip():
+        lines.append(current.rstrip())
+    return lines or [""]
+
+
+def parse_color(value: str, background: Tuple[int, int, int] = CARD_COLOR) -> Tuple[int, int, int]:
+    """解析 rgb()/rgba() 颜色，带透明度时与背景色混合"""
+    match = _RGBA_RE.match((value or "").replace(" ", ""))
+    if not match:
+        return parse_color(DEFAULT_TEXT_COLOR, background)
+    r, g, b, alpha = match.groups()
+    alpha = float(alpha) if alpha is not None else 1.0
+    return tuple(round(int(c) * alpha + bg * (1 - alpha)) for c, bg in zip((r, g, b), background))
+
+
+def _classify(line: str) -> Tuple[str, str]:
+    """Markdown 行 -> (类型, 文本)"""
+    if line.startswith("# "):
+        return "title", line[2:]
+    if line.startswith("## "):
+        return "subtitle", line[3:]
+    if line.startswith("### "):
+        return "heading", line[4:]
+    if line.startswith(("- ", "* ")):
+        return "bullet", line[2:]
+    if line.startswith("**") and line.endswith("**") and len(line) > 4:
+        return "bold", line[2:-2]
+    if line.startswith("#") and all(word.startswith("#") for word in line.split()):
+        return "keywords", line
+    return "text", line
+
+
+class CardRenderer:
+    """Pillow 卡片渲染器"""
+
+    def __init__(self, font_path: str = None, scale: int = 2):
+        """
+        Args:
+            font_path: 字体路径，默认按查找顺序选择中文字体
+            scale: 输出倍率（2 为高清屏尺寸）
+
+        Raises:
+            CardRendererUnavailable: 未安装 Pillow 或找不到字体
+        """
+        if Image is None:
+            raise CardRendererUnavailable("未安装 Pillow")
+        self.font_path = font_path or find_cjk_font()
+        if not self.font_path:
+            raise CardRendererUnavailable("找不到中文字体，请设置 CARD_FONT_PATH 或将字体放入 assets/fonts/")
+        self.scale = scale
+
+    def _layout(self, markdown: str, text_width_px: float, font_scale: float, text_color) -> Tuple[list, float]:
+        """
+        排版：返回绘制指令 [(类型, x 偏移, y, 文本, 字号, 颜色)] 和内容总高度（均已乘倍率）
+        """
+        base = BASE_FONT_SIZE * font_scale * self.scale
+        ops, y = [], 0.0
+        previous = None
+        for raw in markdown.split("\n"):
+            line = raw.strip()
+            if not line:
+                y += base * 0.5
+                continue
+            kind, text = _classify(line)
+            text = text.replace("**", "")
+            size = round(base * SIZE_RATIOS[kind])
+            line_height = size * LINE_HEIGHT_RATIO
+
+            if kind == "heading" and previous is not None:
+                y += base * 0.6
+            indent = 0.0
+            if kind == "bullet":
+                indent = text_width(self.font_path, size, "• ")
+                ops.append(("marker", 0.0, y, "•", size, ACCENT_COLOR))
+            elif kind == "heading":
+                indent = size * 0.6
+                ops.append(("bar", 0.0, y + line_height * 0.2, "", size, ACCENT_COLOR))
+
+            color = {"subtitle": MUTED_COLOR, "heading": ACCENT_COLOR, "keywords": ACCENT_COLOR}.get(kind, text_color)
+            for wrapped in wrap_text(text, self.font_path, size, text_width_px - indent):
+                ops.append((kind, indent, y, wrapped, size, color))
+                y += line_height
+            if kind == "title":
+                y += base * 0.2
+            previous = kind
+        return ops, y
+
+    def render(
+        self,
+        markdown: str,
+        width: int,
+        padding: int = 24,
+        font_scale: float = 1.0,
+        border_radius: int = 15,
+        text_color: str = DEFAULT_TEXT_COLOR,
+        min_height: int = 0,
+        max_height: int = None
+    ) -> bytes:
+        """
+        渲染卡片
+
+        Args:
+            markdown: 卡片 Markdown（_build_card_markdown 的输出）
+            width: 卡片宽度（CSS 像素，实际输出乘以 scale）
+            padding: 背景边距与卡片内边距
+            font_scale: 字号缩放
+            border_radius: 卡片圆角
+            text_color: 正文颜色（rgb/rgba）
+            min_height: 最小高度
+            max_height: 最大高度，超出的内容不绘制
+
+        Returns:
+            PNG 图片数据
+        """
+        s = self.scale
+        pad = padding * s
+        text_color = parse_color(text_color)
+        ops, content_height = self._layout(markdown, width * s - 4 * pad, font_scale, text_color)
+
+        height = int(content_height + 4 * pad)
+        height = max(height, min_height * s)
+        if max_height:
+            height = min(height, max_height * s)
+        width_px = width * s
+
+        # 纵向渐变背景：先画 1 像素宽的一列再拉伸
+        column = Image.new("RGB", (1, height))
+        column.putdata([
+            tuple(round(t + (b - t) * y / max(height - 1, 1)) for t, b in zip(BACKGROUND_TOP, BACKGROUND_BOTTOM))
+            for y in range(height)
+        ])
+        image = column.resize((width_px, height), Image.NEAREST)
+        draw = ImageDraw.Draw(image)
+        draw.rounded_rectangle(
+            (pad, pad, width_px - pad, height - pad), radius=border_radius * s, fill=CARD_COLOR
+        )
+
+        left, top, bottom = 2 * pad, 2 * pad, height - 2 * pad
+        for kind, x, y, text, size, color in ops:
+            line_height = size * LINE_HEIGHT_RATIO
+            if top + y + line_height > bottom + pad:
+                break
+            if kind == "bar":
+                bar_width = max(2 * s, size // 6)
+                draw.rectangle((left, top + y, left + bar_width, top + y + line_height * 0.6), fill=color)
+                continue
+            bold = kind in ("title", "heading", "bold")
+            draw.text(
+                (left + x, top + y + (line_height - size) / 2), text,
+                font=_load_font(self.font_path, size), fill=color,
+                stroke_width=max(1, size // 28) if bold else 0, stroke_fill=color
+            )
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
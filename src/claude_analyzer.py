@@ -4,51 +4,185 @@ Claude 分析模块
 """
 import os
 import json
-from typing import Dict, Any, Optional
-from anthropic import Anthropic
+import time
+import atexit
+import asyncio
+import dataclasses
+import weakref
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Tuple
+from anthropic import AsyncAnthropic
 
 from src.config import (
     ANTHROPIC_BASE_URL,
     ZHIPU_API_KEY,
-    CLAUDE_MODEL,
-    CLAUDE_MAX_TOKENS,
+    ANTHROPIC_HEDGE_BASE_URL,
+    ANTHROPIC_HEDGE_API_KEY,
+    ANTHROPIC_HEDGE_DELAY,
+    ENABLE_ANALYSIS_CACHE,
+    ENTRY_BATCH_SIZE,
+    ENABLE_PRECLASSIFIER,
+    ENABLE_PRESUMMARIZE,
+    PROMPT_TOKEN_BUDGET,
     CATEGORIES,
     THEMES,
-    DEFAULT_THEME
+    DEFAULT_THEME,
+    guess_theme_from_content
 )
+from src.analysis_cache import AnalysisCache
+from src.pre_classifier import PreClassifier
+from src.keyword_extractor import KeywordExtractor
+from src.result_schema import (
+    ENTRIES_TOOL,
+    DAY_TOOL,
+    DAILY_RESULT_TOOL,
+    subset_tool,
+    clean_entry_item,
+    clean_fields,
+    parse_tool_response
+)
+from src.rate_limiter import RateLimiter, get_rate_limiter
+from src.token_budget import estimate_tokens, truncate_to_tokens
+from src.text_summarizer import summarize
+from src.retry import RetryPolicy, retry_async, hedge_async
+from src.model_router import ModelRouter, get_model_router
+from src.telemetry import LLMCallRecord, LLMLedger, get_ledger, estimate_cost
+
+# 当前这次分析的调用统计（并发的多次分析互不干扰）
+_run_stats: ContextVar[Optional[Dict[str, Any]]] = ContextVar("run_stats", default=None)
 
 
 class ClaudeAnalyzer:
     """Claude AI 分析器"""
 
-    def __init__(self, api_key: str = None, base_url: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = None,
+        rate_limiter: RateLimiter = None,
+        retry_policy: RetryPolicy = None,
+        hedge_base_url: str = None,
+        hedge_delay: float = None,
+        cache: AnalysisCache = None,
+        ledger: LLMLedger = None,
+        model_router: ModelRouter = None
+    ):
         """
         初始化 Claude 客户端
 
         Args:
             api_key: API 密钥，默认从环境变量读取
             base_url: API 基础 URL，默认从环境变量读取
+            rate_limiter: 限流器，默认使用该 base_url 共享的限流器
+            retry_policy: 重试策略，默认从环境变量读取
+            hedge_base_url: 对冲请求的备用 API 地址，为空时不启用对冲
+            hedge_delay: 主端点超过该秒数未响应时发送对冲请求
+            cache: 单条资讯分析缓存，默认按 ENABLE_ANALYSIS_CACHE 配置创建
+            ledger: LLM 调用记录账本，默认按 ENABLE_LLM_LEDGER 配置
+            model_router: 按调用阶段选择模型的路由器，默认按 MODEL_ROUTING 配置
         """
         self.api_key = api_key or ZHIPU_API_KEY
         self.base_url = base_url or ANTHROPIC_BASE_URL
-        self.model = CLAUDE_MODEL
-        self.max_tokens = CLAUDE_MAX_TOKENS
+        self.model_router = model_router or get_model_router()
+        self.rate_limiter = rate_limiter or get_rate_limiter(self.base_url)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedge_base_url = hedge_base_url or ANTHROPIC_HEDGE_BASE_URL
+        self.hedge_api_key = ANTHROPIC_HEDGE_API_KEY or self.api_key
+        self.hedge_delay = ANTHROPIC_HEDGE_DELAY if hedge_delay is None else hedge_delay
+        if cache is None and ENABLE_ANALYSIS_CACHE:
+            cache = AnalysisCache()
+        self.cache = cache
+        self.ledger = ledger if ledger is not None else get_ledger()
+
+        # 长原文在构建提示词前做抽取式预摘要
+        self.presummarize = ENABLE_PRESUMMARIZE
+
+        # 本地预分类器：种子词表 + 分析缓存中的历史结果
+        self.pre_classifier = None
+        if ENABLE_PRECLASSIFIER:
+            self.pre_classifier = PreClassifier()
+            if self.cache is not None:
+                self.pre_classifier.fit_cache(self.cache)
+
+        # 本地关键词/标签提取：内置词表 + DEFAULT_KEYWORDS + 分析缓存中的历史标签
+        self.keyword_extractor = KeywordExtractor()
+        if self.cache is not None:
+            self.keyword_extractor.fit_cache(self.cache)
 
         if not self.api_key:
             raise ValueError("ZHIPU_API_KEY 环境变量未设置")
 
+        # 每个事件循环共享一组 AsyncAnthropic 客户端（连接池不能跨事件循环复用）
+        self._clients = weakref.WeakKeyDictionary()
+        # 同步接口使用的事件循环，在分析器的整个生命周期内复用，close() 时关闭
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        print(f"✅ Claude 客户端初始化成功")
+        print(f"   Base URL: {self.base_url}")
+        print(f"   模型路由: {self.model_router.describe()}")
+        if self.hedge_base_url:
+            print(f"   对冲端点: {self.hedge_base_url} (阈值 {self.hedge_delay}s)")
+
+    def _get_client(self, base_url: str = None) -> AsyncAnthropic:
+        """获取当前事件循环中指定端点共享的客户端，不存在时创建"""
+        base_url = base_url or self.base_url
+        loop = asyncio.get_running_loop()
+        clients = self._clients.setdefault(loop, {})
+        client = clients.get(base_url)
+        if client is None:
+            try:
+                client = AsyncAnthropic(
+                    base_url=base_url,
+                    api_key=self.hedge_api_key if base_url == self.hedge_base_url else self.api_key,
+                    max_retries=0  # 重试由 retry_policy 统一控制
+                )
+            except Exception as e:
+                raise Exception(f"Claude 客户端初始化失败: {e}")
+            clients[base_url] = client
+        return client
+
+    async def aclose(self):
+        """关闭当前事件循环中的客户端连接池"""
+        loop = asyncio.get_running_loop()
+        clients = self._clients.pop(loop, {})
+        for client in clients.values():
+            await client.close()
+
+    def close(self):
+        """关闭同步接口使用的事件循环及其中的客户端连接池（可重复调用）"""
+        loop, self._loop = self._loop, None
+        if loop is None or loop.is_closed():
+            return
         try:
-            self.client = Anthropic(
-                base_url=self.base_url,
-                api_key=self.api_key
-            )
-            print(f"✅ Claude 客户端初始化成功")
-            print(f"   Base URL: {self.base_url}")
-            print(f"   Model: {self.model}")
-        except Exception as e:
-            raise Exception(f"Claude 客户端初始化失败: {e}")
+            loop.run_until_complete(self.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+    def __enter__(self) -> "ClaudeAnalyzer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def analyze(self, content: Dict[str, Any], target_date: str) -> Dict[str, Any]:
+        """
+        分析资讯内容（同步接口，不能在运行中的事件循环里调用）
+
+        多次调用复用同一个事件循环和客户端连接池，用完后调用 close() 或使用 with 语句释放
+
+        Args:
+            content: RSS 内容字典
+            target_date: 目标日期
+
+        Returns:
+            分析结果字典，见 analyze_async
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.analyze_async(content, target_date))
+
+    async def analyze_async(self, content: Dict[str, Any], target_date: str) -> Dict[str, Any]:
         """
         分析资讯内容
 
@@ -65,52 +199,421 @@ class ClaudeAnalyzer:
             - keywords: 关键词列表
             - categories: 分类资讯列表
         """
+        stats = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+        token = _run_stats.set(stats)
+        start = time.monotonic()
+        try:
+            return await self._analyze(content, target_date)
+        finally:
+            _run_stats.reset(token)
+            if stats["calls"]:
+                print(
+                    f"📊 本次分析: 调用 {stats['calls']} 次，"
+                    f"输入 {stats['input_tokens']} tokens，输出 {stats['output_tokens']} tokens，"
+                    f"估算费用 ${stats['cost_usd']:.4f}，耗时 {time.monotonic() - start:.1f}s"
+                )
+
+    async def _analyze(self, content: Dict[str, Any], target_date: str) -> Dict[str, Any]:
+        """分析流程主体，见 analyze_async"""
         if not content or not content.get("content"):
             return self._empty_result(target_date, "内容为空")
 
+        # 多源模式带有逐条资讯，走增量分析
+        if content.get("entries"):
+            try:
+                return await self._analyze_incremental(content, target_date)
+            except Exception as e:
+                print(f"❌ Claude API 调用失败: {e}")
+                return self._fallback_result(content, target_date)
+
         print(f"🤖 正在调用 Claude 分析内容...")
 
+        # 长文先做抽取式预摘要，再按 token 预算截断
+        prompt_content = content
+        if self.presummarize:
+            compressed = summarize(content["content"], max_tokens=PROMPT_TOKEN_BUDGET)
+            if compressed.saved_tokens > 0:
+                print(f"✂️ 预摘要: 约 {compressed.original_tokens} → {compressed.summary_tokens} tokens"
+                      f"（节省 {compressed.saved_tokens}）")
+                prompt_content = {**content, "content": compressed.text}
+
         # 构建提示词
-        prompt = self._build_prompt(content, target_date)
+        prompt = self._build_prompt(prompt_content, target_date)
+        fields = list(DAILY_RESULT_TOOL["input_schema"]["required"])
 
         try:
-            # 调用 Claude API
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=0.3,  # 较低温度保证稳定性
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
+            # 调用 Claude API，通过工具调用获取结构化结果
+            data = await self._call_tool(prompt, DAILY_RESULT_TOOL)
+            result, invalid = clean_fields(data, fields, keep_partial=True)
+
+            if len(invalid) == len(fields) and not result:
+                return self._parse_error_result(target_date, "响应中没有可用的结构化结果")
+
+            # 只重新请求无效的字段（含个别分类或资讯无效的 categories，重新请求失败时保留其有效部分）
+            if invalid:
+                result.update(await self._rerequest_fields(prompt, DAILY_RESULT_TOOL, invalid))
+
+            # 标签和关键词在本地提取
+            items = [item for cat in result.get("categories", []) for item in cat["items"]]
+            self.keyword_extractor.fill_tags(items)
+            result["keywords"] = self.keyword_extractor.extract_keywords(items) or self.keyword_extractor.extract_tags(
+                content.get("title", ""), content.get("content", ""), limit=10
             )
 
-            # 解析响应
-            result_text = response.content[0].text
-            print(f"✅ Claude 响应成功，响应长度: {len(result_text)} 字符")
+            return self._finalize_result(result, target_date)
 
-            # 解析 JSON 结果
-            result = self._parse_result(result_text, target_date)
+        except Exception as e:
+            print(f"❌ Claude API 调用失败: {e}")
+            return self._fallback_result(content, target_date)
 
-            return result
+    async def _analyze_incremental(self, content: Dict[str, Any], target_date: str) -> Dict[str, Any]:
+        """
+        增量分析：逐条分类和摘要（命中缓存的条目不再调用 LLM），
+        最后一次调用只生成日级摘要、关键词和主题
+        """
+        entries = content["entries"]
+        analyses: List[Optional[Dict[str, Any]]] = [
+            self.cache.get(entry) if self.cache is not None else None
+            for entry in entries
+        ]
+        missing = [i for i, analysis in enumerate(analyses) if analysis is None]
+        print(f"🤖 正在调用 Claude 增量分析 {len(entries)} 条资讯...")
+        print(f"   缓存命中: {len(entries) - len(missing)} 条，待分析: {len(missing)} 条")
+
+        # 本地预分类：高置信度条目只让 LLM 生成标题和摘要，不再输出分类
+        missing_entries = [entries[i] for i in missing]
+        if self.pre_classifier is not None:
+            labels = self.pre_classifier.classify(missing_entries)
+        else:
+            labels = [""] * len(missing)
+        hints = dict(zip(missing, labels))
+        if missing:
+            print(f"   本地预分类: {sum(1 for label in labels if label)}/{len(missing)} 条高置信度")
+
+        # 未命中的条目分批并发分析
+        batches = [missing[i:i + ENTRY_BATCH_SIZE] for i in range(0, len(missing), ENTRY_BATCH_SIZE)]
+        batch_results = await asyncio.gather(*[
+            self._analyze_entries(
+                [entries[i] for i in batch],
+                [hints[i] for i in batch]
+            )
+            for batch in batches
+        ])
+        fresh = []
+        for batch, results in zip(batches, batch_results):
+            for index, analysis in zip(batch, results):
+                if analysis is None:
+                    analyses[index] = self._fallback_entry_analysis(entries[index])
+                    continue
+                analyses[index] = analysis
+                fresh.append(index)
+
+        # 标签在本地提取（同时参考原始标题/内容和 LLM 生成的中文标题/摘要）
+        items = [
+            dict(
+                analysis,
+                url=entry.get("link", ""),
+                source_title=entry.get("title", ""),
+                source_summary=entry.get("summary", "")
+            )
+            for entry, analysis in zip(entries, analyses)
+        ]
+        self.keyword_extractor.fill_tags(items)
+
+        # 新分析的条目连同标签写入缓存（KeywordExtractor.fit_cache 用历史标签扩充别名词典）
+        if self.cache is not None:
+            for index in fresh:
+                self.cache.put(
+                    entries[index],
+                    dict(analyses[index], tags=items[index]["tags"]),
+                    llm_labelled=not hints[index]
+                )
+            self.cache.save()
+        day = await self._summarize_day(items, target_date)
+
+        result = {
+            "status": "success",
+            "date": target_date,
+            "theme": day["theme"],
+            "summary": day["summary"],
+            "keywords": self.keyword_extractor.extract_keywords(items) or ["AI"],
+            "categories": self._group_categories(items)
+        }
+
+        print(f"✅ 增量分析完成")
+        print(f"   主题: {result['theme']}")
+        print(f"   摘要数: {len(result['summary'])}")
+        print(f"   关键词数: {len(result['keywords'])}")
+        print(f"   分类数: {len(result['categories'])}")
+        return result
+
+    async def _analyze_entries(
+        self,
+        entries: List[Dict[str, Any]],
+        hints: List[str] = None,
+        retry_invalid: bool = True
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        对一批资讯逐条分类和摘要
+
+        Args:
+            entries: 资讯列表
+            hints: 本地预分类结果，非空的条目不再让 LLM 分类
+            retry_invalid: 是否单独重新请求无效的条目
 
+        Returns:
+            与 entries 顺序一致的分析结果，某条分析失败时对应位置为 None
+        """
+        hints = hints or [""] * len(entries)
+        prompt = self._build_entries_prompt(entries, hints)
+        try:
+            data = await self._call_tool(prompt, ENTRIES_TOOL)
         except Exception as e:
-            print(f"❌ Claude API 调用失败: {e}")
-            # 返回带有原始内容的结果，让生成器可以继续工作
-            return {
-                "status": "success",
-                "date": target_date,
-                "theme": DEFAULT_THEME,
-                "summary": [
-                    "AI 资讯分析遇到技术问题，以下是原始内容摘要",
-                    f"标题: {content.get('title', '')[:100]}..."
-                ],
-                "keywords": ["AI", "资讯"],
-                "categories": self._fallback_categories(content),
-                "raw_content": content
+            print(f"⚠️ 资讯分析失败，{len(entries)} 条资讯使用原始内容: {e}")
+            return [None] * len(entries)
+
+        items = data.get("items") if isinstance(data, dict) else None
+        by_id = {
+            item.get("id"): item
+            for item in (items if isinstance(items, list) else [])
+            if isinstance(item, dict)
+        }
+        results = []
+        for i, hint in enumerate(hints, 1):
+            analysis = clean_entry_item(by_id.get(i), need_category=not hint)
+            if analysis is not None and hint:
+                analysis["category"] = hint
+            results.append(analysis)
+
+        # 只重新请求无效或缺失的条目（每批最多重新请求一次）
+        invalid = [i for i, analysis in enumerate(results) if analysis is None]
+        if invalid and retry_invalid:
+            print(f"⚠️ {len(invalid)}/{len(entries)} 条资讯结果无效，单独重新请求")
+            retried = await self._analyze_entries(
+                [entries[i] for i in invalid],
+                [hints[i] for i in invalid],
+                retry_invalid=False
+            )
+            for i, analysis in zip(invalid, retried):
+                results[i] = analysis
+        return results
+
+    async def _summarize_day(self, items: List[Dict[str, Any]], target_date: str) -> Dict[str, Any]:
+        """根据逐条分析结果生成日级摘要和主题"""
+        prompt = self._build_day_prompt(items, target_date)
+        fields = list(DAY_TOOL["input_schema"]["required"])
+        day, invalid = {}, fields
+        try:
+            data = await self._call_tool(prompt, DAY_TOOL)
+            day, invalid = clean_fields(data, fields)
+            if invalid:
+                day.update(await self._rerequest_fields(prompt, DAY_TOOL, invalid))
+                invalid = [field for field in fields if field not in day]
+        except Exception as e:
+            print(f"⚠️ 日级摘要生成失败: {e}")
+
+        if invalid:
+            print(f"⚠️ 日级字段 {', '.join(invalid)} 不可用，使用资讯标题代替")
+            fallback = {
+                "theme": guess_theme_from_content({"categories": self._group_categories(items)}),
+                "summary": [item["title"] for item in items[:5]]
             }
+            for field in invalid:
+                day[field] = fallback[field]
+        return day
+
+    async def _call_tool(self, prompt: str, tool: Dict[str, Any]) -> Any:
+        """
+        通过强制工具调用请求结构化输出
+
+        Returns:
+            工具参数；代理不支持工具调用时为修复后的文本 JSON，无法解析时为 None
+        """
+        response = await self._create_message(
+            stage=tool["name"].replace("submit_", ""),
+            temperature=0.3,  # 较低温度保证稳定性
+            tools=[tool],
+            tool_choice={"type": "tool", "name": tool["name"]},
+            messages=[{"role": "user", "content": prompt}]
+        )
+        if response.stop_reason == "max_tokens":
+            print(f"⚠️ Claude 响应因 max_tokens 被截断，尝试修复")
+        return parse_tool_response(response, tool["name"])
+
+    async def _rerequest_fields(self, prompt: str, tool: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+        """
+        单独重新请求无效的顶层字段
+
+        Returns:
+            重新请求后有效的字段（仍然无效的字段不包含在内）
+        """
+        print(f"⚠️ 字段 {', '.join(fields)} 无效，单独重新请求")
+        try:
+            data = await self._call_tool(
+                f"{prompt}\n\n注意：本次只需提交以下字段: {', '.join(fields)}",
+                subset_tool(tool, fields)
+            )
+        except Exception as e:
+            print(f"⚠️ 重新请求失败: {e}")
+            return {}
+        valid, _ = clean_fields(data, fields)
+        return valid
+
+    def _group_categories(self, items: List[Dict[str, Any]]) -> list:
+        """按 CATEGORIES 顺序把逐条分析结果组装成分类列表（空分类省略）"""
+        categories = []
+        for key, info in CATEGORIES.items():
+            cat_items = [
+                {
+                    "title": item["title"],
+                    "summary": item["summary"],
+                    "url": item.get("url", ""),
+                    "tags": item.get("tags", [])
+                }
+                for item in items
+                if item["category"] == key
+            ]
+            if cat_items:
+                categories.append({
+                    "key": key,
+                    "name": info["name"],
+                    "icon": info["icon"],
+                    "items": cat_items
+                })
+        return categories
+
+    async def analyze_many_async(
+        self,
+        jobs: List[Tuple[Dict[str, Any], str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        并发分析多份内容（如多个日期、多个分块），由共享限流器控制节奏
+
+        Args:
+            jobs: (content, target_date) 列表
+
+        Returns:
+            与 jobs 顺序一致的分析结果列表
+        """
+        return await asyncio.gather(*[
+            self.analyze_async(content, target_date)
+            for content, target_date in jobs
+        ])
+
+    async def _create_message(self, stage: str = "analyze", **kwargs):
+        """
+        调用 Messages API：每次尝试都经过限流器，失败按重试策略退避重试，
+        配置了备用端点时对慢请求发起对冲；调用结果写入 LLM 调用账本
+
+        Args:
+            stage: 调用阶段，用于调用记录分组
+            **kwargs: messages.create 参数
+        """
+        tier = self.model_router.route(stage)
+        kwargs.setdefault("model", tier.model)
+        kwargs.setdefault("max_tokens", tier.max_tokens)
+
+        prompt_text = "".join(
+            message["content"] if isinstance(message["content"], str) else json.dumps(message["content"])
+            for message in kwargs.get("messages", [])
+        ) + json.dumps(kwargs.get("tools", []), ensure_ascii=False)
+        estimated = estimate_tokens(prompt_text) + kwargs["max_tokens"]
+
+        record = LLMCallRecord(
+            stage=stage,
+            model=kwargs["model"],
+            endpoint=self.base_url,
+            max_tokens=kwargs["max_tokens"]
+        )
+        # 主请求和对冲请求各自记录，结束后合并：用量取胜出的那一路，重试次数累加
+        attempts: List[LLMCallRecord] = []
+
+        def on_hedge(reason: str):
+            record.hedged = True
+            if reason == "slow":
+                print(f"⏱️ 主端点 {self.hedge_delay}s 内未响应，向备用端点发送对冲请求")
+            else:
+                print(f"⚠️ 主端点请求失败，切换到备用端点")
+
+        def attempt(base_url: str):
+            async def run():
+                attempt_record = dataclasses.replace(record, endpoint=base_url)
+                attempts.append(attempt_record)
+
+                def on_retry(retry: int, delay: float, error: Exception):
+                    attempt_record.retries += 1
+                    print(f"⚠️ Claude API 请求失败，{delay:.1f}s 后第 {retry} 次重试: {error}")
+
+                response = await retry_async(
+                    lambda: self._send(base_url, kwargs, estimated, attempt_record),
+                    self.retry_policy,
+                    on_retry
+                )
+                return response, attempt_record
+            return run
+
+        secondary = attempt(self.hedge_base_url) if self.hedge_base_url else None
+        start = time.monotonic()
+        try:
+            response, winner = await hedge_async(attempt(self.base_url), secondary, self.hedge_delay, on_hedge)
+            for field in ("endpoint", "input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens",
+                          "ttft_ms", "stop_reason", "cost_usd"):
+                setattr(record, field, getattr(winner, field))
+            return response
+        except Exception as e:
+            record.status = "error"
+            record.error = f"{type(e).__name__}: {e}"[:300]
+            raise
+        finally:
+            record.retries = sum(a.retries for a in attempts)
+            record.latency_ms = round((time.monotonic() - start) * 1000, 1)
+            if self.ledger is not None:
+                self.ledger.append(record)
+
+    async def _send(self, base_url: str, kwargs: Dict[str, Any], estimated: int, record: LLMCallRecord):
+        """
+        以流式请求向指定端点发送一次请求（用于测量首 token 延迟），
+        完成后按实际用量校正 TPM 预占并填写调用记录；
+        请求失败或被取消（如对冲落败）时归还预占的输出 token，只保留提示词部分
+        """
+        limiter = self.rate_limiter if base_url == self.base_url else get_rate_limiter(base_url)
+        # 排队等待时被取消由 acquire 归还全部预占；发出请求后按实际预占的 token 数校正
+        _, reserved = await limiter.acquire(estimated)
+        settled = False
+        try:
+            start = time.monotonic()
+            ttft = None
+            async with self._get_client(base_url).messages.stream(**kwargs) as stream:
+                async for event in stream:
+                    if ttft is None and event.type == "content_block_delta":
+                        ttft = time.monotonic() - start
+                response = await stream.get_final_message()
+
+            usage = response.usage
+            cache_read = usage.cache_read_input_tokens or 0
+            cache_write = usage.cache_creation_input_tokens or 0
+            limiter.settle(reserved, usage.input_tokens + cache_read + cache_write + usage.output_tokens)
+            settled = True
+        finally:
+            if not settled:
+                limiter.settle(reserved, estimated - kwargs["max_tokens"])
+
+        record.endpoint = base_url
+        record.input_tokens = usage.input_tokens
+        record.output_tokens = usage.output_tokens
+        record.cache_read_tokens = cache_read
+        record.cache_write_tokens = cache_write
+        record.ttft_ms = round(ttft * 1000, 1) if ttft is not None else None
+        record.stop_reason = response.stop_reason or ""
+        record.cost_usd = estimate_cost(record.model, usage.input_tokens, usage.output_tokens, cache_read, cache_write)
+
+        stats = _run_stats.get()
+        if stats is not None:
+            stats["calls"] += 1
+            stats["input_tokens"] += usage.input_tokens
+            stats["output_tokens"] += usage.output_tokens
+            stats["cost_usd"] += record.cost_usd or 0.0
+        return response
 
     def _build_prompt(self, content: Dict[str, Any], target_date: str) -> str:
         """构建 Claude 提示词"""
@@ -136,7 +639,7 @@ class ClaudeAnalyzer:
 链接: {content.get('link', '')}
 
 完整内容:
-{content.get('content', '')[:15000]}
+{truncate_to_tokens(content.get('content', ''), PROMPT_TOKEN_BUDGET)}
 
 ---
 
@@ -157,22 +660,14 @@ class ClaudeAnalyzer:
 
    每个分类包含:
    - key: 分类标识 (model/product/research/tools/funding/events)
-   - name: 分类名称
-   - icon: 分类图标
    - items: 该分类下的资讯列表
 
    每条资讯包含:
    - title: 简化版标题（适合快速浏览，不超过40字）
    - summary: 一句话核心要点（不超过80字）
    - url: 相关链接（如果有的话）
-   - tags: 相关标签（如公司名、产品名）
 
-4. **关键词提取** (keywords)
-   - 提取 5-10 个今日热门关键词
-   - 包括: 公司名称、人物、技术名词、产品名
-   - 去重并按重要性排序
-
-5. **主题选择** (theme)
+4. **主题选择** (theme)
    根据内容主类别选择最佳主题:
 {theme_desc}
 
@@ -188,98 +683,102 @@ class ClaudeAnalyzer:
 
 【输出格式】
 
-请严格按照以下 JSON 格式输出，不要包含任何其他文字说明：
-
-```json
-{{
-  "status": "success",
-  "date": "{target_date}",
-  "theme": "blue",
-  "summary": [
-    "第一条核心摘要",
-    "第二条核心摘要",
-    "第三条核心摘要"
-  ],
-  "keywords": ["Anthropic", "Google", "Claude", "MedGemma", "LangChain"],
-  "categories": [
-    {{
-      "key": "model",
-      "name": "模型发布",
-      "icon": "🤖",
-      "items": [
-        {{
-          "title": "MedGemma 1.5 发布",
-          "summary": "Google 发布 4B 参数医疗多模态模型，支持 3D 影像分析",
-          "url": "https://news.smol.ai/issues/26-01-13-not-much/",
-          "tags": ["Google", "MedGemma", "医疗AI"]
-        }}
-      ]
-    }},
-    {{
-      "key": "product",
-      "name": "产品动态",
-      "icon": "💼",
-      "items": []
-    }}
-  ]
-}}
-```
-
-重要：只输出 JSON，不要有任何其他说明文字。确保 JSON 格式正确有效。
+请调用 submit_daily_report 工具提交结果，不要输出其他文字说明。
+没有相关资讯的分类可以省略或 items 留空。
 """
         return prompt
 
-    def _parse_result(self, result_text: str, target_date: str) -> Dict[str, Any]:
-        """解析 Claude 的响应结果"""
-        # 清理可能的 markdown 代码块标记
-        result_text = result_text.strip()
-        if result_text.startswith("```json"):
-            result_text = result_text[7:]
-        if result_text.startswith("```"):
-            result_text = result_text[3:]
-        if result_text.endswith("```"):
-            result_text = result_text[:-3]
-        result_text = result_text.strip()
+    def _build_entries_prompt(self, entries: List[Dict[str, Any]], hints: List[str]) -> str:
+        """构建逐条资讯分类摘要的提示词（已预分类的条目标注分类，无需 LLM 输出）"""
+        category_desc = "\n".join([
+            f"- {key}: {cat['icon']} {cat['name']} - {cat['description']}"
+            for key, cat in CATEGORIES.items()
+        ])
 
-        try:
-            result = json.loads(result_text)
-
-            # 验证必要字段
-            if "status" not in result:
-                result["status"] = "success"
-            if "date" not in result:
-                result["date"] = target_date
-            if "theme" not in result:
-                result["theme"] = DEFAULT_THEME
-            if "summary" not in result:
-                result["summary"] = []
-            if "keywords" not in result:
-                result["keywords"] = []
-            if "categories" not in result:
-                result["categories"] = []
-
-            print(f"✅ 结果解析成功")
-            print(f"   主题: {result.get('theme')}")
-            print(f"   摘要数: {len(result.get('summary', []))}")
-            print(f"   关键词数: {len(result.get('keywords', []))}")
-            print(f"   分类数: {len(result.get('categories', []))}")
-
-            return result
-
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON 解析失败: {e}")
-            print(f"   原始响应: {result_text[:500]}...")
-
-            # 返回一个基本的成功结果，使用原始内容
-            return {
-                "status": "success",
-                "date": target_date,
-                "theme": DEFAULT_THEME,
-                "summary": ["AI 资讯已获取"],
-                "keywords": ["AI"],
-                "categories": [],
-                "parse_error": str(e)
-            }
+        entry_blocks = []
+        for i, (entry, hint) in enumerate(zip(entries, hints), 1):
+            lines = [f"[{i}] {entry.get('title', '')}", f"来源: {entry.get('source', '')}"]
+            if hint:
+                lines.append(f"已确定分类: {hint}")
+            lines.append(entry.get('summary', ''))
+            entry_blocks.append("\n".join(lines) + "\n")
+        entries_text = "\n".join(entry_blocks)
+
+        return f"""你是一个专业的 AI 资讯分析师，请逐条分析以下 {len(entries)} 条 AI 资讯。
+
+【资讯列表】
+{entries_text}
+---
+
+【任务要求】
+对每条资讯输出:
+- id: 资讯编号（与列表中的编号一致）
+- category: 分类标识（标注了「已确定分类」的资讯不要输出此字段），必须是以下之一:
+{category_desc}
+- title: 简化版中文标题（适合快速浏览，不超过40字）
+- summary: 一句话核心要点（不超过80字）
+
+【输出格式】
+请调用 submit_entries 工具提交结果，每条资讯都必须提交，不要输出其他文字说明。
+"""
+
+    def _build_day_prompt(self, items: List[Dict[str, Any]], target_date: str) -> str:
+        """构建日级摘要提示词（输入为逐条分析结果，而非原始内容）"""
+        theme_desc = "\n".join([
+            f"- {key}: {theme['name']} - {theme['description']}"
+            for key, theme in THEMES.items()
+        ])
+
+        items_text = "\n".join([
+            f"- [{item['category']}] {item['title']}: {item['summary']}"
+            for item in items
+        ])
+
+        return f"""你是一个专业的 AI 资讯分析师，以下是 {target_date} 已分类整理的 AI 资讯。
+
+【资讯列表】
+{items_text}
+
+---
+
+【任务要求】
+1. summary: 生成 3-5 条今日最重要的 AI 资讯要点，每条不超过 50 字，按重要性排序
+2. theme: 根据内容主类别选择最佳主题:
+{theme_desc}
+
+【输出格式】
+请调用 submit_daily_summary 工具提交结果，不要输出其他文字说明。
+"""
+
+    def _finalize_result(self, result: Dict[str, Any], target_date: str) -> Dict[str, Any]:
+        """补全日报结果的默认字段"""
+        result.setdefault("status", "success")
+        result["date"] = target_date
+        result.setdefault("theme", DEFAULT_THEME)
+        result.setdefault("summary", [])
+        result.setdefault("keywords", [])
+        result.setdefault("categories", [])
+
+        print(f"✅ 结果解析成功")
+        print(f"   主题: {result.get('theme')}")
+        print(f"   摘要数: {len(result.get('summary', []))}")
+        print(f"   关键词数: {len(result.get('keywords', []))}")
+        print(f"   分类数: {len(result.get('categories', []))}")
+
+        return result
+
+    def _parse_error_result(self, target_date: str, reason: str) -> Dict[str, Any]:
+        """结构化结果完全不可用时，返回一个基本的成功结果"""
+        print(f"❌ 结果解析失败: {reason}")
+        return {
+            "status": "success",
+            "date": target_date,
+            "theme": DEFAULT_THEME,
+            "summary": ["AI 资讯已获取"],
+            "keywords": ["AI"],
+            "categories": [],
+            "parse_error": reason
+        }
 
     def _empty_result(self, target_date: str, reason: str) -> Dict[str, Any]:
         """返回空结果"""
@@ -293,6 +792,29 @@ class ClaudeAnalyzer:
             "reason": reason
         }
 
+    def _fallback_result(self, content: Dict[str, Any], target_date: str) -> Dict[str, Any]:
+        """API 调用失败时返回带有原始内容的结果，让生成器可以继续工作"""
+        return {
+            "status": "success",
+            "date": target_date,
+            "theme": DEFAULT_THEME,
+            "summary": [
+                "AI 资讯分析遇到技术问题，以下是原始内容摘要",
+                f"标题: {content.get('title', '')[:100]}..."
+            ],
+            "keywords": ["AI", "资讯"],
+            "categories": self._fallback_categories(content),
+            "raw_content": content
+        }
+
+    def _fallback_entry_analysis(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """单条资讯分析失败时使用原始标题和内容"""
+        return {
+            "category": "model",
+            "title": entry.get("title", "")[:100],
+            "summary": entry.get("summary", "")[:200]
+        }
+
     def _fallback_categories(self, content: Dict[str, Any]) -> list:
         """当 Claude 解析失败时的备用分类"""
         # 简单地将原始内容作为一个通用资讯
@@ -317,7 +839,24 @@ class ClaudeAnalyzer:
         ]
 
 
+# 进程内共享的分析器，避免每次调用都新建客户端
+_shared_analyzer: Optional[ClaudeAnalyzer] = None
+
+
+def get_analyzer() -> ClaudeAnalyzer:
+    """获取进程内共享的分析器（进程退出时关闭）"""
+    global _shared_analyzer
+    if _shared_analyzer is None:
+        _shared_analyzer = ClaudeAnalyzer()
+        atexit.register(_shared_analyzer.close)
+    return _shared_analyzer
+
+
 def analyze_content(content: Dict[str, Any], target_date: str) -> Dict[str, Any]:
     """便捷函数：分析资讯内容"""
-    analyzer = ClaudeAnalyzer()
-    return analyzer.analyze(content, target_date)
+    return get_analyzer().analyze(content, target_date)
+
+
+async def analyze_content_async(content: Dict[str, Any], target_date: str) -> Dict[str, Any]:
+    """便捷函数：异步分析资讯内容"""
+    return await get_analyzer().analyze_async(content, target_date)
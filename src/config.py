@@ -3,6 +3,23 @@
 """
 import os
 
+
+def _get_env_int(key: str, default: int) -> int:
+    """获取整数环境变量，处理空字符串情况"""
+    value = os.getenv(key)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+def _get_env_float(key: str, default: float) -> float:
+    """获取浮点数环境变量，处理空字符串情况"""
+    value = os.getenv(key)
+    if value is None or value == "":
+        return default
+    return float(value)
+
+
 # ============================================================================
 # API 配置
 # ============================================================================
@@ -14,7 +31,57 @@ ZHIPU_API_KEY = os.getenv("ZHIPU_API_KEY")
 
 # Claude 模型配置
 CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-20241022")
-CLAUDE_MAX_TOKENS = 8192
+CLAUDE_MAX_TOKENS = _get_env_int("CLAUDE_MAX_TOKENS", 8192)
+
+# 模型分级：逐条分类和打标签使用小而快的模型，日级摘要和主题使用大模型
+CLAUDE_FAST_MODEL = os.getenv("CLAUDE_FAST_MODEL", "claude-3-5-haiku-20241022")
+CLAUDE_FAST_MAX_TOKENS = _get_env_int("CLAUDE_FAST_MAX_TOKENS", 4096)
+# 调用阶段 -> 模型级别（fast/large），格式 "entries=fast,daily_summary=large"，"*" 为其余阶段的默认级别
+# 默认 "*=large"：所有调用使用 CLAUDE_MODEL。确认 CLAUDE_FAST_MODEL 在所用端点可用且分类质量可接受后，
+# 设为 "entries=fast,*=large" 启用快速模型（可先用 benchmarks/bench_model_routing.py --live 对比）
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "*=large")
+
+# API 限流配置（令牌桶，同时限制每分钟请求数和每分钟 token 数）
+CLAUDE_RPM_LIMIT = _get_env_int("CLAUDE_RPM_LIMIT", 50)
+CLAUDE_TPM_LIMIT = _get_env_int("CLAUDE_TPM_LIMIT", 100000)
+
+# 失败重试配置（带抖动的指数退避，服务端返回 Retry-After 时优先遵循）
+CLAUDE_MAX_RETRIES = _get_env_int("CLAUDE_MAX_RETRIES", 3)
+CLAUDE_RETRY_BASE_DELAY = _get_env_float("CLAUDE_RETRY_BASE_DELAY", 1.0)  # 秒
+CLAUDE_RETRY_MAX_DELAY = _get_env_float("CLAUDE_RETRY_MAX_DELAY", 30.0)  # 秒
+
+# 对冲请求配置（可选）：主端点超过阈值仍未响应时，向备用端点发送同样的请求，先返回者胜出
+ANTHROPIC_HEDGE_BASE_URL = os.getenv("ANTHROPIC_HEDGE_BASE_URL", "")
+ANTHROPIC_HEDGE_API_KEY = os.getenv("ANTHROPIC_HEDGE_API_KEY", "")  # 为空时使用 ZHIPU_API_KEY
+ANTHROPIC_HEDGE_DELAY = _get_env_float("ANTHROPIC_HEDGE_DELAY", 20.0)  # 秒
+
+# 单条资讯分析缓存（规范化 URL + 内容哈希），只对新资讯调用 LLM
+ENABLE_ANALYSIS_CACHE = os.getenv("ENABLE_ANALYSIS_CACHE", "true").lower() == "true"
+ANALYSIS_CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR", ".cache/analysis")
+ANALYSIS_CACHE_MAX_AGE_DAYS = _get_env_int("ANALYSIS_CACHE_MAX_AGE_DAYS", 30)
+ENTRY_BATCH_SIZE = _get_env_int("ENTRY_BATCH_SIZE", 10)  # 每次请求分析的资讯条数
+
+# 本地预分类：置信度高于阈值的资讯不再让 LLM 输出分类
+ENABLE_PRECLASSIFIER = os.getenv("ENABLE_PRECLASSIFIER", "true").lower() == "true"
+PRECLASSIFY_CONFIDENCE = _get_env_float("PRECLASSIFY_CONFIDENCE", 0.8)
+
+# LLM 调用记录：每次调用的 token 用量、首 token 延迟、总延迟、重试次数和估算费用，追加写入 JSONL
+ENABLE_LLM_LEDGER = os.getenv("ENABLE_LLM_LEDGER", "true").lower() == "true"
+LLM_LEDGER_PATH = os.getenv("LLM_LEDGER_PATH", ".cache/llm_ledger.jsonl")
+
+# 模型单价（美元 / 百万 token），按模型名前缀匹配；缓存读取按输入单价的 10%，缓存写入按 125% 计
+MODEL_PRICING = {
+    "claude-3-5-sonnet": {"input": 3.0, "output": 15.0},
+    "claude-3-5-haiku": {"input": 0.8, "output": 4.0},
+    "claude-3-haiku": {"input": 0.25, "output": 1.25},
+    "claude-3-opus": {"input": 15.0, "output": 75.0},
+    "claude-sonnet-4": {"input": 3.0, "output": 15.0},
+    "claude-haiku-4": {"input": 1.0, "output": 5.0},
+    "claude-opus-4": {"input": 15.0, "output": 75.0},
+}
+# 代理端点或未收录的模型可通过环境变量指定单价
+CLAUDE_PRICE_INPUT = _get_env_float("CLAUDE_PRICE_INPUT", 0.0)
+CLAUDE_PRICE_OUTPUT = _get_env_float("CLAUDE_PRICE_OUTPUT", 0.0)
 
 # ============================================================================
 # RSS 配置
@@ -65,23 +132,64 @@ def _parse_keywords(filter_str: str) -> list:
 
 KEYWORDS = _parse_keywords(KEYWORDS_FILTER)
 
+# 相关度排序：多源模式下按 BM25 相关度（KEYWORDS 为查询）× 来源权重挑选送入 LLM 的资讯
+MAX_PROMPT_ENTRIES = _get_env_int("MAX_PROMPT_ENTRIES", 20)
+
+# 输入 token 预算：按相关度在预算内挑选资讯并分配每条摘录长度（token 为本地估算值）
+PROMPT_TOKEN_BUDGET = _get_env_int("PROMPT_TOKEN_BUDGET", 6000)
+ENTRY_MIN_EXCERPT_TOKENS = _get_env_int("ENTRY_MIN_EXCERPT_TOKENS", 60)
+ENTRY_MAX_EXCERPT_TOKENS = _get_env_int("ENTRY_MAX_EXCERPT_TOKENS", 400)
+
+# 抽取式预摘要（TextRank）：超过 SUMMARIZE_MIN_TOKENS 的长资讯在构建提示词前压缩到约 SUMMARY_COMPRESSION_RATIO
+ENABLE_PRESUMMARIZE = os.getenv("ENABLE_PRESUMMARIZE", "true").lower() == "true"
+SUMMARY_COMPRESSION_RATIO = _get_env_float("SUMMARY_COMPRESSION_RATIO", 0.4)
+SUMMARIZE_MIN_TOKENS = _get_env_int("SUMMARIZE_MIN_TOKENS", 300)
+
+# 来源权重：按子串匹配来源名称或链接（不区分大小写），未匹配的来源权重为 1.0
+# 环境变量格式 "smol.ai=1.5,hnrss.org=0.8"
+def _parse_weights(weights_str: str, default: dict) -> dict:
+    """解析 "键=权重" 形式的逗号分隔字符串"""
+    if not weights_str:
+        return default
+    weights = {}
+    for part in weights_str.split(","):
+        key, sep, value = part.partition("=")
+        if sep and key.strip():
+            weights[key.strip()] = float(value)
+    return weights
+
+SOURCE_WEIGHTS = _parse_weights(os.getenv("SOURCE_WEIGHTS", ""), {
+    "smol.ai": 1.5,  # 人工整理的 AI 日报
+    "hacker news": 1.0,
+})
+
 # ============================================================================
 # 输出配置
 # ============================================================================
 OUTPUT_DIR = os.getenv("OUTPUT_DIR", "docs")
+# 分析结果归档目录（每天一个规范化 JSON，用于离线重建页面）
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(OUTPUT_DIR, "data"))
+# 重建归档时的并行进程数，0 表示使用 CPU 核数
+REBUILD_WORKERS = _get_env_int("REBUILD_WORKERS", 0)
+# 本次运行变更的站点文件列表（相对 OUTPUT_DIR，每行一个），供部署步骤使用
+BUILD_CHANGED_FILES_PATH = os.getenv("BUILD_CHANGED_FILES_PATH", ".cache/changed_files.txt")
+# OUTPUT_DIR 的构建清单（文件内容哈希）保存位置：放在 .cache 中随缓存保留，不随站点发布
+BUILD_MANIFEST_PATH = os.getenv("BUILD_MANIFEST_PATH", ".cache/build-manifest.json")
+# 把页面用到的 CSS 规则内联到 <head>，完整样式表异步加载
+ENABLE_CRITICAL_CSS = os.getenv("ENABLE_CRITICAL_CSS", "true").lower() == "true"
+# 每个页面内联 CSS 的字节预算，超出时改为阻塞加载完整样式表
+CRITICAL_CSS_BUDGET = _get_env_int("CRITICAL_CSS_BUDGET", 8192)
+# 为变更的文本文件生成 .gz 预压缩文件（安装 brotli 时同时生成 .br）
+ENABLE_PRECOMPRESS = os.getenv("ENABLE_PRECOMPRESS", "true").lower() == "true"
+# 预压缩的并行线程数，0 表示使用 CPU 核数
+PRECOMPRESS_WORKERS = _get_env_int("PRECOMPRESS_WORKERS", 0)
 GITHUB_PAGES_URL = os.getenv("GITHUB_PAGES_URL", "")
+# feed.json / feed.xml 包含的最近天数
+FEED_MAX_ITEMS = _get_env_int("FEED_MAX_ITEMS", 20)
 
 # ============================================================================
 # 邮件通知配置
 # ============================================================================
-def _get_env_int(key: str, default: int) -> int:
-    """获取整数环境变量，处理空字符串情况"""
-    value = os.getenv(key)
-    if value is None or value == "":
-        return default
-    return int(value)
-
-
 SMTP_HOST = os.getenv("SMTP_HOST")
 SMTP_PORT = _get_env_int("SMTP_PORT", 587)
 SMTP_USER = os.getenv("SMTP_USER")
@@ -304,6 +412,25 @@ FIREFLY_DEFAULT_CONFIG = {
 # 是否启用图片生成功能
 ENABLE_IMAGE_GENERATION = os.getenv("ENABLE_IMAGE_GENERATION", "false").lower() == "true"
 
+# 卡片渲染后端：local（本地 Pillow 渲染，不需要网络）或 firefly（Firefly Card API）
+# local 不可用（未安装 Pillow 或找不到中文字体）时自动改用 firefly
+IMAGE_BACKEND = os.getenv("IMAGE_BACKEND", "local").lower()
+
+# 本地渲染使用的字体文件，留空时依次查找 assets/fonts/ 和常见系统中文字体
+CARD_FONT_PATH = os.getenv("CARD_FONT_PATH", "")
+
+# 卡片图片缓存：Markdown 和渲染参数都没变时复用上次生成的图片
+ENABLE_IMAGE_CACHE = os.getenv("ENABLE_IMAGE_CACHE", "true").lower() == "true"
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", ".cache/images")
+IMAGE_CACHE_MAX_AGE_DAYS = _get_env_int("IMAGE_CACHE_MAX_AGE_DAYS", 30)
+IMAGE_CACHE_MAX_MB = _get_env_int("IMAGE_CACHE_MAX_MB", 200)
+
+# 页面生成后并发执行的阶段超时（秒）：分享卡片 / 小红书封面，邮件 / 飞书通知
+IMAGE_STAGE_TIMEOUT = _get_env_float("IMAGE_STAGE_TIMEOUT", 120.0)
+NOTIFY_STAGE_TIMEOUT = _get_env_float("NOTIFY_STAGE_TIMEOUT", 60.0)
+# 图片阶段超时后，保存构建清单前最多再等待的秒数；仍未结束的图片不计入本次的变更列表
+IMAGE_STAGE_GRACE = _get_env_float("IMAGE_STAGE_GRACE", 30.0)
+
 
 def get_theme(theme_name: str) -> dict:
     """获取指定主题配置"""
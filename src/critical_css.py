@@ -0,0 +1,182 @@
+"""
+关键 CSS 模块
+完整样式表包含 8 种主题以及索引页、搜索页、空页面的样式，每个页面只用到其中一部分。
+构建时按页面实际出现的标签、class、id 和属性（如 data-theme）筛出用到的规则内联到 <head>，
+完整样式表改为异步加载，首屏渲染不再等待样式表下载：
+- 规则按选择器匹配：复合选择器中的标签、class、id、属性都在页面中出现即视为用到（伪类忽略）
+- @media 按内部规则筛选，@keyframes 只在用到的声明引用时保留
+- 筛选结果按页面特征缓存，同一页面类型、同一主题只计算一次
+- 页面特征可以从逐段渲染的输出中收集，不需要完整的页面字符串
+"""
+import re
+import html
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Optional, Tuple, Union
+
+# 页面中出现的标签、class、id、属性
+_TAG_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9-]*)")
+_ATTR_RE = re.compile(r"\s([a-zA-Z-]+)=\"([^\"]*)\"")
+# 选择器中的伪类、伪元素（含参数）
+_PSEUDO_RE = re.compile(r"::?[a-zA-Z-]+(?:\([^)]*\))?")
+_SELECTOR_PART_RE = re.compile(r"\[([a-zA-Z-]+)(?:=\"?([^\"\]]*)\"?)?\]|([.#]?)([a-zA-Z0-9_-]+)|\*")
+
+
+def _split_blocks(css: str) -> List[Tuple[str, str]]:
+    """把压缩后的样式表拆成顶层的 (前导, 块内容)，如 ("body", "margin:0") 或 ("@media (...)", "a{...}b{...}")"""
+    blocks = []
+    depth, start, body_start = 0, 0, 0
+    quote = None
+    for i, ch in enumerate(css):
+        if quote:
+            if ch == quote and css[i - 1] != "\\":
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "{":
+            if depth == 0:
+                body_start = i
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                blocks.append((css[start:body_start].strip(), css[body_start + 1:i]))
+                start = i + 1
+    return blocks
+
+
+class PageFeatures:
+    """
+    页面特征：标签、class、id 和属性（名称，以及选择器用到的属性的名称=值）。
+    可以逐段 feed 渲染输出：攒够 buffer_size 个字符后扫描到最后一个完整标签为止，
+    内存占用与页面大小无关（不记录 href 这类每条资讯都不同的属性值）
+    """
+
+    def __init__(self, value_attrs: FrozenSet[str] = frozenset(), buffer_size: int = 64 * 1024):
+        """
+        Args:
+            value_attrs: 需要记录取值的属性名（样式表属性选择器中出现的）
+            buffer_size: 缓冲字符数
+        """
+        self.tags = {"html", "head", "body"}
+        self.classes, self.ids, self.attrs = set(), set(), set()
+        self.value_attrs = value_attrs
+        self.buffer_size = buffer_size
+        self._pending: List[str] = []
+        self._pending_size = 0
+
+    def feed(self, text: str):
+        """处理一段 HTML（标签可以跨段）"""
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if self._pending_size < self.buffer_size:
+            return
+        text = "".join(self._pending)
+        cut = text.rfind(">") + 1
+        self._scan(text[:cut])
+        self._pending = [text[cut:]]
+        self._pending_size = len(text) - cut
+
+    def _scan(self, text: str):
+        self.tags.update(tag.lower() for tag in _TAG_RE.findall(text))
+        for name, value in _ATTR_RE.findall(text):
+            if name == "class":
+                self.classes.update(value.split())
+            elif name == "id":
+                self.ids.add(value)
+            self.attrs.add(name)
+            if name in self.value_attrs:
+                self.attrs.add(f"{name}={value}")
+
+    def key(self) -> Tuple[FrozenSet[str], ...]:
+        self._scan("".join(self._pending))
+        self._pending, self._pending_size = [], 0
+        return frozenset(self.tags), frozenset(self.classes), frozenset(self.ids), frozenset(self.attrs)
+
+
+def _selector_matches(selector: str, tags, classes, ids, attrs) -> bool:
+    """选择器中的所有标签、class、id、属性都在页面中出现"""
+    selector = _PSEUDO_RE.sub("", selector)
+    for attr, value, prefix, name in (m.groups() for m in _SELECTOR_PART_RE.finditer(selector)):
+        if attr:
+            if (f"{attr}={value}" if value is not None else attr) not in attrs:
+                return False
+        elif prefix == ".":
+            if name not in classes:
+                return False
+        elif prefix == "#":
+            if name not in ids:
+                return False
+        elif name and name.lower() not in tags:
+            return False
+    return True
+
+
+def _filter_rules(css: str, features: Tuple[FrozenSet[str], ...]) -> str:
+    """保留页面用到的规则"""
+    kept, keyframes = [], []
+    for prelude, body in _split_blocks(css):
+        if prelude.startswith("@keyframes"):
+            keyframes.append((prelude, body))
+        elif prelude.startswith("@"):
+            inner = _filter_rules(body, features)
+            if inner:
+                kept.append(f"{prelude}{{{inner}}}")
+        elif any(_selector_matches(selector, *features) for selector in prelude.split(",")):
+            kept.append(f"{prelude}{{{body}}}")
+
+    css_out = "".join(kept)
+    for prelude, body in keyframes:
+        name = prelude.split(None, 1)[1] if " " in prelude else ""
+        if name and name in css_out:
+            css_out += f"{prelude}{{{body}}}"
+    return css_out
+
+
+@lru_cache(maxsize=8)
+def _selector_attrs(css: str) -> FrozenSet[str]:
+    """样式表属性选择器中出现的属性名"""
+    return frozenset(re.findall(r"\[([a-zA-Z-]+)", css))
+
+
+@lru_cache(maxsize=64)
+def _critical_for(css: str, features: Tuple[FrozenSet[str], ...]) -> str:
+    return _filter_rules(css, features)
+
+
+def extract_critical_css(page: Union[str, Iterable[str]], css: str) -> str:
+    """
+    筛出页面用到的 CSS 规则
+
+    Args:
+        page: 页面 HTML，或逐段产出的渲染结果
+        css: 压缩后的完整样式表
+
+    Returns:
+        页面用到的规则（保持原顺序）
+    """
+    features = PageFeatures(_selector_attrs(css))
+    for chunk in ([page] if isinstance(page, str) else page):
+        features.feed(chunk)
+    return _critical_for(css, features.key())
+
+
+def stylesheet_tags(href: str, critical: Optional[str] = None) -> str:
+    """
+    样式表的 <head> 标签：有关键 CSS 时内联并异步加载完整样式表（不支持脚本时由 <noscript> 回退），
+    否则阻塞加载
+
+    Args:
+        href: 完整样式表链接
+        critical: 关键 CSS
+
+    Returns:
+        HTML 片段
+    """
+    href = html.escape(href, quote=True)
+    if critical is None:
+        return f"<link rel=\"stylesheet\" href=\"{href}\">"
+    return (
+        f"<style>{critical}</style>\n"
+        f"    <link rel=\"preload\" href=\"{href}\" as=\"style\" onload=\"this.onload=null;this.rel='stylesheet'\">\n"
+        f"    <noscript><link rel=\"stylesheet\" href=\"{href}\"></noscript>"
+    )
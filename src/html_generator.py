@@ -5,84 +5,39 @@ HTML 生成模块
 import os
 import json
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Tuple
 from pathlib import Path
 
 from src.config import (
     OUTPUT_DIR,
     THEMES,
     SITE_META,
-    GITHUB_PAGES_URL
+    GITHUB_PAGES_URL,
+    ENABLE_CRITICAL_CSS,
+    CRITICAL_CSS_BUDGET
 )
-
-
-class HTMLGenerator:
-    """HTML 页面生成器"""
-
-    def __init__(self, output_dir: str = None):
-        self.output_dir = Path(output_dir or OUTPUT_DIR)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-
-        # 复制 CSS 文件到输出目录
-        self._setup_css()
-
-    def _setup_css(self):
-        """确保 CSS 文件存在"""
-        css_dir = self.output_dir / "css"
-        css_dir.mkdir(parents=True, exist_ok=True)
-
-        # CSS 文件将在 templates 中处理
-        self.css_path = "css/styles.css"
-
-    def generate_daily(self, result: Dict[str, Any]) -> str:
-        """
-        生成日报 HTML 页面
-
-        Args:
-            result: Claude 分析结果
-
-        Returns:
-            生成的 HTML 文件路径
-        """
-        date = result.get("date", datetime.now().strftime("%Y-%m-%d"))
-        theme_name = result.get("theme", "blue")
-        theme = THEMES.get(theme_name, THEMES["blue"])
-
-        print(f"📄 正在生成 HTML 页面...")
-        print(f"   日期: {date}")
-        print(f"   主题: {theme['name']}")
-
-        # 构建 HTML
-        html_content = self._build_daily_html(result, theme)
-
-        # 写入文件
-        filename = f"{date}.html"
-        filepath = self.output_dir / filename
-
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-
-        print(f"✅ HTML 生成成功: {filepath}")
-
-        # 更新索引页
-        self.update_index(date, result)
-
-        return str(filepath)
-
-    def generate_empty(self, date: str, reason: str = "今日暂无资讯"):
-        """生成空状态页面"""
-        theme = THEMES["gray"]
-
-        html_content = f"""<!DOCTYPE html>
+from src.template_engine import Template
+from src.build_manifest import get_build_manifest
+from src.archive_index import ArchiveIndex
+from src.search_index import SearchIndex, SEARCH_JS
+from src.site_api import SiteAPI
+from src.result_archive import ResultArchive
+from src.minify import minify_css, minify_html_stream, fingerprint
+from src.precompress import precompress_changed
+from src.critical_css import extract_critical_css, stylesheet_tags
+
+
+DAILY_TEMPLATE = Template("""<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>AI Daily · {date} - 暂无资讯</title>
-    <meta name="description" content="{SITE_META['description']}">
-    <link rel="stylesheet" href="css/styles.css">
+    <title>AI Daily · {{ formatted_date }}</title>
+    <meta name="description" content="{{ site['description'] }}">
+    <meta name="keywords" content="{{ meta_keywords }}">
+    {{ stylesheet|safe }}
 </head>
-<body data-theme="gray">
+<body data-theme="{{ theme }}">
     <div class="background-glow"></div>
     <div class="geometric-lines"></div>
 
@@ -90,135 +45,189 @@ class HTMLGenerator:
         <header class="header">
             <div class="logo-icon">🤖</div>
             <h1>AI Daily</h1>
-            <div class="date-badge">{self._format_date(date)}</div>
+            <div class="date-badge">{{ formatted_date }}</div>
         </header>
 
         <main class="main-content">
-            <div class="empty-state">
-                <div class="empty-icon">📭</div>
-                <h2>今日暂无资讯</h2>
-                <p>目标日期: <strong>{date}</strong></p>
-                <p>原因: {reason}</p>
-                <a href="index.html" class="btn-primary">返回首页</a>
-            </div>
+            {% if summary %}
+            <section class="summary-card">
+                <h2 class="section-title">📌 今日核心摘要</h2>
+                <ul class="summary-list">
+                    {% for item in summary %}
+                    <li class="summary-item">{{ item }}</li>
+                    {% endfor %}
+                </ul>
+            </section>
+            {% endif %}
+            {% for cat in categories %}
+            <section class="category-section">
+                <div class="category-header">
+                    <span class="category-icon">{{ cat.get("icon", "📄") }}</span>
+                    <h2 class="category-title">{{ cat.get("name", "") }}</h2>
+                    <span class="category-count">{{ len(cat["items"]) }}</span>
+                </div>
+                <div class="news-grid">
+                    {% for item in cat["items"] %}
+                    <article class="news-card">
+                        <div class="news-card-header">
+                            <h3 class="news-title">{{ item.get("title", "") }}</h3>
+                            {% if item.get("url") %}
+                            <a href="{{ item["url"] }}" class="item-link" target="_blank" rel="noopener">详情</a>
+                            {% endif %}
+                        </div>
+                        <p class="news-summary">{{ item.get("summary", "") }}</p>
+                        {% if item.get("tags") %}
+                        <div class="item-tags">{% for i, tag in enumerate(item["tags"][:4]) %}{{ " " if i else "" }}<span class="tag">#{{ tag }}</span>{% endfor %}</div>
+                        {% endif %}
+                    </article>
+                    {% endfor %}
+                </div>
+            </section>
+            {% endfor %}
+            {% if keywords %}
+            <footer class="keywords-footer">
+                <p>#关键词: {{ " | ".join(keywords) }}</p>
+            </footer>
+            {% endif %}
         </main>
 
         <footer class="footer">
-            <p>© {datetime.now().year} {SITE_META['title']} · 由 Claude AI 自动生成</p>
+            <p>© {{ year }} {{ site['title'] }} · 由 Claude AI 智能生成</p>
         </footer>
     </div>
 </body>
-</html>"""
+</html>""", name="daily")
 
-        filename = f"{date}.html"
-        filepath = self.output_dir / filename
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+INDEX_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ title }}</title>
+    <meta name="description" content="{{ site['description'] }}">
+    {{ stylesheet|safe }}
+</head>
+<body data-theme="blue">
+    <div class="background-glow"></div>
+    <div class="geometric-lines"></div>
 
-        print(f"✅ 空页面生成成功: {filepath}")
-        return str(filepath)
+    <div class="container">
+        <header class="header header-center">
+            <div class="logo-icon">🤖</div>
+            <h1>AI Daily</h1>
+            <p class="subtitle">{{ site['subtitle'] }}</p>
+            <form class="search-form" action="{{ root }}search.html" role="search">
+                <input type="search" name="q" class="search-input" placeholder="搜索往期资讯">
+            </form>
+        </header>
 
-    def _build_daily_html(self, result: Dict[str, Any], theme: Dict[str, str]) -> str:
-        """构建日报 HTML"""
-        date = result.get("date", "")
-        summary = result.get("summary", [])
-        keywords = result.get("keywords", [])
-        categories = result.get("categories", [])
-
-        # 格式化日期
-        formatted_date = self._format_date(date)
-
-        # 构建摘要区块
-        summary_html = ""
-        if summary:
-            summary_items = "\n".join([
-                f'                <li class="summary-item">{item}</li>'
-                for item in summary
-            ])
-            summary_html = f"""
-            <section class="summary-card">
-                <h2 class="section-title">📌 今日核心摘要</h2>
-                <ul class="summary-list">
-{summary_items}
-                </ul>
+        <main class="main-content index-page">
+            {% if entries is not None %}
+            <section class="index-section">
+                <h2 class="section-title">{{ heading }}</h2>
+                <div class="index-entries">
+                    {% for entry in entries %}
+                    <article class="index-entry">
+                        <a href="{{ root }}{{ entry.get("url", "") }}" class="entry-link">
+                            <div class="entry-header">
+                                <span class="entry-date">{{ entry["formatted_date"] }}</span>
+                                <span class="entry-arrow">→</span>
+                            </div>
+                            <p class="entry-summary">{{ entry.get("summary", "") }}</p>
+                        </a>
+                    </article>
+                    {% endfor %}
+                    {% if not entries %}
+                    <p class="empty-message">暂无资讯记录</p>
+                    {% endif %}
+                </div>
             </section>
-"""
+            {% endif %}
+            {% if nav %}
+            <nav class="archive-pager">
+                {% for link in nav %}
+                <a href="{{ root }}{{ link["url"] }}" class="archive-pager-link">{{ link["label"] }}</a>
+                {% endfor %}
+            </nav>
+            {% endif %}
+            {% if groups %}
+            <section class="index-section">
+                <h2 class="section-title">{{ groups_heading }}</h2>
+                {% for group in groups %}
+                <div class="archive-group">
+                    <h3 class="archive-group-title"><a href="{{ root }}{{ group["url"] }}">{{ group["label"] }}</a></h3>
+                    <div class="archive-months">
+                        {% for month in group["months"] %}
+                        <a href="{{ root }}{{ month["url"] }}" class="archive-month">{{ month["label"] }}{% if month.get("count") %} <span class="archive-count">{{ month["count"] }}</span>{% endif %}</a>
+                        {% endfor %}
+                    </div>
+                </div>
+                {% endfor %}
+            </section>
+            {% endif %}
+        </main>
 
-        # 构建分类区块
-        categories_html = ""
-        for cat in categories:
-            if not cat.get("items"):
-                continue
+        <footer class="footer">
+            <p>© {{ year }} {{ site['title'] }} · 由 Claude AI 自动生成</p>
+        </footer>
+    </div>
+</body>
+</html>""", name="index")
 
-            cat_name = cat.get("name", "")
-            cat_icon = cat.get("icon", "📄")
-            cat_items = cat.get("items", [])
-
-            items_html = ""
-            for item in cat_items:
-                item_title = item.get("title", "")
-                item_summary = item.get("summary", "")
-                item_url = item.get("url", "")
-                item_tags = item.get("tags", [])
-
-                # 标签
-                tags_html = ""
-                if item_tags:
-                    tags_span = " ".join([f'<span class="tag">#{tag}</span>' for tag in item_tags[:4]])
-                    tags_html = f'<div class="item-tags">{tags_span}</div>'
-
-                # 链接处理
-                link_html = ""
-                if item_url:
-                    link_html = f'<a href="{item_url}" class="item-link" target="_blank" rel="noopener">详情</a>'
-
-                items_html += f"""
-                <article class="news-card">
-                    <div class="news-card-header">
-                        <h3 class="news-title">{item_title}</h3>
-                        {link_html}
-                    </div>
-                    <p class="news-summary">{item_summary}</p>
-                    {tags_html}
-                </article>
-"""
 
-            categories_html += f"""
-            <section class="category-section">
-                <div class="category-header">
-                    <span class="category-icon">{cat_icon}</span>
-                    <h2 class="category-title">{cat_name}</h2>
-                    <span class="category-count">{len(cat_items)}</span>
-                </div>
-                <div class="news-grid">
-{items_html}
-                </div>
+SEARCH_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>AI Daily - 搜索</title>
+    <meta name="description" content="{{ site['description'] }}">
+    {{ stylesheet|safe }}
+</head>
+<body data-theme="blue">
+    <div class="background-glow"></div>
+    <div class="geometric-lines"></div>
+
+    <div class="container">
+        <header class="header header-center">
+            <div class="logo-icon">🤖</div>
+            <h1>AI Daily</h1>
+            <form class="search-form" action="search.html" role="search">
+                <input type="search" name="q" id="search-input" class="search-input" placeholder="搜索往期资讯">
+            </form>
+        </header>
+
+        <main class="main-content index-page">
+            <section class="index-section">
+                <p class="search-status" id="search-status"></p>
+                <div class="index-entries" id="search-results"></div>
             </section>
-"""
+            <nav class="archive-pager">
+                <a href="index.html" class="archive-pager-link">首页</a>
+                <a href="archive/index.html" class="archive-pager-link">全部归档</a>
+            </nav>
+        </main>
 
-        # 关键词区块
-        keywords_html = ""
-        if keywords:
-            keywords_str = " | ".join(keywords)
-            keywords_html = f"""
-        <footer class="keywords-footer">
-            <p>#关键词: {keywords_str}</p>
+        <footer class="footer">
+            <p>© {{ year }} {{ site['title'] }} · 由 Claude AI 自动生成</p>
         </footer>
-"""
+    </div>
+    <script src="js/search.js"></script>
+</body>
+</html>""", name="search")
+
 
-        # 构建完整 HTML
-        html = f"""<!DOCTYPE html>
+EMPTY_TEMPLATE = Template("""<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>AI Daily · {formatted_date}</title>
-    <meta name="description" content="{SITE_META['description']}">
-    <meta name="keywords" content="{', '.join(keywords + SITE_META['keywords'])}">
-    <link rel="stylesheet" href="css/styles.css">
+    <title>AI Daily · {{ date }} - 暂无资讯</title>
+    <meta name="description" content="{{ site['description'] }}">
+    {{ stylesheet|safe }}
 </head>
-<body data-theme="{result.get('theme', 'blue')}">
+<body data-theme="gray">
     <div class="background-glow"></div>
     <div class="geometric-lines"></div>
 
@@ -226,23 +235,162 @@ class HTMLGenerator:
         <header class="header">
             <div class="logo-icon">🤖</div>
             <h1>AI Daily</h1>
-            <div class="date-badge">{formatted_date}</div>
+            <div class="date-badge">{{ formatted_date }}</div>
         </header>
 
         <main class="main-content">
-{summary_html}
-{categories_html}
-{keywords_html}
+            <div class="empty-state">
+                <div class="empty-icon">📭</div>
+                <h2>今日暂无资讯</h2>
+                <p>目标日期: <strong>{{ date }}</strong></p>
+                <p>原因: {{ reason }}</p>
+                <a href="index.html" class="btn-primary">返回首页</a>
+            </div>
         </main>
 
         <footer class="footer">
-            <p>© {datetime.now().year} {SITE_META['title']} · 由 Claude AI 智能生成</p>
+            <p>© {{ year }} {{ site['title'] }} · 由 Claude AI 自动生成</p>
         </footer>
     </div>
 </body>
-</html>"""
+</html>""", name="empty")
+
+
+class HTMLGenerator:
+    """HTML 页面生成器"""
+
+    def __init__(self, output_dir: str = None):
+        self.output_dir = Path(output_dir or OUTPUT_DIR)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # 内容没变的文件不重写
+        self.manifest = get_build_manifest(self.output_dir)
+        self._archive_index = None
+        self._search_index = None
+        self._site_api = None
+        # 各页面内联的关键 CSS 字节数（相对输出目录的路径 -> 字节数）
+        self.critical_css_bytes: Dict[str, int] = {}
+
+        # 复制 CSS 文件到输出目录
+        self._setup_css()
+
+    def _setup_css(self):
+        """确保 CSS 目录存在，样式表路径带压缩后内容的哈希（内容不变则路径不变，可长期缓存）"""
+        css_dir = self.output_dir / "css"
+        css_dir.mkdir(parents=True, exist_ok=True)
+
+        self.css_path = f"css/styles.{fingerprint(self._get_minified_css())}.css"
+
+    def generate_daily(self, result: Dict[str, Any]) -> str:
+        """
+        生成日报 HTML 页面
+
+        Args:
+            result: Claude 分析结果
+
+        Returns:
+            生成的 HTML 文件路径
+        """
+        date = result.get("date", datetime.now().strftime("%Y-%m-%d"))
+        theme_name = result.get("theme", "blue")
+        theme = THEMES.get(theme_name, THEMES["blue"])
+
+        print(f"📄 正在生成 HTML 页面...")
+        print(f"   日期: {date}")
+        print(f"   主题: {theme['name']}")
+
+        filepath, written = self.write_daily_page(result)
+        if written:
+            print(f"✅ HTML 生成成功: {filepath}")
+        else:
+            print(f"✅ HTML 内容未变化: {filepath}")
+        critical = self.critical_css_bytes.get(filepath.name)
+        if critical is not None:
+            print(f"   关键 CSS: {critical / 1024:.1f}KB（预算 {CRITICAL_CSS_BUDGET / 1024:.1f}KB）")
+
+        # 更新索引页
+        self.update_index(date, result)
 
-        return html
+        return str(filepath)
+
+    def write_daily_page(self, result: Dict[str, Any]) -> Tuple[Path, bool]:
+        """
+        渲染并写入日报页（不更新索引、不输出日志），供 generate_daily 和归档重建使用
+
+        Returns:
+            (文件路径, 是否实际写入)
+        """
+        date = result.get("date", datetime.now().strftime("%Y-%m-%d"))
+        filepath = self.output_dir / f"{date}.html"
+        return filepath, self._write_page(filepath, DAILY_TEMPLATE, **self._daily_context(result))
+
+    def generate_empty(self, date: str, reason: str = "今日暂无资讯"):
+        """生成空状态页面"""
+        filepath, _ = self.write_empty_page(date, reason)
+        print(f"✅ 空页面生成成功: {filepath}")
+        return str(filepath)
+
+    def write_empty_page(self, date: str, reason: str = "今日暂无资讯") -> Tuple[Path, bool]:
+        """渲染并写入空状态页面，返回 (文件路径, 是否实际写入)"""
+        filepath = self.output_dir / f"{date}.html"
+        return filepath, self._write_page(
+            filepath,
+            EMPTY_TEMPLATE,
+            date=date,
+            formatted_date=self._format_date(date),
+            reason=reason,
+            site=SITE_META,
+            year=datetime.now().year
+        )
+
+    def _write_page(self, path: Path, template: Template, **context) -> bool:
+        """
+        渲染并写入页面：第一遍渲染只收集页面特征得到关键 CSS，第二遍逐段压缩后写入缓冲文件流，
+        两遍都不在内存中拼出完整页面，页面再大内存占用也基本不变；内容没变时不替换原文件
+
+        Args:
+            path: 输出路径
+            template: 页面模板
+            **context: 渲染上下文（stylesheet 由本方法生成）
+
+        Returns:
+            是否实际写入
+        """
+        return self.manifest.write_stream(path, minify_html_stream(self._page_chunks(path, template, **context)))
+
+    def _page_chunks(self, path: Path, template: Template, **context) -> Iterator[str]:
+        """
+        页面的未压缩分段：先按页面特征提取关键 CSS（超出预算时不内联），再逐段渲染
+
+        Args:
+            path: 输出路径（用于记录关键 CSS 大小）
+            template: 页面模板
+            **context: 渲染上下文（stylesheet 由本方法生成）
+        """
+        href = f"{context.get('root') or ''}{self.css_path}"
+        critical = None
+        if ENABLE_CRITICAL_CSS:
+            critical = extract_critical_css(template.render_iter(stylesheet="", **context), self._get_minified_css())
+            size = len(critical.encode("utf-8"))
+            self.critical_css_bytes[path.relative_to(self.output_dir).as_posix()] = size
+            if size > CRITICAL_CSS_BUDGET:
+                print(f"⚠️ 关键 CSS 超出预算: {path.name} {size}B > {CRITICAL_CSS_BUDGET}B，改为阻塞加载完整样式表")
+                critical = None
+
+        return template.render_iter(stylesheet=stylesheet_tags(href, critical), **context)
+
+    def _daily_context(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """日报模板的渲染上下文"""
+        keywords = result.get("keywords", [])
+        return {
+            "formatted_date": self._format_date(result.get("date", "")),
+            "theme": result.get("theme", "blue"),
+            "summary": result.get("summary", []),
+            "keywords": keywords,
+            "meta_keywords": ", ".join(keywords + SITE_META["keywords"]),
+            "categories": [cat for cat in result.get("categories", []) if cat.get("items")],
+            "site": SITE_META,
+            "year": datetime.now().year,
+        }
 
     def _format_date(self, date_str: str) -> str:
         """格式化日期显示"""
@@ -255,22 +403,118 @@ class HTMLGenerator:
         except:
             return date_str
 
+    @property
+    def archive_index(self) -> ArchiveIndex:
+        """按月分片的归档索引（首次使用时创建，会导入旧的 .index.json）"""
+        if self._archive_index is None:
+            self._archive_index = ArchiveIndex(self.output_dir, self.manifest)
+            if self._archive_index.migrated:
+                self._write_archive_pages()
+        return self._archive_index
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """站内搜索的倒排索引"""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self.output_dir, self.manifest)
+        return self._search_index
+
+    @property
+    def site_api(self) -> SiteAPI:
+        """按日期的 JSON 接口和订阅源"""
+        if self._site_api is None:
+            self._site_api = SiteAPI(self.output_dir, self.manifest)
+        return self._site_api
+
     def update_index(self, date: str, result: Dict[str, Any] = None):
-        """更新索引页"""
-        index_file = self.output_dir / "index.html"
+        """
+        更新索引：只改写当月分片、当月和当年的归档页以及首页；
+        新月份第一天额外更新相邻月份的归档页（翻页链接）和归档总页；
+        有资讯时把当天加入搜索索引（只改写涉及的分片），并更新 JSON 接口和订阅源
+        """
+        if result and result.get("categories"):
+            shards = self.search_index.add({**result, "date": date})
+            print(f"🔎 搜索索引已更新: {shards} 个分片")
+            self.site_api.add({**result, "date": date})
+            print(f"📡 接口与订阅源已更新: api/{date}.json, feed.json, feed.xml")
+        self._write_search_page()
+
+        index = self.archive_index
+        new_month = index.add(self._index_entry(date, result, index.get(date)))
+
+        month = date[:7]
+        self._write_month_page(month)
+        self._write_year_page(month[:4])
+        if new_month:
+            for neighbor in index.neighbors(month).values():
+                if neighbor:
+                    self._write_month_page(neighbor)
+            self._write_archive_root()
+
+        if self._write_landing_page():
+            print(f"✅ 索引页已更新")
+        else:
+            print(f"✅ 索引页未变化")
+
+    def sync_with_archive(self, archive: ResultArchive, pending: str = None) -> bool:
+        """
+        检查增量状态是否完整：归档中有索引里没有的日期（站点状态没有恢复、索引文件丢失），
+        或者有索引却缺少搜索索引、JSON 接口时，按全部归档重建，避免只含当天的文件覆盖已发布的历史
 
-        # 读取现有索引数据
-        index_data_file = self.output_dir / ".index.json"
-        existing_entries = []
+        Args:
+            archive: 分析结果归档
+            pending: 本次正在生成、尚未写入索引的日期
 
-        if index_data_file.exists():
-            with open(index_data_file, 'r', encoding='utf-8') as f:
-                try:
-                    existing_entries = json.load(f)
-                except:
-                    existing_entries = []
+        Returns:
+            是否重建
+        """
+        index = self.archive_index
+        indexed = {entry["date"] for month in index.months() for entry in index.load_shard(month["month"])}
+        missing = set(archive.dates()) - indexed - {pending}
+        incomplete = bool(indexed) and not (
+            self.search_index.meta() and (self.site_api.api_dir / "index.json").exists()
+        )
+        if not missing and not incomplete:
+            return False
+        print(f"⚠️ 站点索引不完整（索引 {len(indexed)} 天，归档中另有 {len(missing)} 天未索引），按归档重建...")
+        self.rebuild_index([result for result in archive if result.get("date")])
+        return True
+
+    def rebuild_index(self, results: List[Dict[str, Any]]) -> bool:
+        """
+        按归档的全部分析结果重建索引分片、归档页、搜索索引、JSON 接口、订阅源和首页
 
-        # 添加新条目
+        Returns:
+            首页是否有变化
+        """
+        index = self.archive_index
+        previous = {}
+        for month in index.months():
+            previous.update({entry["date"]: entry for entry in index.load_shard(month["month"])})
+        index.rebuild([self._index_entry(r["date"], r, previous.get(r["date"])) for r in results])
+        self._write_archive_pages()
+        published = [r for r in results if r.get("categories")]
+        self.search_index.rebuild(published)
+        self.site_api.rebuild(published)
+        self._write_search_page()
+        return self._write_landing_page()
+
+    def _write_search_page(self):
+        """搜索页和搜索脚本（内容不变时由构建清单跳过）"""
+        self.manifest.write(self.output_dir / "js" / "search.js", SEARCH_JS)
+        self._write_page(self.output_dir / "search.html", SEARCH_TEMPLATE, site=SITE_META, year=datetime.now().year)
+
+    def _write_archive_pages(self):
+        """生成全部月、年归档页和归档总页"""
+        months = [m["month"] for m in self.archive_index.months()]
+        for month in months:
+            self._write_month_page(month)
+        for year in sorted({month[:4] for month in months}):
+            self._write_year_page(year)
+        self._write_archive_root()
+
+    def _index_entry(self, date: str, result: Dict[str, Any], previous: Dict[str, Any] = None) -> Dict[str, Any]:
+        """索引条目：取第一条摘要；内容没变时沿用原时间戳，索引文件才能保持不变"""
         summary = result.get("summary", []) if result else []
         summary_text = summary[0] if summary else "暂无摘要"
 
@@ -280,102 +524,116 @@ class HTMLGenerator:
             "summary": summary_text[:100],
             "timestamp": datetime.now().isoformat()
         }
-
-        # 检查是否已存在
-        existing_entries = [e for e in existing_entries if e["date"] != date]
-        existing_entries.insert(0, new_entry)
-
-        # 只保留最近 30 天
-        existing_entries = existing_entries[:30]
-
-        # 保存索引数据
-        with open(index_data_file, 'w', encoding='utf-8') as f:
-            json.dump(existing_entries, f, ensure_ascii=False, indent=2)
-
-        # 生成索引页 HTML
-        html_content = self._build_index_html(existing_entries)
-
-        with open(index_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-
-        print(f"✅ 索引页已更新")
-
-    def _build_index_html(self, entries: List[Dict[str, Any]]) -> str:
-        """构建索引页 HTML"""
-        # 构建条目列表
-        entries_html = ""
-        for entry in entries:
-            date = entry.get("date", "")
-            url = entry.get("url", "")
-            summary = entry.get("summary", "")
-            formatted_date = self._format_date(date)
-
-            entries_html += f"""
-            <article class="index-entry">
-                <a href="{url}" class="entry-link">
-                    <div class="entry-header">
-                        <span class="entry-date">{formatted_date}</span>
-                        <span class="entry-arrow">→</span>
-                    </div>
-                    <p class="entry-summary">{summary}</p>
-                </a>
-            </article>
-"""
-
-        # 如果没有条目
-        if not entries_html:
-            entries_html = '<p class="empty-message">暂无资讯记录</p>'
-
-        html = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>AI Daily - AI 资讯日报</title>
-    <meta name="description" content="{SITE_META['description']}">
-    <link rel="stylesheet" href="css/styles.css">
-</head>
-<body data-theme="blue">
-    <div class="background-glow"></div>
-    <div class="geometric-lines"></div>
-
-    <div class="container">
-        <header class="header header-center">
-            <div class="logo-icon">🤖</div>
-            <h1>AI Daily</h1>
-            <p class="subtitle">{SITE_META['subtitle']}</p>
-        </header>
-
-        <main class="main-content index-page">
-            <section class="index-section">
-                <h2 class="section-title">📅 资讯归档</h2>
-                <div class="index-entries">
-{entries_html}
-                </div>
-            </section>
-        </main>
-
-        <footer class="footer">
-            <p>© {datetime.now().year} {SITE_META['title']} · 由 Claude AI 自动生成</p>
-        </footer>
-    </div>
-</body>
-</html>"""
-
-        return html
+        if previous and previous.get("summary") == new_entry["summary"]:
+            new_entry["timestamp"] = previous.get("timestamp", new_entry["timestamp"])
+        return new_entry
+
+    @staticmethod
+    def _month_url(month: str) -> str:
+        return f"archive/{month[:4]}/{month[5:7]}.html"
+
+    @staticmethod
+    def _month_label(month: str) -> str:
+        return f"{int(month[5:7])}月"
+
+    def _year_groups(self, with_counts: bool, year: str = None) -> List[Dict[str, Any]]:
+        """按年分组的月份链接"""
+        groups: Dict[str, Dict[str, Any]] = {}
+        for month in self.archive_index.months():
+            name = month["month"][:4]
+            if year and name != year:
+                continue
+            group = groups.setdefault(name, {"label": f"{name} 年", "url": f"archive/{name}/index.html", "months": []})
+            group["months"].append({
+                "label": self._month_label(month["month"]),
+                "url": self._month_url(month["month"]),
+                "count": month["count"] if with_counts else None
+            })
+        return list(groups.values())
+
+    def _render_index_page(self, path: Path, root: str, **context) -> bool:
+        """渲染索引类页面并写入，返回是否有变化"""
+        entries = context.pop("entries", None)
+        if entries is not None:
+            entries = [{**entry, "formatted_date": self._format_date(entry.get("date", ""))} for entry in entries]
+        return self._write_page(
+            path,
+            INDEX_TEMPLATE,
+            root=root,
+            entries=entries,
+            site=SITE_META,
+            year=datetime.now().year,
+            **context
+        )
+
+    def _write_landing_page(self) -> bool:
+        """首页：最近 30 天 + 按年月的归档入口"""
+        return self._render_index_page(
+            self.output_dir / "index.html",
+            root="",
+            title="AI Daily - AI 资讯日报",
+            heading="📅 资讯归档",
+            entries=self.archive_index.recent(30),
+            groups=self._year_groups(with_counts=True),
+            groups_heading="🗂️ 按月浏览"
+        )
+
+    def _write_month_page(self, month: str) -> bool:
+        """月归档页：当月全部条目 + 相邻月份翻页"""
+        neighbors = self.archive_index.neighbors(month)
+        nav = []
+        if neighbors["newer"]:
+            nav.append({"label": f"← {neighbors['newer']}", "url": self._month_url(neighbors["newer"])})
+        nav.append({"label": f"{month[:4]} 年", "url": f"archive/{month[:4]}/index.html"})
+        if neighbors["older"]:
+            nav.append({"label": f"{neighbors['older']} →", "url": self._month_url(neighbors["older"])})
+        return self._render_index_page(
+            self.output_dir / self._month_url(month),
+            root="../../",
+            title=f"AI Daily - {month[:4]}年{self._month_label(month)}",
+            heading=f"📅 {month[:4]}年{self._month_label(month)}",
+            entries=self.archive_index.load_shard(month),
+            nav=nav
+        )
+
+    def _write_year_page(self, year: str) -> bool:
+        """年归档页：当年各月份及条目数"""
+        return self._render_index_page(
+            self.output_dir / "archive" / year / "index.html",
+            root="../../",
+            title=f"AI Daily - {year} 年",
+            nav=[{"label": "全部归档", "url": "archive/index.html"}, {"label": "首页", "url": "index.html"}],
+            groups=self._year_groups(with_counts=True, year=year),
+            groups_heading=f"🗂️ {year} 年"
+        )
+
+    def _write_archive_root(self) -> bool:
+        """归档总页：全部年份和月份（不含条目数，只在新增月份时变化）"""
+        return self._render_index_page(
+            self.output_dir / "archive" / "index.html",
+            root="../",
+            title="AI Daily - 全部归档",
+            nav=[{"label": "首页", "url": "index.html"}],
+            groups=self._year_groups(with_counts=False),
+            groups_heading="🗂️ 全部归档"
+        )
 
     def generate_css(self):
-        """生成 CSS 文件"""
-        css_content = self._get_css_content()
+        """生成压缩后的 CSS 文件（带指纹的文件名，内容不变时不重写）"""
+        css_content = self._get_minified_css()
 
-        css_dir = self.output_dir / "css"
-        css_dir.mkdir(parents=True, exist_ok=True)
+        css_file = self.output_dir / self.css_path
+        if self.manifest.write(css_file, css_content):
+            print(f"✅ CSS 文件已生成: {css_file}")
+        else:
+            print(f"✅ CSS 文件未变化: {css_file}")
 
-        css_file = css_dir / "styles.css"
-        with open(css_file, 'w', encoding='utf-8') as f:
-            f.write(css_content)
+        # 之前生成、尚未重新渲染的页面仍引用固定路径
+        self.manifest.write(self.output_dir / "css" / "styles.css", css_content)
 
-        print(f"✅ CSS 文件已生成: {css_file}")
+    def _get_minified_css(self) -> str:
+        """压缩后的 CSS（同一源码只压缩一次）"""
+        return minify_css(self._get_css_content())
 
     def _get_css_content(self) -> str:
         """获取 CSS 内容"""
@@ -867,6 +1125,83 @@ body {
     color: var(--secondary-color);
 }
 
+/* ========================================
+   按月归档
+   ======================================== */
+.archive-pager {
+    display: flex;
+    justify-content: space-between;
+    gap: 16px;
+    margin-bottom: 40px;
+}
+
+.archive-pager-link,
+.archive-month {
+    padding: 8px 16px;
+    border-radius: 8px;
+    border: 1px solid rgba(255, 255, 255, 0.08);
+    background: rgba(255, 255, 255, 0.03);
+    color: var(--title-color);
+    text-decoration: none;
+    font-size: 14px;
+}
+
+.archive-pager-link:hover,
+.archive-month:hover {
+    border-color: var(--accent-color);
+}
+
+.archive-group {
+    margin-bottom: 24px;
+}
+
+.archive-group-title a {
+    color: var(--title-color);
+    text-decoration: none;
+    font-size: 18px;
+}
+
+.archive-months {
+    display: flex;
+    flex-wrap: wrap;
+    gap: 8px;
+    margin-top: 12px;
+}
+
+.archive-count {
+    color: var(--accent-color);
+    font-size: 12px;
+}
+
+/* ========================================
+   搜索
+   ======================================== */
+.search-form {
+    margin-top: 24px;
+}
+
+.search-input {
+    width: 100%;
+    max-width: 480px;
+    padding: 12px 20px;
+    border-radius: 24px;
+    border: 1px solid rgba(255, 255, 255, 0.12);
+    background: rgba(255, 255, 255, 0.05);
+    color: var(--title-color);
+    font-size: 15px;
+    outline: none;
+}
+
+.search-input:focus {
+    border-color: var(--accent-color);
+}
+
+.search-status {
+    color: var(--secondary-color);
+    font-size: 14px;
+    margin-bottom: 16px;
+}
+
 /* ========================================
    页脚
    ======================================== */
@@ -945,4 +1280,7 @@ def generate_daily_html(result: Dict[str, Any]) -> str:
     """便捷函数：生成日报 HTML"""
     generator = HTMLGenerator()
     generator.generate_css()
-    return generator.generate_daily(result)
+    path = generator.generate_daily(result)
+    precompress_changed(generator.manifest)
+    generator.manifest.save()
+    return path
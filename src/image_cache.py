@@ -0,0 +1,92 @@
+"""
+卡片图片缓存模块
+以「渲染后端 + 完整请求参数（Markdown、宽高、比例、边距、字号、模板等）」的哈希为键缓存生成的 PNG，
+同一天重跑或回填历史日期时，内容和参数都没变就直接复用，不再调用 Firefly API 或重新渲染：
+- 每个键一个文件 {key}.png，命中时刷新文件 mtime 作为最近使用时间
+- 写入后按最近使用时间淘汰：先删除超过 IMAGE_CACHE_MAX_AGE_DAYS 未使用的，再从最旧的开始删到总大小不超过上限
+"""
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.config import IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_AGE_DAYS, IMAGE_CACHE_MAX_MB
+from src.build_manifest import atomic_write
+
+
+def image_cache_key(request_data: Dict[str, Any], backend: str) -> str:
+    """
+    计算缓存键
+
+    Args:
+        request_data: 生成图片的完整参数（含 content）
+        backend: 渲染后端标识（如 "firefly:{api_url}"、"local:{字体}"），不同后端的图片互不复用
+
+    Returns:
+        SHA-256 十六进制摘要
+    """
+    payload = json.dumps({"backend": backend, "request": request_data}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ImageCache:
+    """内容寻址的图片缓存（每个键一个 PNG 文件）"""
+
+    def __init__(self, cache_dir: str = None, max_age_days: int = None, max_bytes: int = None):
+        """
+        Args:
+            cache_dir: 缓存目录
+            max_age_days: 超过该天数未被使用的图片在写入时淘汰（0 表示不按时间淘汰）
+            max_bytes: 缓存总大小上限（0 表示不限制）
+        """
+        self.cache_dir = Path(cache_dir or IMAGE_CACHE_DIR)
+        self.max_age_days = IMAGE_CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        self.max_bytes = IMAGE_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.png"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """查询缓存，命中时刷新使用时间"""
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes):
+        """写入缓存并淘汰过期、超量的图片"""
+        atomic_write(self.path(key), data)
+        self.evict()
+
+    def evict(self) -> int:
+        """按最近使用时间淘汰，返回淘汰的文件数"""
+        if not self.cache_dir.exists():
+            return 0
+        files = []
+        for path in self.cache_dir.glob("*.png"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort(key=lambda f: f[0], reverse=True)
+
+        cutoff = time.time() - self.max_age_days * 86400 if self.max_age_days > 0 else None
+        kept_bytes, removed, full = 0, 0, False
+        for mtime, size, path in files:
+            # 超出大小上限后，比它更旧的图片即使更小也一并淘汰（严格按最近使用时间）
+            full = full or bool(self.max_bytes and kept_bytes + size > self.max_bytes)
+            if full or (cutoff is not None and mtime < cutoff):
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+                continue
+            kept_bytes += size
+        return removed
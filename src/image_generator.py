@@ -1,6 +1,7 @@
 """
 图片生成模块
-使用 Firefly Card API 将 Markdown 内容转换为精美图片
+将 Markdown 内容转换为精美图片：默认在本地用 Pillow 渲染（src/card_renderer.py），
+也可以通过 IMAGE_BACKEND=firefly 调用 Firefly Card API
 根据内容长度和结构智能调整尺寸和排版参数
 """
 import os
@@ -15,8 +16,13 @@ from src.config import (
     FIREFLY_API_KEY,
     FIREFLY_DEFAULT_CONFIG,
     ENABLE_IMAGE_GENERATION,
+    IMAGE_BACKEND,
+    ENABLE_IMAGE_CACHE,
     OUTPUT_DIR
 )
+from src.build_manifest import get_build_manifest
+from src.card_renderer import CardRenderer, CardRendererUnavailable, CARD_LAYOUT_VERSION
+from src.image_cache import ImageCache, image_cache_key
 
 
 @dataclass
@@ -33,7 +39,7 @@ class ContentAnalysis:
 
 
 class ImageGenerator:
-    """Firefly Card API 图片生成器"""
+    """卡片图片生成器（本地渲染或 Firefly Card API）"""
 
     # 尺寸配置
     MIN_WIDTH = 480
@@ -48,18 +54,21 @@ class ImageGenerator:
     LINE_HEIGHT_RATIO = 1.8   # 行高与字号比 - 增加以获得更好效果
     PADDING_RATIO = 0.08      # 边距占宽度比例 - 减少 padding
 
-    def __init__(self, api_url: str = None, api_key: str = None):
+    def __init__(self, api_url: str = None, api_key: str = None, backend: str = None):
         """
         初始化图片生成器
 
         Args:
             api_url: Firefly API 地址
             api_key: API 密钥（如果需要）
+            backend: 渲染后端 local / firefly，默认 IMAGE_BACKEND
         """
         self.api_url = api_url or FIREFLY_API_URL
         self.api_key = api_key or FIREFLY_API_KEY
         self.default_config = FIREFLY_DEFAULT_CONFIG.copy()
         self.enabled = ENABLE_IMAGE_GENERATION
+        self.backend = (backend or IMAGE_BACKEND).lower()
+        self.cache = ImageCache() if ENABLE_IMAGE_CACHE else None
 
     def _analyze_content(self, content: str) -> ContentAnalysis:
         """
@@ -306,6 +315,17 @@ class ImageGenerator:
 
         request_data["content"] = markdown_content
 
+        if self.backend == "local":
+            try:
+                return self._generate_local(request_data, output_path)
+            except CardRendererUnavailable as e:
+                print(f"   ⚠️ 本地渲染不可用（{e}），改用 Firefly API")
+
+        cache_key = image_cache_key(request_data, f"firefly:{self.api_url}")
+        cached_path = self._from_cache(cache_key, output_path)
+        if cached_path:
+            return cached_path
+
         # 如果有 API Key，添加到请求头
         headers = {
             "Content-Type": "application/json"
@@ -335,18 +355,11 @@ class ImageGenerator:
                 image_bytes = response.content
 
                 # 确定保存路径
-                if not output_path:
-                    output_dir = Path(OUTPUT_DIR) / "images"
-                    output_dir.mkdir(parents=True, exist_ok=True)
-                    # 使用日期作为文件名
-                    from datetime import datetime
-                    date_str = datetime.now().strftime("%Y-%m-%d")
-                    output_path = str(output_dir / f"{date_str}.png")
+                output_path = output_path or self._default_output_path()
 
                 # 保存图片
-                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-                with open(output_path, 'wb') as f:
-                    f.write(image_bytes)
+                get_build_manifest().write(output_path, image_bytes)
+                self._store_cache(cache_key, image_bytes)
 
                 print(f"   图片已保存: {output_path}")
                 print(f"   文件大小: {len(image_bytes)} bytes")
@@ -375,9 +388,8 @@ class ImageGenerator:
                             output_dir.mkdir(parents=True, exist_ok=True)
                             output_path = str(output_dir / "daily-card.png")
 
-                        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-                        with open(output_path, 'wb') as f:
-                            f.write(image_bytes)
+                        get_build_manifest().write(output_path, image_bytes)
+                        self._store_cache(cache_key, image_bytes)
 
                         print(f"   图片已保存: {output_path}")
                         return output_path
@@ -402,6 +414,73 @@ class ImageGenerator:
             print(f"   图片生成失败: {e}")
             return None
 
+    def _default_output_path(self) -> str:
+        """默认保存路径：docs/images/{当天日期}.png"""
+        from datetime import datetime
+        output_dir = Path(OUTPUT_DIR) / "images"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        return str(output_dir / f"{datetime.now().strftime('%Y-%m-%d')}.png")
+
+    def _from_cache(self, cache_key: str, output_path: str = None) -> Optional[str]:
+        """缓存命中时把图片写到保存路径（经构建清单写入，内容相同则不重写），返回保存路径"""
+        if self.cache is None:
+            return None
+        image_bytes = self.cache.get(cache_key)
+        if image_bytes is None:
+            return None
+        output_path = output_path or self._default_output_path()
+        get_build_manifest().write(output_path, image_bytes)
+        print(f"   ♻️ 图片缓存命中，跳过生成: {output_path}")
+        return output_path
+
+    def _store_cache(self, cache_key: str, image_bytes: bytes):
+        if self.cache is None:
+            return
+        try:
+            self.cache.put(cache_key, image_bytes)
+        except OSError as e:
+            print(f"   ⚠️ 图片缓存写入失败: {e}")
+
+    def _generate_local(self, request_data: Dict[str, Any], output_path: str = None) -> str:
+        """
+        本地渲染卡片（与 API 请求使用同一份尺寸和排版参数）
+
+        Args:
+            request_data: 合并后的请求参数
+            output_path: 图片保存路径
+
+        Returns:
+            图片保存路径
+
+        Raises:
+            CardRendererUnavailable: 未安装 Pillow 或找不到中文字体
+        """
+        renderer = CardRenderer()
+        cache_key = image_cache_key(
+            request_data, f"local:{Path(renderer.font_path).name}:{renderer.scale}:{CARD_LAYOUT_VERSION}"
+        )
+        cached_path = self._from_cache(cache_key, output_path)
+        if cached_path:
+            return cached_path
+
+        print(f"   正在本地渲染卡片（字体: {Path(renderer.font_path).name}）...")
+        image_bytes = renderer.render(
+            request_data["content"],
+            width=request_data["width"],
+            padding=request_data["padding"],
+            font_scale=request_data["fontScale"],
+            border_radius=request_data.get("borderRadius", 15),
+            text_color=request_data.get("textColor"),
+            min_height=self.MIN_HEIGHT,
+            max_height=self.MAX_HEIGHT
+        )
+        output_path = output_path or self._default_output_path()
+        get_build_manifest().write(output_path, image_bytes)
+        self._store_cache(cache_key, image_bytes)
+        print(f"   图片已保存: {output_path}")
+        print(f"   文件大小: {len(image_bytes)} bytes")
+        return output_path
+
     def generate_from_analysis_result(
         self,
         analysis_result: Dict[str, Any],
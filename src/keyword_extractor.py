@@ -0,0 +1,279 @@
+"""
+本地关键词与标签提取模块
+LLM 调用后在本地为每条资讯生成标签、为当日生成关键词，不再占用模型的输出 token：
+- 别名词典：内置公司/产品词表 + DEFAULT_KEYWORDS + 历史分析结果中的常见标签，别名统一为规范名
+- RAKE 风格候选短语：英文文本按停用词切分，保留含专有名词或版本号的短语，覆盖词典外的新产品名
+- TF-IDF 加权：历史资讯中频繁出现的词（如 AI、LLM）权重降低
+"""
+import re
+import math
+from collections import Counter, defaultdict
+from typing import Dict, Any, List, Iterable, Tuple
+
+from src.config import DEFAULT_KEYWORDS
+
+# 内置实体词表：规范名 -> 别名（匹配时不区分大小写）
+ENTITY_ALIASES = {
+    "OpenAI": ["openai", "open ai"],
+    "Anthropic": ["anthropic"],
+    "Google": ["google", "谷歌"],
+    "DeepMind": ["deepmind", "google deepmind"],
+    "Microsoft": ["microsoft", "微软"],
+    "Meta": ["meta", "meta ai"],
+    "Apple": ["apple", "苹果公司"],
+    "Amazon": ["amazon", "aws", "亚马逊"],
+    "NVIDIA": ["nvidia", "英伟达"],
+    "xAI": ["xai"],
+    "Mistral": ["mistral", "mistral ai"],
+    "Hugging Face": ["hugging face", "huggingface"],
+    "DeepSeek": ["deepseek", "深度求索"],
+    "阿里巴巴": ["alibaba", "阿里", "阿里云"],
+    "字节跳动": ["bytedance", "字节"],
+    "腾讯": ["tencent"],
+    "百度": ["baidu"],
+    "智谱": ["zhipu", "智谱ai"],
+    "月之暗面": ["moonshot", "kimi"],
+    "Claude": ["claude"],
+    "Claude Code": ["claude code"],
+    "ChatGPT": ["chatgpt", "chat gpt"],
+    "Gemini": ["gemini"],
+    "Gemma": ["gemma"],
+    "Llama": ["llama"],
+    "Qwen": ["qwen", "通义千问", "千问"],
+    "Grok": ["grok"],
+    "Copilot": ["copilot", "github copilot"],
+    "Cursor": ["cursor"],
+    "Sora": ["sora"],
+    "Midjourney": ["midjourney"],
+    "Stable Diffusion": ["stable diffusion"],
+    "LangChain": ["langchain"],
+    "LlamaIndex": ["llamaindex", "llama index"],
+    "MCP": ["mcp", "model context protocol"],
+    "RAG": ["rag", "检索增强"],
+    "GitHub": ["github"],
+    "Sam Altman": ["sam altman", "altman"],
+    "Dario Amodei": ["dario amodei"],
+    "Elon Musk": ["elon musk", "musk", "马斯克"],
+    "Jensen Huang": ["jensen huang", "黄仁勋"],
+}
+
+# 过于宽泛的词，打分时降权
+GENERIC_TERMS = {"AI", "LLM", "agent", "skill", "plugin", "workflow", "automation", "GitHub"}
+GENERIC_WEIGHT = 0.3
+# 词典实体相对 RAKE 候选短语的加权
+ENTITY_BOOST = 2.0
+# 标题中出现的权重（正文为 1）
+TITLE_WEIGHT = 2.0
+# 历史标签至少出现在这么多条资讯中才加入别名词典
+TAG_ALIAS_MIN_DF = 2
+# 从历史标签学到的别名数上限（按出现的资讯数从多到少保留），词典和匹配正则不随归档无限增长
+TAG_ALIAS_LIMIT = 500
+
+_STOPWORDS = set("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers him his how i if in into is it its itself just me more most my new no nor not now of off
+on once only or other our out over own same she should so some such than that the their them then there
+these they this those through to too under until up very was we were what when where which while who whom
+why will with would you your via vs using use used uses now today week says said launch launches launched
+release releases released announces announced introduces introducing show ask hn tell how-to guide
+""".split())
+
+_WORD_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9+#.\-]*[A-Za-z0-9+#]|[A-Za-z0-9]")
+_PHRASE_SPLIT_RE = re.compile(r"[^A-Za-z0-9+#.\-\s]+|\s-\s|\.\s|\.$")
+# 版本号：纯数字或带小数点的数字（如 4、1.5）
+_VERSION_RE = re.compile(r"^\d+(\.\d+)*$")
+
+
+def _is_proper(token: str) -> bool:
+    """专有名词风格的词：首字母大写、全大写缩写或以字母开头的字母数字混合词（如 o3）"""
+    return token[0].isupper() or (token[0].isalpha() and any(c.isdigit() for c in token))
+
+
+def rake_candidates(text: str, max_words: int = 3) -> List[str]:
+    """
+    RAKE 风格候选短语：按标点和停用词切分英文文本，保留含专有名词的短语
+
+    Returns:
+        候选短语列表（保留原始大小写，可重复）
+    """
+    candidates = []
+    for chunk in _PHRASE_SPLIT_RE.split(text or ""):
+        phrase = []
+        for token in _WORD_RE.findall(chunk) + [""]:
+            is_version = bool(_VERSION_RE.match(token))
+            if token and token.lower() not in _STOPWORDS and not is_version:
+                phrase.append(token)
+                continue
+            # 版本号紧跟在专有名词后时保留（如 MedGemma 1.5）
+            if is_version and phrase and _is_proper(phrase[-1]):
+                phrase.append(token)
+                continue
+            # 去掉首尾的普通小写词，只保留专有名词部分（版本号保留）
+            proper = [i for i, word in enumerate(phrase) if _is_proper(word) or _VERSION_RE.match(word)]
+            if proper and any(_is_proper(word) for word in phrase):
+                phrase = phrase[proper[0]:proper[-1] + 1]
+                if len(phrase) <= max_words and len(phrase[0]) > 1:
+                    candidates.append(" ".join(phrase))
+            phrase = []
+    return candidates
+
+
+class KeywordExtractor:
+    """基于别名词典和 TF-IDF 的关键词/标签提取器"""
+
+    def __init__(self, aliases: Dict[str, List[str]] = None):
+        """
+        Args:
+            aliases: 额外的 {规范名: 别名列表}
+        """
+        self.alias_map: Dict[str, str] = {}
+        self.doc_freq: Counter = Counter()
+        self.doc_total = 0
+        for keyword in DEFAULT_KEYWORDS:
+            self.add_alias(keyword, [keyword])
+        for canonical, names in {**ENTITY_ALIASES, **(aliases or {})}.items():
+            self.add_alias(canonical, names)
+
+    def add_alias(self, canonical: str, names: Iterable[str]):
+        """添加实体及其别名（已有的别名不覆盖）"""
+        for name in [canonical, *names]:
+            key = name.strip().lower()
+            if key:
+                self.alias_map.setdefault(key, canonical)
+        self._pattern = None
+
+    @property
+    def pattern(self) -> re.Pattern:
+        """
+        所有别名的匹配正则：长别名优先，英文别名要求词边界（连字符不算边界，meta 不匹配 meta-learning），
+        可带版本号后缀（如 gpt-5、claude 4、gemini 2.5、gpt-4o）
+        """
+        if self._pattern is None:
+            names = "|".join(re.escape(name) for name in sorted(self.alias_map, key=len, reverse=True))
+            self._pattern = re.compile(
+                rf"(?<![a-z0-9\-])({names})(?![a-z0-9]|-(?!v?\d))([\s\-]v?\d{{1,2}}(?:\.\d+)?o?(?![a-z0-9]))?"
+            )
+        return self._pattern
+
+    def match_entities(self, text: str) -> List[str]:
+        """词典匹配，返回规范名（带版本号时为「规范名 + 版本号」）列表，可重复"""
+        return [
+            self.alias_map[match.group(1)] + (match.group(2) or "")
+            for match in self.pattern.finditer((text or "").lower())
+        ]
+
+    def _terms(self, text: str) -> List[Tuple[str, bool]]:
+        """文本中的 (词, 是否词典实体)，包含词典实体的 RAKE 短语由实体代替"""
+        terms = [(entity, True) for entity in self.match_entities(text)]
+        for phrase in rake_candidates(text):
+            if not self.pattern.search(phrase.lower()):
+                terms.append((phrase, False))
+        return terms
+
+    def fit(
+        self,
+        documents: Iterable[Tuple[str, List[str]]],
+        min_tag_df: int = TAG_ALIAS_MIN_DF,
+        max_tag_aliases: int = TAG_ALIAS_LIMIT
+    ) -> "KeywordExtractor":
+        """
+        用历史资讯训练：常见的历史标签加入别名词典，统计文档频率用于 IDF
+
+        Args:
+            documents: (资讯文本, 历史标签) 迭代器
+            min_tag_df: 标签至少出现在多少条资讯中才加入词典
+            max_tag_aliases: 加入词典的标签数上限（按出现的资讯数从多到少）
+        """
+        documents = list(documents)
+        tag_df: Counter = Counter()
+        spellings: Dict[str, Counter] = defaultdict(Counter)
+        for _, tags in documents:
+            seen = set()
+            for tag in tags or []:
+                if isinstance(tag, str) and 2 <= len(tag.strip()) <= 30:
+                    key = tag.strip().lower()
+                    spellings[key][tag.strip()] += 1
+                    seen.add(key)
+            tag_df.update(seen)
+        # 已在词典中的标签（内置实体、关键词）不占上限
+        learned = sorted(
+            (key for key, count in tag_df.items() if count >= min_tag_df and key not in self.alias_map),
+            key=lambda key: (-tag_df[key], key)
+        )[:max_tag_aliases]
+        for key in learned:
+            self.add_alias(spellings[key].most_common(1)[0][0], [])
+        for text, _ in documents:
+            self.doc_freq.update({term for term, _ in self._terms(text)})
+            self.doc_total += 1
+        return self
+
+    def fit_cache(self, cache) -> "KeywordExtractor":
+        """用分析缓存中的历史结果训练（缓存的分析结果带有写入时提取的 tags）"""
+        return self.fit(
+            (" ".join(self.item_texts(dict(
+                analysis, source_title=entry.get("title", ""), source_summary=entry.get("summary", "")
+            ))), analysis.get("tags", []))
+            for entry, analysis in cache.items()
+        )
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + self.doc_total) / (1 + self.doc_freq[term])) + 1
+
+    def score_terms(self, title: str, body: str = "") -> Dict[str, float]:
+        """
+        计算一条资讯中各词的权重
+
+        Args:
+            title: 标题（可拼接原始标题和中文标题）
+            body: 正文或摘要
+
+        Returns:
+            {词: 权重}
+        """
+        weights = defaultdict(float)
+        entities = set()
+        for text, weight in ((title, TITLE_WEIGHT), (body, 1.0)):
+            for term, is_entity in self._terms(text):
+                weights[term] += weight
+                if is_entity:
+                    entities.add(term)
+        return {
+            term: tf * self._idf(term)
+            * (ENTITY_BOOST if term in entities else 1.0)
+            * (GENERIC_WEIGHT if term in GENERIC_TERMS else 1.0)
+            for term, tf in weights.items()
+        }
+
+    def extract_tags(self, title: str, body: str = "", limit: int = 4) -> List[str]:
+        """提取一条资讯的标签，按权重排序"""
+        scores = self.score_terms(title, body)
+        return sorted(scores, key=lambda term: -scores[term])[:limit]
+
+    def extract_keywords(self, items: List[Dict[str, Any]], limit: int = 10) -> List[str]:
+        """
+        提取当日关键词：各条资讯的词权重累加，出现在多条资讯中的词排在前面
+
+        Args:
+            items: 资讯列表，使用 title、summary 以及可选的 source_title、source_summary
+            limit: 关键词数量
+        """
+        totals = defaultdict(float)
+        for item in items:
+            scores = self.score_terms(*self.item_texts(item))
+            for term, score in scores.items():
+                totals[term] += score
+        return sorted(totals, key=lambda term: -totals[term])[:limit]
+
+    @staticmethod
+    def item_texts(item: Dict[str, Any]) -> Tuple[str, str]:
+        """资讯的 (标题文本, 正文文本)，同时使用原始内容和 LLM 生成的中文标题/摘要"""
+        title = f"{item.get('source_title', '')} {item.get('title', '')}"
+        body = f"{item.get('source_summary', '')} {item.get('summary', '')}"
+        return title, body
+
+    def fill_tags(self, items: List[Dict[str, Any]], limit: int = 4) -> List[Dict[str, Any]]:
+        """为每条资讯填写 tags 字段（原地修改并返回）"""
+        for item in items:
+            item["tags"] = self.extract_tags(*self.item_texts(item), limit=limit)
+        return items
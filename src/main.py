@@ -5,6 +5,7 @@ AI Daily 主入口
 """
 import sys
 import os
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
@@ -19,15 +20,27 @@ from src.config import (
     FEISHU_WEBHOOK_URL,
     RSS_URL,
     RSS_SOURCES,
-    KEYWORDS
+    KEYWORDS,
+    MAX_PROMPT_ENTRIES,
+    PROMPT_TOKEN_BUDGET,
+    ENABLE_PRESUMMARIZE,
+    IMAGE_STAGE_TIMEOUT,
+    IMAGE_STAGE_GRACE,
+    NOTIFY_STAGE_TIMEOUT
 )
 from src.rss_fetcher import RSSFetcher
+from src.ranking import BM25Ranker
+from src.token_budget import estimate_tokens, pack_entries
+from src.text_summarizer import summarize
 from src.claude_analyzer import ClaudeAnalyzer
 from src.html_generator import HTMLGenerator
+from src.result_archive import ResultArchive
+from src.precompress import precompress_changed
 from src.notifier import EmailNotifier
 from src.feishu_notifier import FeishuNotifier
 from src.image_generator import ImageGenerator
 from src.xiaohongshu_generator import XiaohongshuGenerator
+from src.stage_runner import run_stages, join_timed_out, print_stage_report
 
 
 def print_banner():
@@ -69,15 +82,70 @@ def _merge_entries_to_content(entries: list, target_date: str) -> dict:
         "pubDate": target_date
     }
 
+    # 按相关度排序（KEYWORDS 的 BM25 得分 × 来源权重），再在输入 token 预算内挑选资讯并分配摘录长度
+    ranked = BM25Ranker().rank(entries)
+    candidates = []
+    for index, _ in ranked:
+        entry = entries[index]
+        full_summary = entry.get("summary", entry.get("description", ""))
+        candidates.append({
+            "title": entry.get("title", "无标题"),
+            "link": entry.get("link", ""),
+            "summary": full_summary,
+            "full_summary": full_summary,
+            "source": getattr(entry, '_source', '未知来源')  # 来源信息
+        })
+
+    # 长资讯先做抽取式预摘要，摘录从最核心的句子中截取；只对轮到收录的资讯计算
+    compressed = {}
+
+    def presummarize(i: int) -> str:
+        candidate = candidates[i]
+        if not candidate["full_summary"]:
+            return candidate["full_summary"]
+        compressed[i] = summarize(candidate["full_summary"])
+        candidate["summary"] = compressed[i].text
+        return candidate["summary"]
+
+    header_tokens = [
+        estimate_tokens(f"## 00. {c['title']}\n\n**来源**: {c['source']}\n**链接**: {c['link']}\n\n---")
+        for c in candidates
+    ]
+    scores = [score for _, score in ranked]
+    # 没有命中查询词的资讯排在最后，用剩余的预算按排序顺序（来源权重、时间）收录
+    if not any(scores):
+        print("⚠️ 没有资讯命中关键词，按来源权重和时间挑选")
+    packed = pack_entries(
+        candidates,
+        scores,
+        max_entries=MAX_PROMPT_ENTRIES,
+        header_tokens=header_tokens,
+        prepare=presummarize if ENABLE_PRESUMMARIZE else None
+    )
+    saved_tokens = sum(compressed[item["index"]].saved_tokens for item in packed if item["index"] in compressed)
+    if saved_tokens:
+        print(f"✂️ 预摘要: 收录的长资讯共节省约 {saved_tokens} tokens")
+    print(f"📦 Token 预算: 从 {len(entries)} 条中选取 {len(packed)} 条，"
+          f"约 {sum(p['tokens'] for p in packed)}/{PROMPT_TOKEN_BUDGET} tokens")
+
     # 合并所有条目的内容
     content_parts = []
-    for i, entry in enumerate(entries[:20], 1):  # 最多 20 条
-        title = entry.get("title", "无标题")
-        link = entry.get("link", "")
-        summary = entry.get("summary", entry.get("description", ""))[:500]
-
-        # 来源信息
-        source = getattr(entry, '_source', '未知来源')
+    entry_list = []
+    for i, item in enumerate(packed, 1):
+        candidate = candidates[item["index"]]
+        title = candidate["title"]
+        link = candidate["link"]
+        source = candidate["source"]
+        summary = item["excerpt"]
+
+        # 逐条保留，供增量分析按条目缓存（缓存键使用完整摘要，不受摘录长度影响）
+        entry_list.append({
+            "title": title,
+            "link": link,
+            "summary": summary,
+            "full_summary": candidate["full_summary"],
+            "source": source
+        })
 
         content_parts.append(f"""
 ## {i}. {title}
@@ -91,6 +159,7 @@ def _merge_entries_to_content(entries: list, target_date: str) -> dict:
 """)
 
     merged_content["content"] = "\n".join(content_parts)
+    merged_content["entries"] = entry_list
     return merged_content
 
 
@@ -124,9 +193,8 @@ def main():
     email_enabled = notifier._is_configured()
     feishu_enabled = feishu_notifier._is_configured()
     image_enabled = ENABLE_IMAGE_GENERATION
-    total_steps = 6 if email_enabled else 5
-    if image_enabled:
-        total_steps += 1
+    # 图片和通知合并为一个并发步骤
+    total_steps = 5 if (image_enabled or email_enabled or feishu_enabled) else 4
 
     try:
         # 1. 计算目标日期 (今天 - 2天)
@@ -189,11 +257,21 @@ def main():
                     f"RSS 可用日期范围: {date_range[0]} ~ {date_range[1]}"
                 )
 
-            # 生成空页面
+            # 生成空页面（同时归档，重建时生成同样的空页面）
+            archive = ResultArchive()
+            archive.save({
+                "status": "empty",
+                "date": target_date,
+                "summary": ["暂无资讯"],
+                "reason": "今日暂无资讯"
+            })
             generator = HTMLGenerator()
             generator.generate_css()
             generator.generate_empty(target_date)
+            generator.sync_with_archive(archive, pending=target_date)
             generator.update_index(target_date, {"summary": ["暂无资讯"]})
+            precompress_changed(generator.manifest)
+            generator.manifest.save()
 
             print("   完成")
             return
@@ -203,8 +281,8 @@ def main():
 
         # 4. 调用 Claude 分析
         print(f"[步骤 3/{total_steps}] 调用 Claude 进行智能分析...")
-        analyzer = ClaudeAnalyzer()
-        result = analyzer.analyze(content, target_date)
+        with ClaudeAnalyzer() as analyzer:
+            result = analyzer.analyze(content, target_date)
 
         # 检查分析状态
         if result.get("status") == "empty":
@@ -215,9 +293,12 @@ def main():
 
         print()
 
-        # 5. 生成 HTML
+        # 5. 生成 HTML（分析结果先归档，修改模板后可用 python -m src.rebuild 重建）
         print(f"[步骤 4/{total_steps}] 生成 HTML 页面...")
+        archive = ResultArchive()
+        archive.save(result)
         generator = HTMLGenerator()
+        generator.sync_with_archive(archive, pending=target_date)
         generator.generate_css()
 
         # 生成日报页面
@@ -231,61 +312,52 @@ def main():
             for cat in result.get('categories', [])
         )
 
-        # 6. 生成分享图片（可选）
-        image_path = None
-        xhs_path = None
+        # 6. 分享图片、小红书封面和通知互不依赖，并发执行（可选）
+        page_url = None
+        if os.getenv("SITE_URL"):
+            page_url = f"{os.getenv('SITE_URL').rstrip('/')}/{target_date}.html"
+
+        stages = {}
         if image_enabled:
-            print(f"[步骤 5/{total_steps}] 生成分享卡片图片...")
-            image_gen = ImageGenerator()
-            image_path = image_gen.generate_from_analysis_result(
+            stages["分享卡片"] = (lambda: ImageGenerator().generate_from_analysis_result(
                 result,
                 output_path=str(Path(OUTPUT_DIR) / "images" / f"{target_date}.png")
-            )
-            if image_path:
-                print(f"   图片已保存: {image_path}")
-            else:
-                print("   图片生成失败或跳过")
-
-            # 生成小红书封面
-            print(f"   生成小红书封面...")
-            xhs_gen = XiaohongshuGenerator()
-            xhs_path = xhs_gen.generate(result)
-            print(f"   小红书封面: {xhs_path}")
+            ), IMAGE_STAGE_TIMEOUT)
+            stages["小红书封面"] = (lambda: XiaohongshuGenerator().generate(result), IMAGE_STAGE_TIMEOUT)
+        if email_enabled:
+            stages["邮件通知"] = (lambda: notifier.send_success(target_date, total_items), NOTIFY_STAGE_TIMEOUT)
+        if feishu_enabled:
+            stages["飞书通知"] = (lambda: feishu_notifier.send_summary(
+                date=target_date,
+                summary=result.get('summary', []),
+                keywords=result.get('keywords', []),
+                page_url=page_url
+            ), NOTIFY_STAGE_TIMEOUT)
+
+        if stages:
+            print(f"[步骤 5/{total_steps}] 并发执行: {'、'.join(stages)}...")
+            stage_start = time.perf_counter()
+            stage_results = run_stages(stages)
+            print_stage_report(stage_results, time.perf_counter() - stage_start)
+            # 超时的图片阶段仍在后台运行，最多再等 IMAGE_STAGE_GRACE 秒让它们写完再预压缩和保存构建清单，
+            # 否则之后写入的图片不会出现在变更文件列表中，也不会被预压缩；卡住的阶段不再等待
+            waiting = [name for name in ("分享卡片", "小红书封面") if name in stage_results
+                       and stage_results[name].status == "timeout"]
+            if waiting:
+                print(f"   ⏳ 等待超时的阶段结束后再保存构建清单（最多 {IMAGE_STAGE_GRACE:g} 秒）: {'、'.join(waiting)}")
+                late = join_timed_out(stage_results, waiting, timeout=IMAGE_STAGE_GRACE)
+                if late:
+                    print(f"   ⚠️ 仍未完成，本次变更列表不包含其图片: {'、'.join(late)}")
             print()
         else:
-            print("   (图片生成未启用，跳过)")
+            print("   (图片生成和通知均未启用，跳过)")
             print()
 
-        # 7. 发送成功通知（可选）
-        if email_enabled or feishu_enabled:
-            step_num = 6 if image_enabled else 5
-            print(f"[步骤 {step_num}/{total_steps}] 发送通知...")
-
-            # 邮件通知
-            if email_enabled:
-                notifier.send_success(target_date, total_items)
-
-            # 飞书通知
-            if feishu_enabled:
-                summary = result.get('summary', [])
-                keywords = result.get('keywords', [])
-
-                # 构建页面 URL
-                page_url = None
-                if os.getenv("SITE_URL"):
-                    page_url = f"{os.getenv('SITE_URL').rstrip('/')}/{target_date}.html"
-
-                feishu_notifier.send_summary(
-                    date=target_date,
-                    summary=summary,
-                    keywords=keywords,
-                    page_url=page_url
-                )
-
-            print()
-        else:
-            print("   (通知未配置，跳过)")
-            print()
+        # 预压缩变更的文件，写出构建清单和变更文件列表，供部署步骤使用
+        # （在图片阶段结束之后执行，图片同样经构建清单写入）
+        precompress_changed(generator.manifest)
+        generator.manifest.save()
+        print()
 
         # 完成
         print("╔════════════════════════════════════════════════════════════╗")
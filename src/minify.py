@@ -0,0 +1,176 @@
+"""
+资源压缩模块
+生成站点文件时去掉 HTML 和样式表中的注释和多余空白，并按内容哈希生成带指纹的文件名，
+内容不变则文件名不变，浏览器和 CDN 可以长期缓存
+"""
+import re
+import hashlib
+from functools import lru_cache
+from typing import Iterable, Iterator, List
+
+# 字符串原样保留，注释删除
+_CSS_STRING_OR_COMMENT_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.DOTALL)
+_CSS_STRING_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+_CSS_SPACE_AROUND_RE = re.compile(r"\s*([{};,>])\s*")
+# 冒号两侧的空白只在声明块内删除（选择器中的 "div :first-child" 与 "div:first-child" 含义不同）
+_CSS_COLON_SPACE_RE = re.compile(r"\s*:\s*")
+# @ 规则条件中冒号后的空白，如 @media (max-width: 768px)
+_CSS_AT_RULE_COLON_RE = re.compile(r":\s+")
+_CSS_BRACE_RE = re.compile(r"([{}])")
+_CSS_AT_RULE_RE = re.compile(r"@([\w-]+)")
+# 块内直接是声明（而不是嵌套规则）的 @ 规则
+_CSS_DECLARATION_AT_RULES = {"font-face", "page", "property", "counter-style", "font-palette-values", "viewport"}
+
+
+@lru_cache(maxsize=8)
+def minify_css(css: str) -> str:
+    """
+    压缩 CSS：删除注释、合并空白、去掉符号两侧和末尾分号前的空白；
+    冒号两侧的空白只在声明块内（以及 @ 规则的条件中冒号之后）删除，选择器中的空白保留
+
+    Args:
+        css: 样式表源码
+
+    Returns:
+        压缩后的样式表
+    """
+    css = _CSS_STRING_OR_COMMENT_RE.sub(lambda m: m.group(1) or "", css)
+    parts = _CSS_STRING_RE.split(css)
+    # 各层块是否为声明块；prelude 为当前层尚未遇到 { 的选择器或 @ 规则文本
+    blocks: List[bool] = []
+    prelude = ""
+    for i in range(0, len(parts), 2):
+        # 偶数位是字符串以外的部分
+        text = " ".join(parts[i].split())
+        text = _CSS_SPACE_AROUND_RE.sub(r"\1", text)
+        pieces = _CSS_BRACE_RE.split(text)
+        for j in range(0, len(pieces), 2):
+            opens = j + 1 < len(pieces) and pieces[j + 1] == "{"
+            in_declarations = bool(blocks) and blocks[-1]
+            if in_declarations:
+                # 嵌套规则的选择器（最后一个分号之后、{ 之前）不属于声明
+                head, sep, tail = pieces[j].rpartition(";") if opens else (pieces[j], "", "")
+                pieces[j] = _CSS_COLON_SPACE_RE.sub(":", head) + sep + tail
+                prelude = tail if opens else ""
+            else:
+                prelude = (prelude + pieces[j]).rpartition(";")[2]
+                if opens and prelude.lstrip().startswith("@"):
+                    head, sep, tail = pieces[j].rpartition(";")
+                    pieces[j] = head + sep + _CSS_AT_RULE_COLON_RE.sub(":", tail)
+            if j + 1 < len(pieces):
+                if opens:
+                    at_rule = _CSS_AT_RULE_RE.match(prelude.strip())
+                    blocks.append(at_rule is None or at_rule.group(1).lower() in _CSS_DECLARATION_AT_RULES)
+                elif blocks:
+                    blocks.pop()
+                prelude = ""
+        parts[i] = "".join(pieces).replace(";}", "}")
+    return "".join(parts).strip()
+
+
+# 内容需要原样保留的元素
+_HTML_RAW_RE = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.IGNORECASE | re.DOTALL)
+_HTML_RAW_OPEN_RE = re.compile(r"<(?:pre|textarea|script|style)\b", re.IGNORECASE)
+_HTML_RAW_CLOSE_RE = re.compile(r"</(?:pre|textarea|script|style)\s*>", re.IGNORECASE)
+_HTML_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+# 标签之间跨行的空白（缩进和换行）
+_HTML_TAG_GAP_RE = re.compile(r">\s*\n\s*<")
+# 其余跨行的空白合并为一个换行
+_HTML_LINE_GAP_RE = re.compile(r"[ \t]*\n\s*")
+
+
+def _minify_fragment(html: str) -> str:
+    """压缩一段 HTML（不去掉首尾空白）"""
+    parts = _HTML_RAW_RE.split(html)
+    out = []
+    # split 结果按 [普通文本, 原样元素, 标签名] 循环
+    for i in range(0, len(parts), 3):
+        # 与相邻的原样元素之间按标签间隙处理：前后补上对方的 > 和 <，压缩后再去掉
+        before = ">" if i > 0 else ""
+        after = "<" if i + 1 < len(parts) else ""
+        text = _HTML_COMMENT_RE.sub("", before + parts[i] + after)
+        text = _HTML_TAG_GAP_RE.sub("><", text)
+        text = _HTML_LINE_GAP_RE.sub("\n", text)
+        out.append(text[len(before):len(text) - len(after)])
+        if after:
+            out.append(parts[i + 1])
+    return "".join(out)
+
+
+def _safe_cut(html: str) -> int:
+    """
+    可以切分的位置：最后一个 < 之前，且不在原样元素或注释内部（切在其开头）；
+    找不到时返回 0
+    """
+    cut = html.rfind("<")
+    if cut <= 0:
+        return 0
+    head = html[:cut]
+    opening = max((m.start() for m in _HTML_RAW_OPEN_RE.finditer(head)), default=-1)
+    if opening > max((m.start() for m in _HTML_RAW_CLOSE_RE.finditer(head)), default=-1):
+        cut = opening
+    comment = head.rfind("<!--")
+    if comment > head.rfind("-->"):
+        cut = min(cut, comment)
+    return max(cut, 0)
+
+
+def minify_html_stream(chunks: Iterable[str], buffer_size: int = 64 * 1024) -> Iterator[str]:
+    """
+    逐段压缩 HTML，结果与 minify_html 相同。
+    攒够 buffer_size 个字符后在最后一个标签前切分（不切开原样元素和注释），
+    内存占用与页面大小无关
+
+    Args:
+        chunks: 逐段产出的 HTML（如 Template.render_iter）
+        buffer_size: 缓冲字符数
+
+    Yields:
+        压缩后的 HTML 片段
+    """
+    pending: List[str] = []
+    pending_size = 0
+    started = False
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size < buffer_size:
+            continue
+        text = "".join(pending)
+        cut = _safe_cut(text)
+        if cut == 0:
+            pending, pending_size = [text], len(text)
+            continue
+        # 补上切分处的 <，标签之间的空白才能按整体压缩的规则处理
+        out = _minify_fragment(text[:cut] + "<")[:-1]
+        if not started:
+            out = out.lstrip()
+            started = bool(out)
+        if out:
+            yield out
+        pending, pending_size = [text[cut:]], len(text) - cut
+
+    out = _minify_fragment("".join(pending))
+    out = out.strip() if not started else out.rstrip()
+    if out:
+        yield out
+
+
+def minify_html(html: str) -> str:
+    """
+    压缩 HTML：删除注释、行首缩进和标签之间的换行。
+    同一行内的空白原样保留（行内元素之间的空格会影响显示），
+    pre、textarea、script、style 的内容不做改动
+
+    Args:
+        html: HTML 文本
+
+    Returns:
+        压缩后的 HTML
+    """
+    return _minify_fragment(html).strip()
+
+
+def fingerprint(content: str, length: int = 10) -> str:
+    """内容哈希（SHA-256 前 length 位），用于带指纹的文件名"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:length]
@@ -0,0 +1,93 @@
+"""
+模型分级路由模块
+按调用阶段的难度选择模型：逐条分类和打标签可以交给小而快的模型，
+日级摘要和主题等综合任务交给大模型，每个级别有独立的 max_tokens。
+默认策略（MODEL_ROUTING="*=large"）所有阶段都使用大模型，快速模型需要显式启用。
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from src.config import (
+    CLAUDE_MODEL,
+    CLAUDE_MAX_TOKENS,
+    CLAUDE_FAST_MODEL,
+    CLAUDE_FAST_MAX_TOKENS,
+    MODEL_ROUTING
+)
+
+# 未在路由策略中出现、也没有 "*" 时使用的级别
+DEFAULT_TIER = "large"
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """模型级别"""
+    name: str
+    model: str
+    max_tokens: int
+
+
+def parse_policy(text: str) -> Dict[str, str]:
+    """
+    解析路由策略字符串
+
+    Args:
+        text: 形如 "entries=fast,daily_summary=large,*=large"
+
+    Returns:
+        {调用阶段: 模型级别}
+    """
+    policy = {}
+    for part in (text or "").split(","):
+        stage, sep, tier = part.partition("=")
+        if sep and stage.strip() and tier.strip():
+            policy[stage.strip()] = tier.strip()
+    return policy
+
+
+class ModelRouter:
+    """按调用阶段选择模型级别"""
+
+    def __init__(self, tiers: Dict[str, ModelTier], policy: Dict[str, str]):
+        """
+        Args:
+            tiers: {级别名: 模型级别}
+            policy: {调用阶段: 级别名}，"*" 为其余阶段的默认级别
+        """
+        unknown = set(policy.values()) - set(tiers)
+        if unknown:
+            raise ValueError(f"路由策略引用了未定义的模型级别: {', '.join(sorted(unknown))}")
+        self.tiers = tiers
+        self.policy = policy
+
+    @classmethod
+    def from_config(cls, policy: str = None) -> "ModelRouter":
+        """按配置创建路由器，policy 为空时使用 MODEL_ROUTING"""
+        tiers = {
+            "fast": ModelTier("fast", CLAUDE_FAST_MODEL, CLAUDE_FAST_MAX_TOKENS),
+            "large": ModelTier("large", CLAUDE_MODEL, CLAUDE_MAX_TOKENS),
+        }
+        return cls(tiers, parse_policy(MODEL_ROUTING if policy is None else policy))
+
+    def route(self, stage: str) -> ModelTier:
+        """返回调用阶段对应的模型级别"""
+        name = self.policy.get(stage) or self.policy.get("*") or DEFAULT_TIER
+        return self.tiers[name]
+
+    def describe(self) -> str:
+        """路由策略说明，用于启动日志"""
+        return ", ".join(
+            f"{stage}→{self.tiers[tier].model}"
+            for stage, tier in self.policy.items()
+        )
+
+
+_default_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """获取按配置创建的默认路由器"""
+    global _default_router
+    if _default_router is None:
+        _default_router = ModelRouter.from_config()
+    return _default_router
@@ -0,0 +1,314 @@
+"""
+本地资讯预分类模块
+基于关键词加权的朴素贝叶斯分类器，在调用 LLM 之前对资讯进行分类，
+高置信度的条目不再让 LLM 输出分类，低置信度的条目仍交给 LLM 判断。
+可以用分析缓存中的历史结果训练（只使用分类由 LLM 给出的记录，避免用自己的预测训练自己）：
+
+    python -m src.pre_classifier            # 交叉验证准确率、覆盖率和节省的输出 token / 延迟
+"""
+import re
+import json
+import math
+import argparse
+from collections import Counter, defaultdict
+from typing import Dict, Any, List, Tuple, Iterable
+from urllib.parse import urlsplit
+
+from src.config import CATEGORIES, PRECLASSIFY_CONFIDENCE
+from src.token_budget import estimate_tokens
+
+# 种子词表：没有历史数据时也能对常见资讯给出判断
+SEED_KEYWORDS = {
+    "model": [
+        "model", "models", "weights", "parameters", "llm", "gpt", "claude", "gemini", "llama",
+        "mistral", "qwen", "deepseek", "multimodal", "reasoning", "checkpoint", "benchmark",
+        "模型", "大模型", "参数", "多模态", "推理"
+    ],
+    "product": [
+        "launch", "launches", "launched", "feature", "app", "available", "pricing", "enterprise",
+        "announces", "rollout", "update", "users", "chatgpt", "copilot",
+        "发布", "上线", "产品", "功能", "用户"
+    ],
+    "research": [
+        "paper", "arxiv", "research", "study", "dataset", "researchers", "evaluation",
+        "training", "alignment", "interpretability", "survey",
+        "论文", "研究", "数据集", "训练"
+    ],
+    "tools": [
+        "github", "library", "framework", "sdk", "cli", "tool", "tools", "plugin", "mcp",
+        "api", "agent", "langchain", "workflow", "automation", "rust", "python", "show",
+        "开源", "工具", "框架", "插件"
+    ],
+    "funding": [
+        "raises", "raised", "funding", "series", "acquire", "acquires", "acquisition", "ipo",
+        "valuation", "investment", "investors", "billion", "startup",
+        "融资", "收购", "估值", "投资", "上市"
+    ],
+    "events": [
+        "lawsuit", "regulation", "policy", "ban", "award", "conference", "government", "court",
+        "copyright", "eu", "safety", "controversy", "layoffs", "ceo",
+        "监管", "政策", "诉讼", "争议", "奖项"
+    ],
+}
+
+# 每个种子词相当于在该分类中出现的次数
+SEED_WEIGHT = 3.0
+# 判定为高置信度至少需要命中的已知词数
+MIN_KNOWN_TERMS = 2
+
+_LATIN_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+_CJK_RE = re.compile(r"[一-鿿]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """分词：英文按单词小写，中文按二元组"""
+    text = (text or "").lower()
+    tokens = _LATIN_RE.findall(text)
+    for run in _CJK_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def entry_text(entry: Dict[str, Any]) -> str:
+    """条目用于分类的文本：标题、正文和链接路径"""
+    parts = urlsplit(entry.get("link", "") or "")
+    url_text = f"{parts.hostname or ''} {parts.path}".replace("/", " ").replace("-", " ")
+    return f"{entry.get('title', '')} {entry.get('summary', '')} {url_text}"
+
+
+class PreClassifier:
+    """关键词加权的多项式朴素贝叶斯分类器"""
+
+    def __init__(self, alpha: float = 0.5, use_seeds: bool = True):
+        """
+        Args:
+            alpha: 拉普拉斯平滑系数
+            use_seeds: 是否载入种子词表
+        """
+        self.alpha = alpha
+        self.term_counts: Dict[str, Counter] = {key: Counter() for key in CATEGORIES}
+        self.doc_counts: Counter = Counter()
+        if use_seeds:
+            for category, keywords in SEED_KEYWORDS.items():
+                for keyword in keywords:
+                    for token in tokenize(keyword):
+                        self.term_counts[category][token] += SEED_WEIGHT
+        self._refresh()
+
+    def _refresh(self):
+        """重新计算词表和各分类总词数"""
+        self.vocabulary = set()
+        for counts in self.term_counts.values():
+            self.vocabulary.update(counts)
+        self.totals = {key: sum(counts.values()) for key, counts in self.term_counts.items()}
+
+    def fit(self, samples: Iterable[Tuple[str, str]]) -> "PreClassifier":
+        """
+        用 (文本, 分类) 样本增量训练
+
+        Args:
+            samples: 样本迭代器，分类必须是 CATEGORIES 中的键
+
+        Returns:
+            self
+        """
+        for text, category in samples:
+            if category not in self.term_counts:
+                continue
+            self.term_counts[category].update(tokenize(text))
+            self.doc_counts[category] += 1
+        self._refresh()
+        return self
+
+    def fit_cache(self, cache) -> "PreClassifier":
+        """用分析缓存中由 LLM 给出的历史分类训练（训练文本与预测时相同：标题、正文和链接）"""
+        return self.fit(
+            (entry_text(entry), analysis.get("category", ""))
+            for entry, analysis in cache.items(llm_labelled_only=True)
+        )
+
+    def predict_proba(self, text: str) -> Tuple[Dict[str, float], int]:
+        """
+        计算各分类的后验概率
+
+        Returns:
+            (分类概率字典, 命中的已知词数)
+        """
+        tokens = [token for token in tokenize(text) if token in self.vocabulary]
+        vocab_size = len(self.vocabulary) or 1
+        total_docs = sum(self.doc_counts.values())
+
+        log_scores = {}
+        for category, counts in self.term_counts.items():
+            prior = math.log((self.doc_counts[category] + 1) / (total_docs + len(self.term_counts)))
+            denominator = self.totals[category] + self.alpha * vocab_size
+            log_scores[category] = prior + sum(
+                math.log((counts[token] + self.alpha) / denominator)
+                for token in tokens
+            )
+
+        top = max(log_scores.values())
+        exp_scores = {key: math.exp(score - top) for key, score in log_scores.items()}
+        norm = sum(exp_scores.values())
+        return {key: value / norm for key, value in exp_scores.items()}, len(tokens)
+
+    def predict(self, entry: Dict[str, Any]) -> Tuple[str, float]:
+        """
+        预测条目分类
+
+        Returns:
+            (分类, 置信度)；命中已知词过少时置信度为 0
+        """
+        proba, known = self.predict_proba(entry_text(entry))
+        category = max(proba, key=proba.get)
+        if known < MIN_KNOWN_TERMS:
+            return category, 0.0
+        return category, proba[category]
+
+    def classify(
+        self,
+        entries: List[Dict[str, Any]],
+        threshold: float = None
+    ) -> List[str]:
+        """
+        批量预分类
+
+        Returns:
+            与 entries 顺序一致的分类列表，低于置信度阈值的位置为空字符串
+        """
+        threshold = PRECLASSIFY_CONFIDENCE if threshold is None else threshold
+        labels = []
+        for entry in entries:
+            category, confidence = self.predict(entry)
+            labels.append(category if confidence >= threshold else "")
+        return labels
+
+
+def evaluate(samples: List[Tuple[Dict[str, Any], str]], threshold: float, folds: int = 5) -> Dict[str, float]:
+    """
+    K 折交叉验证
+
+    Returns:
+        accuracy: 全部样本的准确率
+        coverage: 高置信度样本占比（这部分无需 LLM 分类）
+        confident_accuracy: 高置信度样本的准确率
+    """
+    correct = confident = confident_correct = 0
+    for fold in range(folds):
+        train = [(entry_text(e), c) for i, (e, c) in enumerate(samples) if i % folds != fold]
+        test = [(e, c) for i, (e, c) in enumerate(samples) if i % folds == fold]
+        classifier = PreClassifier().fit(train)
+        for entry, category in test:
+            predicted, confidence = classifier.predict(entry)
+            correct += predicted == category
+            if confidence >= threshold:
+                confident += 1
+                confident_correct += predicted == category
+
+    total = len(samples) or 1
+    return {
+        "accuracy": correct / total,
+        "coverage": confident / total,
+        "confident_accuracy": confident_correct / (confident or 1),
+    }
+
+
+def cache_samples(cache) -> List[Tuple[Dict[str, Any], str]]:
+    """分析缓存中可用于训练和评估的 (条目, 分类) 样本（只含 LLM 给出的分类）"""
+    return [
+        (entry, analysis.get("category", ""))
+        for entry, analysis in cache.items(llm_labelled_only=True)
+        if analysis.get("category") in CATEGORIES
+    ]
+
+
+def estimate_savings(
+    cache,
+    coverage: float,
+    records: Iterable[Dict[str, Any]] = ()
+) -> Dict[str, Any]:
+    """
+    估算按当前逐条分析提示词（submit_entries 工具），预分类为每条资讯节省的输出 token 和延迟
+
+    Args:
+        cache: 分析缓存（用历史分析结果估算每条资讯的输出 token 数）
+        coverage: 高置信度覆盖率
+        records: LLM 调用记录（用 entries 阶段的生成速度换算延迟，为空时不估算延迟）
+
+    Returns:
+        category_tokens: 每条资讯 category 字段的输出 token 数
+        entry_tokens: 每条资讯的平均输出 token 数
+        saved_share: 按覆盖率节省的输出 token 比例
+        ms_per_token: 每个输出 token 的生成耗时（无调用记录时为 None）
+        saved_ms_per_entry: 每条资讯平均节省的延迟（无调用记录时为 None）
+    """
+    category_tokens, entry_tokens = [], []
+    for _, analysis in cache.items(llm_labelled_only=True):
+        if analysis.get("category") not in CATEGORIES:
+            continue
+        item = {"id": 1, "category": analysis["category"], "title": analysis.get("title", ""),
+                "summary": analysis.get("summary", "")}
+        category_tokens.append(estimate_tokens(json.dumps({"category": item["category"]}, ensure_ascii=False)))
+        entry_tokens.append(estimate_tokens(json.dumps(item, ensure_ascii=False)))
+
+    per_category = sum(category_tokens) / len(category_tokens) if category_tokens else 0.0
+    per_entry = sum(entry_tokens) / len(entry_tokens) if entry_tokens else 0.0
+
+    # 生成速度：(总延迟 - 首 token 延迟) / 输出 token 数
+    decode_ms = tokens = 0
+    for record in records:
+        if record.get("stage") != "entries" or record.get("status") != "ok" or not record.get("output_tokens"):
+            continue
+        decode_ms += record.get("latency_ms", 0) - (record.get("ttft_ms") or 0)
+        tokens += record["output_tokens"]
+    ms_per_token = decode_ms / tokens if tokens else None
+
+    saved_tokens = per_category * coverage
+    return {
+        "category_tokens": per_category,
+        "entry_tokens": per_entry,
+        "saved_share": saved_tokens / per_entry if per_entry else 0.0,
+        "ms_per_token": ms_per_token,
+        "saved_ms_per_entry": saved_tokens * ms_per_token if ms_per_token is not None else None,
+    }
+
+
+def main():
+    from src.analysis_cache import AnalysisCache
+    from src.telemetry import LLMLedger
+
+    parser = argparse.ArgumentParser(description="评估本地预分类器")
+    parser.add_argument("--cache-dir", help="分析缓存目录")
+    parser.add_argument("--ledger", help="LLM 调用记录路径（用于换算节省的延迟）")
+    parser.add_argument("--threshold", type=float, default=PRECLASSIFY_CONFIDENCE, help="置信度阈值")
+    args = parser.parse_args()
+
+    cache = AnalysisCache(args.cache_dir)
+    samples = cache_samples(cache)
+    if not samples:
+        print("分析缓存中没有 LLM 分类的记录，无法评估")
+        return
+
+    stats = evaluate(samples, args.threshold)
+    per_category = defaultdict(int)
+    for _, category in samples:
+        per_category[category] += 1
+    savings = estimate_savings(cache, stats["coverage"], LLMLedger(args.ledger).read())
+
+    print(f"样本数: {len(samples)}  ({', '.join(f'{k}={v}' for k, v in sorted(per_category.items()))})")
+    print(f"置信度阈值: {args.threshold}")
+    print(f"整体准确率: {stats['accuracy']:.1%}")
+    print(f"高置信度覆盖率: {stats['coverage']:.1%}（这部分条目无需 LLM 输出分类）")
+    print(f"高置信度准确率: {stats['confident_accuracy']:.1%}")
+    print(f"输出 token: 每条约 {savings['entry_tokens']:.1f}，其中分类字段约 {savings['category_tokens']:.1f}，"
+          f"按覆盖率节省约 {savings['saved_share']:.1%}")
+    if savings["ms_per_token"] is None:
+        print("延迟: 没有 entries 阶段的调用记录，无法换算")
+    else:
+        print(f"延迟: 生成速度约 {savings['ms_per_token']:.1f}ms/token，每条资讯平均节省约 {savings['saved_ms_per_entry']:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+预压缩模块
+页面生成结束后为本次变更的文本文件写出 .gz（安装 brotli 时还有 .br）同名压缩文件，
+支持预压缩的静态服务器和 CDN 可以直接返回，不必每次请求时压缩：
+- 只处理构建清单中本次变更的文件，压缩文件同样经构建清单写入，内容不变时不重写
+- 变更后小于 MIN_SIZE 或已删除的文件，以及未安装 brotli 时的 .br，删除上次留下的压缩文件
+- 压缩在线程池中并行执行（zlib 和 brotli 压缩时释放 GIL）
+- 按文件类型输出原始大小和压缩后的大小
+
+    python -m src.precompress          # 压缩上次运行变更的文件
+    python -m src.precompress --all    # 压缩输出目录中的全部文本文件
+"""
+import os
+import sys
+import gzip
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+# 添加项目根目录到路径（支持直接运行本文件）
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import OUTPUT_DIR, ENABLE_PRECOMPRESS, PRECOMPRESS_WORKERS
+from src.build_manifest import BuildManifest, get_build_manifest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 需要预压缩的文件类型
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".xml", ".txt"}
+# 小于该大小的文件压缩收益很小，不生成压缩文件
+MIN_SIZE = 256
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    """gzip 压缩（固定 mtime，相同内容得到相同结果）"""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _compress_file(manifest: BuildManifest, path: Path) -> Dict[str, Any]:
+    """压缩单个文件，返回各格式的大小；未安装 brotli 时删除上次留下的 .br，避免与源文件不一致"""
+    data = path.read_bytes()
+    gz = gzip_bytes(data)
+    manifest.write(path.with_name(path.name + ".gz"), gz)
+    stats = {"type": path.suffix, "raw": len(data), "gz": len(gz), "br": None}
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        manifest.write(path.with_name(path.name + ".br"), br)
+        stats["br"] = len(br)
+    else:
+        manifest.remove(path.with_name(path.name + ".br"))
+    return stats
+
+
+def _remove_compressed(manifest: BuildManifest, path: Path) -> int:
+    """删除不再压缩（变小或已删除）的文件留下的 .gz/.br，返回删除的文件数"""
+    return sum(manifest.remove(path.with_name(path.name + suffix)) for suffix in (".gz", ".br"))
+
+
+def _changed_files(manifest: BuildManifest) -> List[Path]:
+    """清单中本次变更、位于输出目录内的文件"""
+    return [manifest.output_dir / key for key in manifest.changed if not os.path.isabs(key)]
+
+
+def precompress(manifest: BuildManifest = None, paths: Iterable[Path] = None, workers: int = None) -> Dict[str, Dict[str, int]]:
+    """
+    为文本文件写出预压缩文件
+
+    Args:
+        manifest: 构建清单，默认使用输出目录的共享清单
+        paths: 要压缩的文件，默认为清单中本次变更的文件
+        workers: 并行线程数，默认 PRECOMPRESS_WORKERS（0 为 CPU 核数）
+
+    Returns:
+        按文件类型汇总的大小 {".html": {"files", "raw", "gz", "br"}}
+    """
+    manifest = manifest or get_build_manifest()
+    candidates = _changed_files(manifest) if paths is None else [Path(p) for p in paths]
+    files = []
+    for path in dict.fromkeys(candidates):
+        if path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        if path.is_file() and path.stat().st_size >= MIN_SIZE:
+            files.append(path)
+        else:
+            _remove_compressed(manifest, path)
+    totals: Dict[str, Dict[str, int]] = {}
+    if not files:
+        return totals
+
+    workers = workers or PRECOMPRESS_WORKERS or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=min(workers, len(files))) as pool:
+        results = list(pool.map(lambda path: _compress_file(manifest, path), files))
+
+    for stats in results:
+        total = totals.setdefault(stats["type"], {"files": 0, "raw": 0, "gz": 0, "br": 0})
+        total["files"] += 1
+        total["raw"] += stats["raw"]
+        total["gz"] += stats["gz"]
+        total["br"] += stats["br"] or 0
+
+    _print_report(totals)
+    return totals
+
+
+def precompress_changed(manifest: BuildManifest = None) -> Optional[Dict[str, Dict[str, int]]]:
+    """便捷函数：ENABLE_PRECOMPRESS 开启时压缩本次变更的文件（在 manifest.save() 之前调用）"""
+    if not ENABLE_PRECOMPRESS:
+        return None
+    return precompress(manifest)
+
+
+def _print_report(totals: Dict[str, Dict[str, int]]):
+    def size(n: int) -> str:
+        return f"{n / 1024:.1f}KB"
+
+    def saving(raw: int, compressed: int) -> str:
+        return f"-{(1 - compressed / raw) * 100:.0f}%" if raw else "-"
+
+    print(f"📦 预压缩: {sum(t['files'] for t in totals.values())} 个文件"
+          f"{'（gzip + brotli）' if brotli is not None else '（gzip，未安装 brotli）'}")
+    for suffix, total in sorted(totals.items()):
+        line = (f"   {suffix:<6}{total['files']:>5} 个  {size(total['raw']):>10} → "
+                f"gzip {size(total['gz'])} ({saving(total['raw'], total['gz'])})")
+        if brotli is not None:
+            line += f"，brotli {size(total['br'])} ({saving(total['raw'], total['br'])})"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="为站点文本文件生成预压缩文件")
+    parser.add_argument("--output", default=None, help="站点输出目录（默认 OUTPUT_DIR）")
+    parser.add_argument("--all", action="store_true", help="压缩输出目录中的全部文本文件")
+    parser.add_argument("--workers", type=int, default=None, help="并行线程数")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output or OUTPUT_DIR)
+    manifest = BuildManifest(output_dir)
+    if args.all:
+        paths = [path for path in output_dir.rglob("*") if path.suffix in COMPRESSIBLE_SUFFIXES]
+    else:
+        # 上次运行写出的变更文件列表
+        changed = manifest.changed_path.read_text(encoding="utf-8").split() if manifest.changed_path.exists() else []
+        paths = [output_dir / key for key in changed if not os.path.isabs(key)]
+        # 保留原来的变更列表，压缩文件追加在后面
+        manifest.merge({}, changed)
+    precompress(manifest, paths, args.workers)
+    manifest.save()
+
+
+if __name__ == "__main__":
+    main()
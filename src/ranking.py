@@ -0,0 +1,128 @@
+"""
+资讯相关度排序模块
+以 KEYWORDS 为查询，用向量化的 BM25 给候选资讯打分，再乘以来源权重，
+多源模式下按得分挑选送入 LLM 的资讯（取代按时间取前 N 条，见 token_budget.pack_entries）。
+只为查询词建立「文档 × 查询词」词频矩阵（正则一次扫描计数），打分全部是 NumPy 矩阵运算，
+上万条候选也能在一秒内完成。
+"""
+import re
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from src.config import KEYWORDS, SOURCE_WEIGHTS
+from src.pre_classifier import tokenize
+
+# 标题中的词按该倍数计入词频和文档长度
+TITLE_BOOST = 3
+# 英文查询词出现在单词中间（如 chatgpt 中的 gpt）时计入词频的权重；出现在词首（含 agents、llms 等变形）时计 1
+INFIX_WEIGHT = 0.5
+
+
+def entry_fields(entry: Dict[str, Any]) -> Tuple[str, str, str]:
+    """RSS 条目的 (标题, 正文（含 RSS 标签）, 来源)"""
+    title = entry.get("title", "") or ""
+    body = entry.get("summary", entry.get("description", "")) or ""
+    tags = " ".join(tag.get("term", "") or "" for tag in entry.get("tags", None) or [])
+    if tags:
+        body = f"{body} {tags}"
+    source = entry.get("source") or getattr(entry, "_source", "") or ""
+    return title, body, source
+
+
+def source_weight(entry: Dict[str, Any], weights: Dict[str, float] = None) -> float:
+    """按来源名称或链接匹配来源权重，多个匹配时取最长的键"""
+    weights = SOURCE_WEIGHTS if weights is None else weights
+    _, _, source = entry_fields(entry)
+    haystack = f"{source} {entry.get('link', '')}".lower()
+    matched = [key for key in weights if key.lower() in haystack]
+    return weights[max(matched, key=len)] if matched else 1.0
+
+
+class BM25Ranker:
+    """向量化 BM25 排序器"""
+
+    def __init__(self, keywords: List[str] = None, k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            keywords: 查询关键词，默认使用 KEYWORDS（多词关键词按词拆分）
+            k1: 词频饱和参数
+            b: 文档长度归一化参数
+        """
+        self.keywords = KEYWORDS if keywords is None else keywords
+        self.k1 = k1
+        self.b = b
+        self.terms = list(dict.fromkeys(token for keyword in self.keywords for token in tokenize(keyword)))
+        self._term_index = {term: i for i, term in enumerate(self.terms)}
+        # 与 RSSFetcher.filter_by_keywords 一样按子串匹配（通过过滤的资讯至少命中一个查询词）：
+        # 英文词出现在词首时计 1（agents、llms 等变形），出现在单词中间时计 INFIX_WEIGHT；中文二元组直接匹配
+        terms = sorted((re.escape(term) for term in self.terms), key=len, reverse=True)
+        self._pattern = re.compile("|".join(terms)) if terms else None
+
+    def term_frequencies(self, entries: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        统计查询词词频
+
+        Returns:
+            (词频矩阵 [资讯数 × 查询词数], 文档长度数组（按字符计，标题加权）)
+        """
+        n, m = len(entries), len(self.terms)
+        lengths = np.zeros(n)
+        tf = np.zeros((n, m))
+        for doc, entry in enumerate(entries):
+            title, body, _ = entry_fields(entry)
+            title, body = title.lower(), body.lower()
+            lengths[doc] = len(title) * TITLE_BOOST + len(body)
+            if self._pattern is None:
+                continue
+            counts = Counter()
+            for text, boost in ((body, 1), (title, TITLE_BOOST)):
+                for match in self._pattern.finditer(text):
+                    term, start = match.group(0), match.start()
+                    infix = term.isascii() and start > 0 and text[start - 1].isascii() and text[start - 1].isalnum()
+                    counts[term] += boost * (INFIX_WEIGHT if infix else 1)
+            for term, count in counts.items():
+                tf[doc, self._term_index[term]] = count
+        return tf, lengths
+
+    def _weighted(self, entries: List[Dict[str, Any]], source_weights: Dict[str, float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(BM25 × 来源权重, 来源权重)"""
+        n = len(entries)
+        if n == 0:
+            return np.zeros(0), np.zeros(0)
+
+        tf, lengths = self.term_frequencies(entries)
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(lengths.mean(), 1.0))
+        bm25 = (tf * (self.k1 + 1) / (tf + norm[:, None])) @ idf
+
+        weights = np.fromiter((source_weight(entry, source_weights) for entry in entries), dtype=np.float64, count=n)
+        return bm25 * weights, weights
+
+    def score(self, entries: List[Dict[str, Any]], source_weights: Dict[str, float] = None) -> np.ndarray:
+        """
+        计算每条资讯的得分（BM25 × 来源权重）
+
+        Returns:
+            与 entries 顺序一致的得分数组，没有命中查询词的资讯为 0
+        """
+        return self._weighted(entries, source_weights)[0]
+
+    def rank(
+        self,
+        entries: List[Dict[str, Any]],
+        limit: int = None,
+        source_weights: Dict[str, float] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        按得分从高到低排序，得分相同（如都没有命中查询词）时按来源权重，再按原有顺序（较新的在前）
+
+        Returns:
+            [(条目下标, 得分)]，最多 limit 条
+        """
+        scores, weights = self._weighted(entries, source_weights)
+        order = np.lexsort((np.arange(len(scores)), -weights, -scores))[:limit]
+        return [(int(i), float(scores[i])) for i in order]
+
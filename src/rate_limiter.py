@@ -0,0 +1,142 @@
+"""
+API 限流模块
+基于令牌桶同时限制每分钟请求数 (RPM) 和每分钟 token 数 (TPM)，
+让大量并发分析在不触发 429 的前提下尽可能跑满配额
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from src.config import CLAUDE_RPM_LIMIT, CLAUDE_TPM_LIMIT
+
+
+class TokenBucket:
+    """令牌桶：容量为每分钟配额，按恒定速率回填"""
+
+    def __init__(self, capacity: float, per_seconds: float = 60.0):
+        """
+        Args:
+            capacity: 桶容量（即每个周期的配额）
+            per_seconds: 回填满整个桶所需的秒数
+        """
+        self.capacity = float(capacity)
+        self.rate = self.capacity / per_seconds
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def reserve(self, amount: float, now: float) -> Tuple[float, float]:
+        """
+        预占 amount 个令牌
+
+        允许余额为负：并发调用者依次排队，各自等待到属于自己的那份令牌回填完毕。
+
+        Returns:
+            (调用方需要等待的秒数, 实际预占的令牌数)
+        """
+        self._refill(now)
+        # 单次请求超过桶容量时按容量计，否则永远无法放行
+        reserved = min(amount, self.capacity)
+        self.tokens -= reserved
+        if self.tokens >= 0:
+            return 0.0, reserved
+        return -self.tokens / self.rate, reserved
+
+    def adjust(self, amount: float):
+        """归还（正数）或追扣（负数）令牌，用于按实际用量校正预估值"""
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """RPM + TPM 双令牌桶限流器，线程安全，可在多个事件循环间共享"""
+
+    def __init__(self, rpm: int = None, tpm: int = None):
+        """
+        Args:
+            rpm: 每分钟最大请求数，<= 0 表示不限制
+            tpm: 每分钟最大 token 数，<= 0 表示不限制
+        """
+        rpm = CLAUDE_RPM_LIMIT if rpm is None else rpm
+        tpm = CLAUDE_TPM_LIMIT if tpm is None else tpm
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> Tuple[float, float]:
+        """
+        预占一次请求和 tokens 个 token
+
+        Returns:
+            (需要等待的秒数, 实际预占的 token 数（超过 TPM 容量时按容量计）)
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay, reserved = 0.0, tokens
+            if self.requests:
+                delay = max(delay, self.requests.reserve(1, now)[0])
+            if self.tokens:
+                wait, reserved = self.tokens.reserve(tokens, now)
+                delay = max(delay, wait)
+            return delay, reserved
+
+    async def acquire(self, tokens: int) -> Tuple[float, float]:
+        """
+        异步等待直到配额允许发出请求；排队等待时被取消则归还全部预占
+
+        Args:
+            tokens: 本次请求预估消耗的 token 数（输入 + 最大输出）
+
+        Returns:
+            (实际等待的秒数, 实际预占的 token 数)，请求完成后用后者调用 settle
+        """
+        delay, reserved = self.reserve(tokens)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.release(reserved)
+                raise
+        return delay, reserved
+
+    def settle(self, reserved: float, actual: int):
+        """
+        请求完成后按实际 token 用量校正预占值
+
+        Args:
+            reserved: acquire/reserve 返回的实际预占 token 数
+            actual: 实际消耗的 token 数
+        """
+        if not self.tokens:
+            return
+        with self._lock:
+            self.tokens.adjust(reserved - actual)
+
+    def release(self, reserved: float):
+        """归还一次没有发出的请求的全部预占（请求数和 token）"""
+        with self._lock:
+            if self.requests:
+                self.requests.adjust(1)
+            if self.tokens:
+                self.tokens.adjust(reserved)
+
+
+# 同一个 API 端点的所有分析器共享一个限流器
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(base_url: Optional[str] = None) -> RateLimiter:
+    """获取指定 API 端点共享的限流器"""
+    key = base_url or ""
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter()
+            _limiters[key] = limiter
+        return limiter
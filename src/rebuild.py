@@ -0,0 +1,146 @@
+"""
+归档重建模块
+从 ResultArchive 中保存的分析结果重新生成全部页面，不调用 LLM、不访问网络。
+修改 CSS、主题或模板后运行一次即可刷新整个站点；日报页在进程池中并行渲染，
+内容没变的页面按构建清单跳过。
+
+    python -m src.rebuild                          # 重建全部归档
+    python -m src.rebuild --dates 2026-01-12 2026-01-13
+    python -m src.rebuild --workers 8 --output docs --archive docs/data
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+# 添加项目根目录到路径（支持直接运行本文件）
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import OUTPUT_DIR, REBUILD_WORKERS
+from src.build_manifest import BuildManifest
+from src.html_generator import HTMLGenerator
+from src.result_archive import ResultArchive
+from src.precompress import precompress_changed
+
+# 每个工作进程平均分到的任务块数，块越多负载越均衡
+CHUNKS_PER_WORKER = 4
+
+
+def _render_chunk(output_dir: str, archive_dir: str, dates: List[str]) -> Tuple[Dict[str, str], List[str], int, List[str]]:
+    """
+    工作进程：渲染一组日期的页面
+
+    Returns:
+        (变更文件的哈希, 变更文件列表, 未变化文件数, 读取失败的日期)
+    """
+    generator = HTMLGenerator(output_dir)
+    # 每个工作进程用独立的清单，由主进程统一合并保存
+    generator.manifest = BuildManifest(output_dir)
+    archive = ResultArchive(archive_dir)
+
+    failed = []
+    for date in dates:
+        result = archive.load(date)
+        if result is None:
+            failed.append(date)
+        elif result.get("status") == "empty":
+            generator.write_empty_page(date, result.get("reason") or "今日暂无资讯")
+        else:
+            generator.write_daily_page(result)
+
+    manifest = generator.manifest
+    return {key: manifest.hashes[key] for key in manifest.changed}, list(manifest.changed), manifest.unchanged, failed
+
+
+def rebuild(
+    output_dir: str = None,
+    archive_dir: str = None,
+    workers: int = None,
+    dates: List[str] = None,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    从归档重建站点
+
+    Args:
+        output_dir: 站点输出目录，默认 OUTPUT_DIR
+        archive_dir: 归档目录，默认 ARCHIVE_DIR
+        workers: 并行进程数，默认 REBUILD_WORKERS（0 为 CPU 核数）
+        dates: 只重建这些日期，默认全部
+        force: 归档的天数少于站点索引中的天数时仍然重建（默认拒绝，避免用不完整的归档覆盖历史）
+
+    Returns:
+        统计信息：pages、changed、unchanged、failed、elapsed
+    """
+    start = time.monotonic()
+    output_dir = str(output_dir or OUTPUT_DIR)
+    archive = ResultArchive(archive_dir)
+    archived = archive.dates()
+    dates = sorted(set(dates) & set(archived)) if dates else archived
+    workers = workers or REBUILD_WORKERS or os.cpu_count() or 1
+
+    generator = HTMLGenerator(output_dir)
+    # 独立的清单实例，统计只包含本次重建；必须在读取 archive_index 等索引之前替换，
+    # 否则索引对象会持有旧的共享清单，写出的索引文件不会记入本次的清单和变更列表
+    generator.manifest = BuildManifest(output_dir)
+    indexed = sum(month.get("count", 0) for month in generator.archive_index.months())
+    if len(archived) < indexed and not force:
+        raise RuntimeError(
+            f"归档只有 {len(archived)} 天，少于站点索引中的 {indexed} 天；"
+            f"请先恢复完整的归档目录 {archive.archive_dir}（或使用 --force）"
+        )
+    generator.generate_css()
+
+    print(f"🔁 从归档重建 {len(dates)} 天的页面（{workers} 个进程）...")
+    failed = []
+    if dates:
+        size = max(1, -(-len(dates) // (workers * CHUNKS_PER_WORKER)))
+        chunks = [dates[i:i + size] for i in range(0, len(dates), size)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            futures = [pool.submit(_render_chunk, output_dir, str(archive.archive_dir), chunk) for chunk in chunks]
+            for future in futures:
+                hashes, changed, unchanged, chunk_failed = future.result()
+                generator.manifest.merge(hashes, changed, unchanged)
+                failed.extend(chunk_failed)
+
+    # 索引分片和归档页按全部归档重建
+    generator.rebuild_index([result for result in archive if result.get("date")])
+
+    precompress_changed(generator.manifest)
+    changed = generator.manifest.save()
+    elapsed = time.monotonic() - start
+    if failed:
+        print(f"⚠️ {len(failed)} 天的归档读取失败: {', '.join(failed[:10])}")
+    print(f"✅ 重建完成: {len(dates)} 页，用时 {elapsed:.2f}s")
+    return {
+        "pages": len(dates),
+        "changed": len(changed),
+        "unchanged": generator.manifest.unchanged,
+        "failed": failed,
+        "elapsed": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从归档的分析结果重建全部页面")
+    parser.add_argument("--output", default=None, help="站点输出目录（默认 OUTPUT_DIR）")
+    parser.add_argument("--archive", default=None, help="归档目录（默认 ARCHIVE_DIR）")
+    parser.add_argument("--workers", type=int, default=None, help="并行进程数")
+    parser.add_argument("--dates", nargs="+", default=None, help="只重建指定日期 (YYYY-MM-DD)")
+    parser.add_argument("--force", action="store_true", help="归档少于站点索引中的天数时仍然重建")
+    args = parser.parse_args()
+
+    try:
+        stats = rebuild(args.output, args.archive, args.workers, args.dates, args.force)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if stats["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
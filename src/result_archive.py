@@ -0,0 +1,70 @@
+"""
+分析结果归档模块
+每次分析的结果按日期保存为规范化 JSON（键排序、UTF-8、固定缩进），
+修改样式、主题或模板后可以不调用 LLM、不访问网络，直接从归档重建全部页面（见 src/rebuild.py）
+"""
+import re
+import json
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+from src.config import ARCHIVE_DIR
+from src.build_manifest import get_build_manifest
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def canonical_json(result: Dict[str, Any]) -> str:
+    """规范化 JSON：相同内容总是得到相同的字节，便于比对和增量部署"""
+    return json.dumps(result, ensure_ascii=False, sort_keys=True, indent=2) + "\n"
+
+
+class ResultArchive:
+    """按日期存放的分析结果归档"""
+
+    def __init__(self, archive_dir: str = None):
+        """
+        Args:
+            archive_dir: 归档目录，默认 ARCHIVE_DIR
+        """
+        self.archive_dir = Path(archive_dir or ARCHIVE_DIR)
+
+    def path(self, date: str) -> Path:
+        return self.archive_dir / f"{date}.json"
+
+    def save(self, result: Dict[str, Any]) -> Path:
+        """
+        保存一天的分析结果（内容没变时不重写）
+
+        Args:
+            result: 分析结果，需要 date 字段
+
+        Returns:
+            归档文件路径
+        """
+        date = result.get("date", "")
+        if not _DATE_RE.match(date):
+            raise ValueError(f"分析结果的日期无效: {date!r}")
+        path = self.path(date)
+        get_build_manifest().write(path, canonical_json(result))
+        return path
+
+    def load(self, date: str) -> Optional[Dict[str, Any]]:
+        """读取一天的分析结果，不存在或损坏时返回 None"""
+        try:
+            with open(self.path(date), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def dates(self) -> List[str]:
+        """已归档的日期（从旧到新）"""
+        if not self.archive_dir.exists():
+            return []
+        return sorted(path.stem for path in self.archive_dir.glob("*.json") if _DATE_RE.match(path.stem))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for date in self.dates():
+            result = self.load(date)
+            if result is not None:
+                yield result
@@ -0,0 +1,302 @@
+"""
+分析结果结构定义模块
+- 以工具调用 (tool use) 的 input_schema 描述结果结构，让模型直接输出结构化参数
+  （关键词和标签由 keyword_extractor 在本地生成，不在结构中）
+- 轻量校验器：逐字段/逐条校验，保留有效部分，返回无效字段供单独重新请求
+- 截断 JSON 修复：模型输出被截断时尽量恢复已完整输出的部分
+"""
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.config import CATEGORIES, THEMES
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+_NEWS_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string", "description": "简化版标题，不超过40字"},
+        "summary": {"type": "string", "description": "一句话核心要点，不超过80字"},
+        "url": {"type": "string", "description": "相关链接"},
+    },
+    "required": ["title", "summary"]
+}
+
+# 逐条资讯分类摘要
+ENTRIES_TOOL = {
+    "name": "submit_entries",
+    "description": "提交逐条资讯的分类、标题和摘要",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "items": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer", "description": "资讯编号"},
+                        "category": {"type": "string", "enum": list(CATEGORIES)},
+                        "title": _NEWS_ITEM_SCHEMA["properties"]["title"],
+                        "summary": _NEWS_ITEM_SCHEMA["properties"]["summary"],
+                    },
+                    "required": ["id", "title", "summary"]
+                }
+            }
+        },
+        "required": ["items"]
+    }
+}
+
+# 日级摘要
+DAY_TOOL = {
+    "name": "submit_daily_summary",
+    "description": "提交当日核心摘要和页面主题",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "theme": {"type": "string", "enum": list(THEMES)},
+            "summary": dict(_STRING_LIST, description="3-5 条今日最重要的资讯要点"),
+        },
+        "required": ["theme", "summary"]
+    }
+}
+
+# 完整日报（单源模式一次性分析）
+DAILY_RESULT_TOOL = {
+    "name": "submit_daily_report",
+    "description": "提交完整的 AI 日报分析结果",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "status": {"type": "string", "enum": ["success", "empty"]},
+            "theme": DAY_TOOL["input_schema"]["properties"]["theme"],
+            "summary": DAY_TOOL["input_schema"]["properties"]["summary"],
+            "categories": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "key": {"type": "string", "enum": list(CATEGORIES)},
+                        "items": {"type": "array", "items": _NEWS_ITEM_SCHEMA},
+                    },
+                    "required": ["key", "items"]
+                }
+            }
+        },
+        "required": ["status", "theme", "summary", "categories"]
+    }
+}
+
+
+def subset_tool(tool: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """只保留指定字段的工具定义，用于单独重新请求无效字段"""
+    schema = tool["input_schema"]
+    return {
+        "name": tool["name"],
+        "description": tool["description"],
+        "input_schema": {
+            "type": "object",
+            "properties": {key: schema["properties"][key] for key in fields},
+            "required": list(fields)
+        }
+    }
+
+
+# ============================================================================
+# 校验
+# ============================================================================
+
+def _string_list(value: Any) -> Optional[List[str]]:
+    """非空字符串列表，无效时返回 None"""
+    if not isinstance(value, list):
+        return None
+    cleaned = [item.strip() for item in value if isinstance(item, str) and item.strip()]
+    return cleaned or None
+
+
+def clean_news_item(item: Any) -> Optional[Dict[str, Any]]:
+    """校验单条资讯（标题、摘要必填），无效时返回 None"""
+    if not isinstance(item, dict):
+        return None
+    title = item.get("title")
+    summary = item.get("summary")
+    if not isinstance(title, str) or not title.strip() or not isinstance(summary, str):
+        return None
+    url = item.get("url")
+    return {
+        "title": title.strip(),
+        "summary": summary.strip(),
+        "url": url if isinstance(url, str) else ""
+    }
+
+
+def clean_entry_item(item: Any, need_category: bool = True) -> Optional[Dict[str, Any]]:
+    """校验逐条分析结果，need_category 为 False 时不要求分类字段"""
+    cleaned = clean_news_item(item)
+    if cleaned is None:
+        return None
+    category = item.get("category")
+    if category not in CATEGORIES:
+        if need_category:
+            return None
+        category = ""
+    return {
+        "category": category,
+        "title": cleaned["title"],
+        "summary": cleaned["summary"]
+    }
+
+
+def _clean_field(field: str, value: Any) -> Tuple[bool, Any]:
+    """
+    校验日报的单个顶层字段
+
+    Returns:
+        (是否有效, 清理后的值)；categories 中有无效的分类或资讯时为 (False, 其余有效部分)
+    """
+    if field == "theme":
+        return (True, value) if value in THEMES else (False, None)
+    if field == "status":
+        return (True, value) if value in ("success", "empty") else (False, None)
+    if field == "summary":
+        cleaned = _string_list(value)
+        return cleaned is not None, cleaned
+    if field == "categories":
+        if not isinstance(value, list):
+            return False, None
+        categories = []
+        dropped = 0
+        for cat in value:
+            if not isinstance(cat, dict) or cat.get("key") not in CATEGORIES:
+                dropped += 1
+                continue
+            info = CATEGORIES[cat["key"]]
+            raw_items = cat.get("items") or []
+            if not isinstance(raw_items, list):
+                dropped += 1
+                raw_items = []
+            items = [item for item in map(clean_news_item, raw_items) if item]
+            dropped += len(raw_items) - len(items)
+            categories.append({
+                "key": cat["key"],
+                "name": info["name"],
+                "icon": info["icon"],
+                "items": items
+            })
+        return dropped == 0, categories
+    return False, None
+
+
+def clean_fields(data: Any, fields: List[str], keep_partial: bool = False) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    逐字段校验结构化结果
+
+    Args:
+        data: 模型返回的结构化参数
+        fields: 需要校验的顶层字段
+        keep_partial: 部分有效的字段（如 categories 中个别资讯无效）是否也放入有效字段字典，
+            这些字段仍列在无效字段中，重新请求失败时使用其有效部分
+
+    Returns:
+        (有效字段字典, 无效字段列表)
+    """
+    if not isinstance(data, dict):
+        return {}, list(fields)
+    valid, invalid = {}, []
+    for field in fields:
+        ok, value = _clean_field(field, data.get(field))
+        if ok:
+            valid[field] = value
+        else:
+            invalid.append(field)
+            if keep_partial and value:
+                valid[field] = value
+    return valid, invalid
+
+
+# ============================================================================
+# 解析与修复
+# ============================================================================
+
+def strip_code_fence(text: str) -> str:
+    """清理可能的 markdown 代码块标记"""
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    if text.startswith("```"):
+        text = text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    return text.strip()
+
+
+def repair_json(text: str, max_attempts: int = 200) -> Any:
+    """
+    解析可能包裹在代码块中或被截断的 JSON
+
+    截断时依次尝试：直接补全括号；回退到最近一个完整元素之后再补全括号。
+    被截断的字符串值不完整，直接丢弃而不是补全引号。
+
+    Returns:
+        解析结果，无法修复时返回 None
+    """
+    text = strip_code_fence(text or "")
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return None
+    text = text[min(starts):]
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    # 扫描一遍，记录每个可截断位置（逗号前、容器闭合后）以及当时未闭合的括号
+    stack = []
+    in_string = escape = False
+    cuts = []
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif ch == ",":
+            cuts.append((i, "".join(reversed(stack))))
+
+    closers = "".join(reversed(stack))
+    candidates = [] if in_string else [text.rstrip().rstrip(",") + closers]
+    candidates.extend(text[:pos] + tail for pos, tail in reversed(cuts[-max_attempts:]))
+
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_tool_response(response, tool_name: str) -> Any:
+    """
+    从响应中取出工具调用参数
+
+    模型（或代理）没有按工具调用返回时，回退为修复并解析文本中的 JSON
+    """
+    texts = []
+    for block in response.content:
+        block_type = getattr(block, "type", "")
+        if block_type == "tool_use" and getattr(block, "name", "") == tool_name:
+            return block.input
+        if block_type == "text":
+            texts.append(block.text)
+    return repair_json("".join(texts))
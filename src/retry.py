@@ -0,0 +1,183 @@
+"""
+重试与对冲请求模块
+- 带抖动的指数退避重试，优先遵循服务端返回的 Retry-After
+- 对冲请求：主端点超过延迟阈值未响应时向备用端点发送副本，先成功者胜出
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from anthropic import APIConnectionError, APIStatusError
+
+from src.config import (
+    CLAUDE_MAX_RETRIES,
+    CLAUDE_RETRY_BASE_DELAY,
+    CLAUDE_RETRY_MAX_DELAY
+)
+
+T = TypeVar("T")
+
+# 可重试的 HTTP 状态码（529 为 Anthropic 的过载状态码）
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def parse_retry_after(exc: Exception) -> Optional[float]:
+    """
+    从异常携带的响应头中解析 Retry-After
+
+    支持 retry-after-ms（毫秒）、retry-after（秒数或 HTTP 日期）
+
+    Returns:
+        需要等待的秒数，没有该响应头时返回 None
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """重试策略"""
+    max_retries: int = CLAUDE_MAX_RETRIES      # 最大重试次数（不含首次请求）
+    base_delay: float = CLAUDE_RETRY_BASE_DELAY  # 首次退避基准秒数
+    max_delay: float = CLAUDE_RETRY_MAX_DELAY    # 单次退避上限秒数
+
+    def is_retryable(self, exc: Exception) -> bool:
+        """判断异常是否值得重试（网络错误、超时、限流和 5xx）"""
+        if isinstance(exc, APIConnectionError):
+            return True
+        if isinstance(exc, APIStatusError):
+            return exc.status_code in RETRYABLE_STATUS_CODES
+        return False
+
+    def delay_for(self, attempt: int, exc: Exception) -> float:
+        """
+        计算第 attempt 次重试前的等待时间
+
+        有 Retry-After 时遵循服务端要求，否则使用 full jitter 指数退避
+        """
+        retry_after = parse_retry_after(exc)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+async def retry_async(
+    call: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    on_retry: Callable[[int, float, Exception], None] = None
+) -> T:
+    """
+    按重试策略执行异步调用
+
+    Args:
+        call: 无参异步调用，每次重试都会重新调用
+        policy: 重试策略
+        on_retry: 重试回调 (第几次重试, 等待秒数, 异常)
+
+    Returns:
+        调用结果，重试耗尽或遇到不可重试的异常时抛出最后一个异常
+    """
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            if attempt >= policy.max_retries or not policy.is_retryable(e):
+                raise
+            delay = policy.delay_for(attempt, e)
+            attempt += 1
+            if on_retry:
+                on_retry(attempt, delay, e)
+            await asyncio.sleep(delay)
+
+
+def _task_error(task: asyncio.Future) -> Optional[BaseException]:
+    """已完成任务的异常，成功时为 None（被取消的任务返回 CancelledError，而不是在读取时抛出）"""
+    if task.cancelled():
+        return asyncio.CancelledError()
+    return task.exception()
+
+
+async def hedge_async(
+    primary: Callable[[], Awaitable[T]],
+    secondary: Optional[Callable[[], Awaitable[T]]],
+    delay: float,
+    on_hedge: Callable[[str], None] = None
+) -> T:
+    """
+    对冲请求：先发主请求，delay 秒后仍未完成则并发发送备用请求，先成功者胜出
+
+    主请求在阈值内失败时直接切换到备用请求。另一路请求在胜出后被取消，并等待其取消完成
+    （让请求内部的清理逻辑，如归还限流配额，在返回前执行）。
+
+    Args:
+        primary: 主请求
+        secondary: 备用请求，为 None 时等价于直接 await primary()
+        delay: 发送备用请求前的等待阈值（秒）
+        on_hedge: 发出备用请求时的回调，参数为原因 (slow/failed)
+
+    Returns:
+        最先成功的请求结果；两路都失败时优先抛出主请求的异常（被取消的请求不作为失败原因）
+    """
+    if secondary is None:
+        return await primary()
+
+    primary_task = asyncio.ensure_future(primary())
+    pending = {primary_task}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done:
+            error = _task_error(primary_task)
+            if error is None:
+                return primary_task.result()
+            if on_hedge:
+                on_hedge("failed")
+            try:
+                return await secondary()
+            except Exception:
+                if isinstance(error, Exception):
+                    raise error
+                raise
+
+        if on_hedge:
+            on_hedge("slow")
+        pending.add(asyncio.ensure_future(secondary()))
+        errors = {}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = _task_error(task)
+                if error is None:
+                    return task.result()
+                errors[task] = error
+        failures = [errors[task] for task in (primary_task, *errors) if task in errors]
+        raise next((e for e in failures if isinstance(e, Exception)), failures[0])
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,340 @@
+"""
+站内搜索索引模块
+构建时生成静态倒排索引，浏览器端搜索只下载查询词所在的分片：
+- 文档为每天的日报页，文档号为日期序数（date.toordinal()），天然有序且稳定
+- 词来自摘要、关键词以及各条资讯的标题、摘要、标签，分词规则与 pre_classifier.tokenize 相同
+- search/{分片}.json：{词: 倒排表}，按词前缀分片（英文取前两个字符，中文按码位区间）；
+  倒排表从新到旧排列，首项为文档号、其余为与前一项的差值，逗号分隔的 36 进制字符串，例如 "fuvk,1,1,3"
+- search/days/YYYY-MM.json：每天索引过的词，重新索引同一天时用来移除旧词
+- search/meta.json：文档数等元数据
+每天只改写当天的词所在的分片，不重建整个索引
+"""
+import json
+import math
+from datetime import date as date_cls
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Set
+
+from src.build_manifest import BuildManifest, get_build_manifest
+from src.pre_classifier import tokenize
+
+SEARCH_DIRNAME = "search"
+INDEX_VERSION = 1
+
+# 不建索引的高频英文虚词
+STOPWORDS = set("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+""".split())
+
+
+def shard_key(term: str) -> str:
+    """词所在的分片名：英文取前两个字符（非字母数字替换为 _），其他字符按码位每 64 个一组"""
+    first = term[0]
+    if first.isascii():
+        return "".join(c if c.isalnum() else "_" for c in term[:2])
+    return f"u{ord(first) >> 6:x}"
+
+
+def encode_postings(doc_ids: Iterable[int]) -> str:
+    """
+    文档号 -> 倒排表：从新到旧排列，第一个为文档号本身，之后为与前一个的差值，
+    36 进制逗号分隔。新的一天只需在开头插入，不必解码整个倒排表
+    """
+    parts, previous = [], None
+    for doc_id in sorted(set(doc_ids), reverse=True):
+        parts.append(_base36(doc_id if previous is None else previous - doc_id))
+        previous = doc_id
+    return ",".join(parts)
+
+
+def decode_postings(encoded: str) -> List[int]:
+    """encode_postings 的逆运算（从新到旧）"""
+    doc_ids, current = [], None
+    for part in encoded.split(",") if encoded else []:
+        current = int(part, 36) if current is None else current - int(part, 36)
+        doc_ids.append(current)
+    return doc_ids
+
+
+def add_posting(encoded: str, doc_id: int) -> str:
+    """把文档号加入倒排表；比已有文档都新时（每天的常见情况）直接在开头插入"""
+    if encoded:
+        head, sep, tail = encoded.partition(",")
+        newest = int(head, 36)
+        if doc_id > newest:
+            return f"{_base36(doc_id)},{_base36(doc_id - newest)}{sep}{tail}"
+        if doc_id == newest:
+            return encoded
+    return encode_postings(decode_postings(encoded) + [doc_id])
+
+
+def _base36(value: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    if value == 0:
+        return "0"
+    out = []
+    while value:
+        value, remainder = divmod(value, 36)
+        out.append(digits[remainder])
+    return "".join(reversed(out))
+
+
+def result_terms(result: Dict[str, Any]) -> Set[str]:
+    """一天的分析结果中需要索引的词"""
+    texts = list(result.get("summary", [])) + list(result.get("keywords", []))
+    for category in result.get("categories", []):
+        for item in category.get("items", []):
+            texts.append(item.get("title", ""))
+            texts.append(item.get("summary", ""))
+            texts.extend(item.get("tags", []))
+    return {
+        term for text in texts if isinstance(text, str)
+        for term in tokenize(text)
+        if term not in STOPWORDS
+    }
+
+
+def _read_json(path: Path, default):
+    if not path.exists():
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠️ 搜索索引文件损坏，已忽略: {path}")
+        return default
+
+
+def _dump(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+class SearchIndex:
+    """按词前缀分片的静态倒排索引"""
+
+    def __init__(self, output_dir: str, manifest: BuildManifest = None):
+        """
+        Args:
+            output_dir: 站点输出目录
+            manifest: 写文件用的构建清单，默认使用输出目录的共享清单
+        """
+        self.search_dir = Path(output_dir) / SEARCH_DIRNAME
+        self.manifest = manifest or get_build_manifest(output_dir)
+
+    def shard_path(self, key: str) -> Path:
+        return self.search_dir / f"{key}.json"
+
+    def _days_path(self, month: str) -> Path:
+        return self.search_dir / "days" / f"{month}.json"
+
+    def add(self, result: Dict[str, Any]) -> int:
+        """
+        索引（或重新索引）一天的结果，只改写涉及的分片
+
+        Returns:
+            改写的分片数
+        """
+        day = result["date"]
+        doc_id = date_cls.fromisoformat(day).toordinal()
+        terms = result_terms(result)
+
+        days_path = self._days_path(day[:7])
+        days = _read_json(days_path, {})
+        old_terms = set(days.get(day, []))
+
+        # 按分片分组：新增的词加入文档号，不再出现的旧词移除文档号
+        changes: Dict[str, Dict[str, bool]] = {}
+        for term in terms - old_terms:
+            changes.setdefault(shard_key(term), {})[term] = True
+        for term in old_terms - terms:
+            changes.setdefault(shard_key(term), {})[term] = False
+
+        for key, term_changes in changes.items():
+            shard = _read_json(self.shard_path(key), {})
+            for term, present in term_changes.items():
+                if present:
+                    shard[term] = add_posting(shard.get(term, ""), doc_id)
+                    continue
+                doc_ids = [d for d in decode_postings(shard.get(term, "")) if d != doc_id]
+                if doc_ids:
+                    shard[term] = encode_postings(doc_ids)
+                else:
+                    shard.pop(term, None)
+            self.manifest.write(self.shard_path(key), _dump(shard))
+
+        is_new_doc = day not in days
+        days[day] = sorted(terms)
+        self.manifest.write(days_path, _dump(days))
+        if is_new_doc:
+            meta = self.meta()
+            meta["docs"] = meta.get("docs", 0) + 1
+            self._write_meta(meta)
+        return len(changes)
+
+    def rebuild(self, results: Iterable[Dict[str, Any]]):
+        """用全部结果一次性重建索引（归档重建时使用）"""
+        shards: Dict[str, Dict[str, List[int]]] = {}
+        days: Dict[str, Dict[str, List[str]]] = {}
+        for result in results:
+            day = result["date"]
+            doc_id = date_cls.fromisoformat(day).toordinal()
+            terms = result_terms(result)
+            days.setdefault(day[:7], {})[day] = sorted(terms)
+            for term in terms:
+                shards.setdefault(shard_key(term), {}).setdefault(term, []).append(doc_id)
+
+        for key, postings in shards.items():
+            self.manifest.write(self.shard_path(key), _dump({
+                term: encode_postings(doc_ids) for term, doc_ids in postings.items()
+            }))
+        for month, month_days in days.items():
+            self.manifest.write(self._days_path(month), _dump(month_days))
+        self._write_meta({"docs": sum(len(month_days) for month_days in days.values())})
+
+    def meta(self) -> Dict[str, Any]:
+        return _read_json(self.search_dir / "meta.json", {})
+
+    def _write_meta(self, meta: Dict[str, Any]):
+        meta["version"] = INDEX_VERSION
+        self.manifest.write(self.search_dir / "meta.json", _dump(meta))
+
+    def search(self, query: str) -> List[str]:
+        """
+        本地查询（与浏览器端逻辑一致，用于测试和调试）：按命中词的 IDF 之和排序，同分时新的在前
+
+        Returns:
+            日期列表
+        """
+        total = max(self.meta().get("docs", 1), 1)
+        scores: Dict[int, float] = {}
+        shards: Dict[str, Dict[str, str]] = {}
+        for term in set(tokenize(query)):
+            key = shard_key(term)
+            if key not in shards:
+                shards[key] = _read_json(self.shard_path(key), {})
+            doc_ids = decode_postings(shards[key].get(term, ""))
+            if not doc_ids:
+                continue
+            idf = math.log(1 + total / len(doc_ids))
+            for doc_id in doc_ids:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf
+        ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], -doc_id))
+        return [date_cls.fromordinal(doc_id).isoformat() for doc_id in ranked]
+
+
+# 浏览器端搜索脚本：分词、分片规则和打分与上面的 Python 实现保持一致
+SEARCH_JS = r"""(function () {
+    "use strict";
+    var LATIN = /[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]/g;
+    var CJK = /[一-鿿]+/g;
+    var EPOCH_ORDINAL = 719163;  // 1970-01-01 的 date.toordinal()
+    var MAX_RESULTS = 50;
+    var cache = {};
+
+    function tokenize(text) {
+        text = text.toLowerCase();
+        var tokens = text.match(LATIN) || [];
+        (text.match(CJK) || []).forEach(function (run) {
+            if (run.length === 1) {
+                tokens.push(run);
+            }
+            for (var i = 0; i + 1 < run.length; i++) {
+                tokens.push(run.slice(i, i + 2));
+            }
+        });
+        return tokens.filter(function (t, i) { return tokens.indexOf(t) === i; });
+    }
+
+    function shardKey(term) {
+        var code = term.charCodeAt(0);
+        if (code < 128) {
+            return term.slice(0, 2).replace(/[^a-z0-9]/g, "_");
+        }
+        return "u" + (code >> 6).toString(16);
+    }
+
+    function decode(encoded) {
+        var current = null;
+        return encoded.split(",").map(function (part) {
+            current = current === null ? parseInt(part, 36) : current - parseInt(part, 36);
+            return current;
+        });
+    }
+
+    function ordinalToDate(ordinal) {
+        return new Date((ordinal - EPOCH_ORDINAL) * 86400000).toISOString().slice(0, 10);
+    }
+
+    function fetchJSON(url, fallback) {
+        if (!(url in cache)) {
+            cache[url] = fetch(url).then(function (r) { return r.ok ? r.json() : fallback; })
+                .catch(function () { return fallback; });
+        }
+        return cache[url];
+    }
+
+    function search(query) {
+        var terms = tokenize(query);
+        return fetchJSON("search/meta.json", {}).then(function (meta) {
+            var scores = {};
+            return Promise.all(terms.map(function (term) {
+                return fetchJSON("search/" + shardKey(term) + ".json", {}).then(function (shard) {
+                    if (!shard[term]) {
+                        return;
+                    }
+                    var docs = decode(shard[term]);
+                    var idf = Math.log(1 + Math.max(meta.docs || 1, 1) / docs.length);
+                    docs.forEach(function (doc) { scores[doc] = (scores[doc] || 0) + idf; });
+                });
+            })).then(function () {
+                var ranked = Object.keys(scores).map(Number).sort(function (a, b) {
+                    return scores[b] - scores[a] || b - a;
+                }).slice(0, MAX_RESULTS).map(ordinalToDate);
+                var months = ranked.map(function (d) { return d.slice(0, 7); })
+                    .filter(function (m, i, all) { return all.indexOf(m) === i; });
+                return Promise.all(months.map(function (month) {
+                    return fetchJSON("index/" + month + ".json", []);
+                })).then(function (shards) {
+                    var entries = {};
+                    shards.forEach(function (shard) {
+                        shard.forEach(function (entry) { entries[entry.date] = entry; });
+                    });
+                    return ranked.map(function (date) {
+                        return entries[date] || {date: date, url: date + ".html", summary: ""};
+                    });
+                });
+            });
+        });
+    }
+
+    function render(query, results) {
+        var list = document.getElementById("search-results");
+        var status = document.getElementById("search-status");
+        list.textContent = "";
+        status.textContent = query ? (results.length ? "找到 " + results.length + " 天相关资讯" : "没有找到相关资讯") : "";
+        results.forEach(function (entry) {
+            var article = document.createElement("article");
+            article.className = "index-entry";
+            var link = document.createElement("a");
+            link.className = "entry-link";
+            link.href = entry.url;
+            var date = document.createElement("span");
+            date.className = "entry-date";
+            date.textContent = entry.date;
+            var summary = document.createElement("p");
+            summary.className = "entry-summary";
+            summary.textContent = entry.summary;
+            link.appendChild(date);
+            link.appendChild(summary);
+            article.appendChild(link);
+            list.appendChild(article);
+        });
+    }
+
+    var query = new URLSearchParams(location.search).get("q") || "";
+    document.getElementById("search-input").value = query;
+    if (query.trim()) {
+        search(query).then(function (results) { render(query, results); });
+    }
+})();
+"""
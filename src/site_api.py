@@ -0,0 +1,256 @@
+"""
+站点数据接口模块
+把分析结果以机器可读的格式发布到站点，下游不必再解析 HTML：
+- api/{date}.json：当天的完整结果（摘要、关键词、分类和资讯）
+- api/index.json：分页清单，列出各月分页及条目数、最后更新时间
+- api/months/YYYY-MM.json：一个月的条目（日期从新到旧）
+- feed.json（JSON Feed 1.1）和 feed.xml（Atom）：最近 FEED_MAX_ITEMS 天
+
+每个条目的 id 只由日期决定，updated 只在内容变化时更新；内容没变的文件不重写，
+配合静态服务器的 ETag / Last-Modified，轮询方可以用条件请求低成本地检查更新。
+每天只改写当天的文件、当月分页、清单和两个 feed。
+"""
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+from src.config import SITE_META, GITHUB_PAGES_URL, FEED_MAX_ITEMS
+from src.build_manifest import BuildManifest, get_build_manifest
+from src.template_engine import Template
+
+API_DIRNAME = "api"
+API_VERSION = 1
+
+FEED_CONTENT_TEMPLATE = Template("""<ul>
+{% for line in summary %}
+<li>{{ line }}</li>
+{% endfor %}
+</ul>
+{% for cat in categories %}
+<h3>{{ cat.get("icon", "") }} {{ cat.get("name", "") }}</h3>
+<ul>
+{% for item in cat["items"] %}
+<li>{% if item.get("url") %}<a href="{{ item["url"] }}">{{ item.get("title", "") }}</a>{% else %}{{ item.get("title", "") }}{% endif %}：{{ item.get("summary", "") }}</li>
+{% endfor %}
+</ul>
+{% endfor %}
+""", name="feed_content")
+
+ATOM_TEMPLATE = Template("""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+    <title>{{ site["title"] }}</title>
+    <subtitle>{{ site["description"] }}</subtitle>
+    <id>{{ feed_id }}</id>
+    <updated>{{ updated }}</updated>
+    <link rel="alternate" href="{{ home_url }}"/>
+    <link rel="self" href="{{ self_url }}"/>
+    <author><name>{{ site["author"] }}</name></author>
+    {% for item in items %}
+    <entry>
+        <id>{{ item["id"] }}</id>
+        <title>{{ item["title"] }}</title>
+        <link rel="alternate" href="{{ item["url"] }}"/>
+        <updated>{{ item["date_modified"] }}</updated>
+        <published>{{ item["date_published"] }}</published>
+        <summary>{{ item["summary"] }}</summary>
+        <content type="html">{{ item["content_html"] }}</content>
+    </entry>
+    {% endfor %}
+</feed>
+""", name="atom")
+
+
+def _read_json(path: Path, default):
+    if not path.exists():
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠️ 接口文件损坏，已忽略: {path}")
+        return default
+
+
+def _dump(data) -> str:
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class SiteAPI:
+    """按日期的 JSON 接口、分页清单和订阅源"""
+
+    def __init__(self, output_dir: str, manifest: BuildManifest = None, base_url: str = None, feed_size: int = None):
+        """
+        Args:
+            output_dir: 站点输出目录
+            manifest: 写文件用的构建清单，默认使用输出目录的共享清单
+            base_url: 站点地址（用于 feed 中的绝对链接），默认 GITHUB_PAGES_URL
+            feed_size: feed 包含的天数，默认 FEED_MAX_ITEMS
+        """
+        self.output_dir = Path(output_dir)
+        self.api_dir = self.output_dir / API_DIRNAME
+        self.manifest = manifest or get_build_manifest(self.output_dir)
+        self.base_url = (GITHUB_PAGES_URL if base_url is None else base_url).rstrip("/")
+        self.feed_size = feed_size or FEED_MAX_ITEMS
+
+    def _url(self, path: str) -> str:
+        """站点内路径 -> 链接（配置了站点地址时为绝对链接）"""
+        return f"{self.base_url}/{path}" if self.base_url else (path or "./")
+
+    def day_path(self, date: str) -> Path:
+        return self.api_dir / f"{date}.json"
+
+    def month_path(self, month: str) -> Path:
+        return self.api_dir / "months" / f"{month}.json"
+
+    def load_day(self, date: str) -> Optional[Dict[str, Any]]:
+        return _read_json(self.day_path(date), None)
+
+    def months(self) -> List[Dict[str, Any]]:
+        """分页列表 [{"month", "count", "updated", "url"}]，从新到旧"""
+        return _read_json(self.api_dir / "index.json", {}).get("months", [])
+
+    def add(self, result: Dict[str, Any]):
+        """发布（或更新）一天的结果：当天文件、当月分页、清单和 feed"""
+        payload = self._write_day(result)
+        month = payload["date"][:7]
+        entries = [e for e in _read_json(self.month_path(month), {}).get("days", []) if e["date"] != payload["date"]]
+        entries.append(self._month_entry(payload))
+        self._write_month(month, entries)
+
+        months = [m for m in self.months() if m["month"] != month]
+        months.append(self._month_summary(month, entries))
+        self._write_index(months)
+        self._write_feeds()
+
+    def rebuild(self, results: Iterable[Dict[str, Any]]):
+        """按全部结果重写接口文件和 feed"""
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for result in results:
+            payload = self._write_day(result)
+            by_month.setdefault(payload["date"][:7], []).append(self._month_entry(payload))
+        for month, entries in by_month.items():
+            self._write_month(month, entries)
+        self._write_index([self._month_summary(month, entries) for month, entries in by_month.items()])
+        self._write_feeds()
+
+    def _write_day(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """写入当天的接口文件；内容与上次相同时沿用原 updated，文件保持不变"""
+        date = result["date"]
+        payload = {
+            "version": API_VERSION,
+            "id": f"urn:ai-daily:{date}",
+            "date": date,
+            "url": self._url(f"{date}.html"),
+            "theme": result.get("theme", "blue"),
+            "summary": result.get("summary", []),
+            "keywords": result.get("keywords", []),
+            "categories": [
+                {
+                    "key": cat.get("key", ""),
+                    "name": cat.get("name", ""),
+                    "icon": cat.get("icon", ""),
+                    "items": [
+                        {
+                            "title": item.get("title", ""),
+                            "summary": item.get("summary", ""),
+                            "url": item.get("url", ""),
+                            "tags": item.get("tags", [])
+                        }
+                        for item in cat["items"]
+                    ]
+                }
+                for cat in result.get("categories", []) if cat.get("items")
+            ],
+        }
+        previous = self.load_day(date) or {}
+        unchanged = previous.get("updated") and {k: v for k, v in previous.items() if k != "updated"} == payload
+        payload["updated"] = previous["updated"] if unchanged else _now()
+        self.manifest.write(self.day_path(date), _dump(payload))
+        return payload
+
+    def _month_entry(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": payload["id"],
+            "date": payload["date"],
+            "updated": payload["updated"],
+            "url": payload["url"],
+            "api": self._url(f"{API_DIRNAME}/{payload['date']}.json"),
+            "summary": payload["summary"][0] if payload["summary"] else ""
+        }
+
+    def _write_month(self, month: str, entries: List[Dict[str, Any]]):
+        entries.sort(key=lambda e: e["date"], reverse=True)
+        self.manifest.write(self.month_path(month), _dump({"version": API_VERSION, "month": month, "days": entries}))
+
+    def _month_summary(self, month: str, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "month": month,
+            "count": len(entries),
+            "updated": max(e["updated"] for e in entries),
+            "url": self._url(f"{API_DIRNAME}/months/{month}.json")
+        }
+
+    def _write_index(self, months: List[Dict[str, Any]]):
+        months.sort(key=lambda m: m["month"], reverse=True)
+        self.manifest.write(self.api_dir / "index.json", _dump({
+            "version": API_VERSION,
+            "updated": max((m["updated"] for m in months), default=""),
+            "total": sum(m["count"] for m in months),
+            "months": months
+        }))
+
+    def _latest(self) -> List[Dict[str, Any]]:
+        """最近 feed_size 天的接口数据（按分页从新到旧读取）"""
+        payloads = []
+        for month in self.months():
+            for entry in _read_json(self.month_path(month["month"]), {}).get("days", []):
+                if len(payloads) >= self.feed_size:
+                    return payloads
+                payload = self.load_day(entry["date"])
+                if payload:
+                    payloads.append(payload)
+        return payloads
+
+    def _write_feeds(self):
+        """JSON Feed 和 Atom：条目 id 即当天 id，date_modified 即当天 updated"""
+        items = [
+            {
+                "id": payload["id"],
+                "url": payload["url"],
+                "title": f"{SITE_META['title']} · {payload['date']}",
+                "summary": "；".join(payload["summary"]),
+                "content_html": FEED_CONTENT_TEMPLATE.render(
+                    summary=payload["summary"], categories=payload["categories"]
+                ),
+                "date_published": f"{payload['date']}T00:00:00+00:00",
+                "date_modified": payload["updated"],
+                "tags": payload["keywords"]
+            }
+            for payload in self._latest()
+        ]
+        updated = max((item["date_modified"] for item in items), default=_now())
+
+        json_feed = {
+            "version": "https://jsonfeed.org/version/1.1",
+            "title": SITE_META["title"],
+            "description": SITE_META["description"],
+            "home_page_url": self._url(""),
+            "feed_url": self._url("feed.json"),
+            "language": "zh-CN",
+            "authors": [{"name": SITE_META["author"]}],
+            "items": items
+        }
+        self.manifest.write(self.output_dir / "feed.json", _dump(json_feed))
+        self.manifest.write(self.output_dir / "feed.xml", ATOM_TEMPLATE.render(
+            site=SITE_META,
+            feed_id="urn:ai-daily:feed",
+            updated=updated,
+            home_url=self._url(""),
+            self_url=self._url("feed.xml"),
+            items=items
+        ))
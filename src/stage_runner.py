@@ -0,0 +1,108 @@
+"""
+并发阶段执行模块
+页面生成之后的分享卡片、小红书封面、邮件和飞书通知互不依赖，各自在独立线程中执行：
+- 总耗时取决于最慢的阶段，而不是所有阶段之和
+- 每个阶段有各自的超时时间，超时的阶段不再等待（守护线程，不阻塞进程退出）
+- 阶段抛出的异常只记录在该阶段的结果中，不影响其他阶段
+
+线程无法被强制终止：超时的阶段仍在后台运行，可能在之后写入文件。
+会写入站点文件的阶段需要在预压缩和保存构建清单之前用 join_timed_out 等待其结束。
+"""
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class StageResult:
+    """阶段执行结果"""
+    name: str
+    status: str               # ok / error / timeout
+    seconds: float            # 耗时（超时的阶段为等待的时间）
+    value: Any = None         # 阶段函数的返回值
+    error: Optional[str] = None
+    thread: Optional[threading.Thread] = field(default=None, repr=False, compare=False)  # 超时的阶段仍在运行的线程
+
+
+def run_stages(stages: Dict[str, Tuple[Callable[[], Any], float]]) -> Dict[str, StageResult]:
+    """
+    并发执行阶段
+
+    Args:
+        stages: {阶段名: (无参函数, 超时秒数)}，按插入顺序启动和汇报
+
+    Returns:
+        {阶段名: StageResult}
+    """
+    results: Dict[str, StageResult] = {}
+    threads = {}
+
+    def worker(name: str, func: Callable[[], Any]):
+        start = time.perf_counter()
+        try:
+            value = func()
+        except Exception as e:
+            results[name] = StageResult(name, "error", time.perf_counter() - start, error=str(e))
+        else:
+            results[name] = StageResult(name, "ok", time.perf_counter() - start, value=value)
+
+    started = time.perf_counter()
+    for name, (func, _) in stages.items():
+        thread = threading.Thread(target=worker, args=(name, func), name=f"stage-{name}", daemon=True)
+        thread.start()
+        threads[name] = thread
+
+    for name, (_, timeout) in stages.items():
+        remaining = started + timeout - time.perf_counter()
+        threads[name].join(max(remaining, 0))
+        if threads[name].is_alive():
+            results[name] = StageResult(
+                name, "timeout", time.perf_counter() - started,
+                error=f"超过 {timeout:g} 秒未完成", thread=threads[name]
+            )
+
+    return {name: results[name] for name in stages}
+
+
+def join_timed_out(
+    results: Dict[str, StageResult],
+    names: Iterable[str] = None,
+    timeout: float = None
+) -> List[str]:
+    """
+    等待超时后仍在后台运行的阶段结束
+
+    Args:
+        results: run_stages 的返回值
+        names: 只等待这些阶段（如会写入站点文件的阶段），默认等待全部超时的阶段
+        timeout: 总等待秒数，None 表示一直等待
+
+    Returns:
+        等待结束后仍未完成的阶段名
+    """
+    names = list(results) if names is None else [name for name in names if name in results]
+    started = time.perf_counter()
+    alive = []
+    for name in names:
+        thread = results[name].thread
+        if thread is None:
+            continue
+        remaining = None if timeout is None else max(started + timeout - time.perf_counter(), 0)
+        thread.join(remaining)
+        if thread.is_alive():
+            alive.append(name)
+    return alive
+
+
+def print_stage_report(results: Dict[str, StageResult], wall_seconds: float):
+    """打印各阶段耗时和状态，以及并发执行节省的时间"""
+    icons = {"ok": "✅", "error": "❌", "timeout": "⏱️"}
+    print("   阶段耗时:")
+    for result in results.values():
+        line = f"   {icons[result.status]} {result.name:<12}{result.seconds:>8.2f}s"
+        if result.error:
+            line += f"  {result.error}"
+        print(line)
+    total = sum(result.seconds for result in results.values())
+    print(f"   并发总耗时 {wall_seconds:.2f}s（顺序执行约 {total:.2f}s）")
@@ -0,0 +1,229 @@
+"""
+LLM 调用记录模块
+每次 LLM 调用记录 token 用量（含缓存）、首 token 延迟、总延迟、重试次数和估算费用，
+追加写入 JSONL 账本，可按阶段/模型/日期汇总分位数：
+
+    python -m src.telemetry                 # 全部记录按阶段汇总
+    python -m src.telemetry --days 7 --by day
+"""
+import json
+import argparse
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator
+
+from src.config import (
+    ENABLE_LLM_LEDGER,
+    LLM_LEDGER_PATH,
+    MODEL_PRICING,
+    CLAUDE_PRICE_INPUT,
+    CLAUDE_PRICE_OUTPUT
+)
+
+# 缓存读写相对输入单价的倍率
+CACHE_READ_RATE = 0.1
+CACHE_WRITE_RATE = 1.25
+
+
+@dataclass
+class LLMCallRecord:
+    """一次 LLM 调用（含重试和对冲）的记录"""
+    stage: str                      # 调用阶段，如 entries / daily_summary / daily_report
+    model: str
+    endpoint: str                   # 最终返回结果的端点
+    status: str = "ok"              # ok / error
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    max_tokens: int = 0
+    ttft_ms: Optional[float] = None  # 首 token 延迟（成功的那次请求）
+    latency_ms: float = 0.0          # 总延迟（含重试等待）
+    retries: int = 0
+    hedged: bool = False
+    stop_reason: str = ""
+    cost_usd: Optional[float] = None  # 未知单价时为空
+    error: str = ""
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+
+
+def get_model_pricing(model: str) -> Optional[Dict[str, float]]:
+    """
+    获取模型单价（美元 / 百万 token）
+
+    环境变量 CLAUDE_PRICE_INPUT/CLAUDE_PRICE_OUTPUT 优先，其次按模型名前缀匹配内置单价表
+
+    Returns:
+        {"input": 单价, "output": 单价}，未知模型返回 None
+    """
+    if CLAUDE_PRICE_INPUT or CLAUDE_PRICE_OUTPUT:
+        return {"input": CLAUDE_PRICE_INPUT, "output": CLAUDE_PRICE_OUTPUT}
+    for prefix, pricing in sorted(MODEL_PRICING.items(), key=lambda item: -len(item[0])):
+        if (model or "").startswith(prefix):
+            return pricing
+    return None
+
+
+def estimate_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0
+) -> Optional[float]:
+    """按模型单价估算一次调用的费用（美元），未知模型返回 None"""
+    pricing = get_model_pricing(model)
+    if pricing is None:
+        return None
+    cost = (
+        input_tokens * pricing["input"]
+        + cache_read_tokens * pricing["input"] * CACHE_READ_RATE
+        + cache_write_tokens * pricing["input"] * CACHE_WRITE_RATE
+        + output_tokens * pricing["output"]
+    )
+    return round(cost / 1_000_000, 6)
+
+
+class LLMLedger:
+    """只追加的 JSONL 调用账本，每条记录一行"""
+
+    def __init__(self, path: str = None):
+        self.path = Path(path or LLM_LEDGER_PATH)
+        self._lock = threading.Lock()
+
+    def append(self, record: LLMCallRecord):
+        """追加一条记录（写入失败只打印警告，不影响分析流程）"""
+        line = json.dumps(asdict(record), ensure_ascii=False)
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line + "\n")
+        except OSError as e:
+            print(f"⚠️ LLM 调用记录写入失败: {e}")
+
+    def read(self, since: datetime = None) -> Iterator[Dict[str, Any]]:
+        """
+        读取记录
+
+        Args:
+            since: 只返回该时间之后的记录
+
+        Returns:
+            记录字典迭代器（跳过损坏的行）
+        """
+        if not self.path.exists():
+            return
+        cutoff = since.isoformat(timespec="seconds") if since else ""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("timestamp", "") >= cutoff:
+                    yield record
+
+
+_default_ledger: Optional[LLMLedger] = None
+
+
+def get_ledger() -> Optional[LLMLedger]:
+    """获取默认账本，ENABLE_LLM_LEDGER 关闭时返回 None"""
+    global _default_ledger
+    if not ENABLE_LLM_LEDGER:
+        return None
+    if _default_ledger is None:
+        _default_ledger = LLMLedger()
+    return _default_ledger
+
+
+# ============================================================================
+# 汇总
+# ============================================================================
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """线性插值分位数，q 取 0-100"""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = (len(values) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def summarize(records: List[Dict[str, Any]], by: str = "stage") -> Dict[str, Dict[str, Any]]:
+    """
+    按维度汇总记录
+
+    Args:
+        records: 账本记录
+        by: 分组维度 stage / model / endpoint / day
+
+    Returns:
+        {分组: 统计}，统计包含调用数、错误数、重试数、费用合计和各指标的 p50/p90/p99
+    """
+    groups = defaultdict(list)
+    for record in records:
+        key = record.get("timestamp", "")[:10] if by == "day" else record.get(by, "")
+        groups[key or "-"].append(record)
+
+    summary = {}
+    for key, group in sorted(groups.items()):
+        ok = [record for record in group if record.get("status") == "ok"]
+        costs = [record["cost_usd"] for record in ok if record.get("cost_usd") is not None]
+        stats = {
+            "calls": len(group),
+            "errors": len(group) - len(ok),
+            "retries": sum(record.get("retries", 0) for record in group),
+            "hedged": sum(1 for record in group if record.get("hedged")),
+            "truncated": sum(1 for record in ok if record.get("stop_reason") == "max_tokens"),
+            "cost_usd": round(sum(costs), 4) if costs else None,
+        }
+        for metric in ("latency_ms", "ttft_ms", "input_tokens", "output_tokens", "cache_read_tokens"):
+            values = [record[metric] for record in ok if record.get(metric) is not None]
+            stats[metric] = {f"p{q}": percentile(values, q) for q in (50, 90, 99)}
+        summary[key] = stats
+    return summary
+
+
+def _format(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.0f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="汇总 LLM 调用记录")
+    parser.add_argument("--path", help="账本路径")
+    parser.add_argument("--days", type=int, help="只统计最近 N 天")
+    parser.add_argument("--by", default="stage", choices=["stage", "model", "endpoint", "day"], help="分组维度")
+    parser.add_argument("--json", action="store_true", help="输出 JSON")
+    args = parser.parse_args()
+
+    since = datetime.now() - timedelta(days=args.days) if args.days else None
+    records = list(LLMLedger(args.path).read(since))
+    if not records:
+        print("没有 LLM 调用记录")
+        return
+
+    summary = summarize(records, args.by)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+
+    print(f"记录数: {len(records)}  ({records[0]['timestamp']} ~ {records[-1]['timestamp']})")
+    for key, stats in summary.items():
+        cost = "-" if stats["cost_usd"] is None else f"${stats['cost_usd']:.4f}"
+        print(f"\n[{key}] 调用 {stats['calls']} 次，错误 {stats['errors']}，重试 {stats['retries']}，"
+              f"对冲 {stats['hedged']}，截断 {stats['truncated']}，费用 {cost}")
+        print(f"   {'指标':<18}{'p50':>10}{'p90':>10}{'p99':>10}")
+        for metric in ("latency_ms", "ttft_ms", "input_tokens", "output_tokens", "cache_read_tokens"):
+            values = stats[metric]
+            print(f"   {metric:<20}{_format(values['p50']):>10}{_format(values['p90']):>10}{_format(values['p99']):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+模板引擎模块
+把 HTML 模板预编译为 Python 生成器函数，渲染时逐段产出字符串，再一次性 join（或直接写入文件流），
+避免 `html += ...` 反复拼接导致的二次方开销。输出默认转义，`|safe` 标记的表达式原样输出。
+
+支持的语法（表达式均为 Python 表达式）：
+    {{ expr }}                   输出并转义
+    {{ expr|safe }}              原样输出
+    {% for a, b in expr %}...{% endfor %}
+    {% if expr %}...{% elif expr %}...{% else %}...{% endif %}
+    {% set name = expr %}
+单独占一行的 {% ... %} 标签连同所在行的缩进和换行一起去掉，不会在输出中留下空行。
+"""
+import re
+import ast
+import html
+import builtins
+from typing import Any, Iterator, List, Set
+
+
+class TemplateError(Exception):
+    """模板语法错误"""
+
+
+class Markup(str):
+    """已转义或可信的 HTML 片段，转义时原样输出"""
+
+
+def escape(value: Any) -> str:
+    """HTML 转义（None 输出为空字符串，Markup 原样输出）"""
+    if value is None:
+        return ""
+    if isinstance(value, Markup):
+        return value
+    return html.escape(str(value), quote=True)
+
+
+# 单独占一行的块标签（含行首缩进和行尾换行，标签内不跨行、不含 %}）| 输出表达式 | 行内块标签
+_TOKEN_RE = re.compile(
+    r"^[ \t]*\{%(?P<line_block>(?:(?!%\})[^\n])*)%\}[ \t]*(?:\n|\Z)"
+    r"|\{\{(?P<expr>.*?)\}\}"
+    r"|\{%(?P<block>.*?)%\}",
+    re.MULTILINE | re.DOTALL
+)
+_SAFE_SUFFIX_RE = re.compile(r"\|\s*safe\s*$")
+_BUILTINS = set(dir(builtins))
+
+
+def _names(source: str, mode: str = "eval") -> Set[str]:
+    """表达式中读取的变量名"""
+    try:
+        tree = ast.parse(source.strip(), mode=mode)
+    except SyntaxError as e:
+        raise TemplateError(f"表达式语法错误: {source.strip()!r}") from e
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)}
+
+
+def _targets(source: str) -> Set[str]:
+    """for/set 的赋值目标中的变量名"""
+    try:
+        tree = ast.parse(f"{source.strip()} = None")
+    except SyntaxError as e:
+        raise TemplateError(f"赋值目标语法错误: {source.strip()!r}") from e
+    return {node.id for node in ast.walk(tree.body[0].targets[0]) if isinstance(node, ast.Name)}
+
+
+class Template:
+    """
+    预编译模板
+
+    用法：
+        template = Template("<li>{{ title }}</li>")
+        template.render(title="A & B")        # '<li>A &amp; B</li>'
+        for chunk in template.render_iter(title="..."):
+            stream.write(chunk)
+    """
+
+    def __init__(self, source: str, name: str = "<template>"):
+        """
+        Args:
+            source: 模板文本
+            name: 模板名（用于错误信息）
+        """
+        self.name = name
+        self.source = source
+        self.code = self._compile(source)
+        namespace = {"_escape": escape, "_builtins": builtins}
+        exec(compile(self.code, name, "exec"), namespace)
+        self._render = namespace["_render"]
+
+    def _compile(self, source: str) -> str:
+        """把模板翻译为生成器函数的源码"""
+        body: List[str] = []
+        stack: List[str] = []
+        loads: Set[str] = set()
+        stores: Set[str] = set()
+
+        def emit(line: str):
+            body.append("    " * (len(stack) + 1) + line)
+
+        position = 0
+        for match in _TOKEN_RE.finditer(source):
+            if match.start() > position:
+                emit(f"yield {source[position:match.start()]!r}")
+            position = match.end()
+
+            expr = match.group("expr")
+            if expr is not None:
+                safe = _SAFE_SUFFIX_RE.search(expr)
+                expr = expr[:safe.start()] if safe else expr
+                loads |= _names(expr)
+                emit(f"yield str({expr.strip()})" if safe else f"yield _escape({expr.strip()})")
+                continue
+
+            tag = (match.group("line_block") if match.group("line_block") is not None else match.group("block")).strip()
+            keyword, _, rest = tag.partition(" ")
+            if keyword == "for":
+                target, sep, iterable = rest.partition(" in ")
+                if not sep:
+                    raise TemplateError(f"{self.name}: for 标签缺少 in: {tag!r}")
+                stores |= _targets(target)
+                loads |= _names(iterable)
+                emit(f"for {target.strip()} in {iterable.strip()}:")
+                stack.append("for")
+            elif keyword == "if":
+                loads |= _names(rest)
+                emit(f"if {rest.strip()}:")
+                stack.append("if")
+            elif keyword in ("elif", "else"):
+                if not stack or stack[-1] != "if":
+                    raise TemplateError(f"{self.name}: {keyword} 不在 if 块内")
+                stack.pop()
+                if keyword == "elif":
+                    loads |= _names(rest)
+                    emit(f"elif {rest.strip()}:")
+                else:
+                    emit("else:")
+                stack.append("if")
+            elif keyword in ("endfor", "endif"):
+                if not stack or stack[-1] != keyword[3:]:
+                    raise TemplateError(f"{self.name}: 多余的 {keyword}")
+                emit("pass")
+                stack.pop()
+            elif keyword == "set":
+                target, sep, value = rest.partition("=")
+                if not sep:
+                    raise TemplateError(f"{self.name}: set 标签缺少 =: {tag!r}")
+                stores |= _targets(target)
+                loads |= _names(value)
+                emit(f"{target.strip()} = {value.strip()}")
+            else:
+                raise TemplateError(f"{self.name}: 未知标签 {keyword!r}")
+
+        if position < len(source):
+            emit(f"yield {source[position:]!r}")
+        if stack:
+            raise TemplateError(f"{self.name}: 未闭合的 {stack[-1]} 块")
+
+        # 模板中读取的名字先从上下文取值（之后可能被 for/set 重新赋值，赋值前的读取仍取上下文的值）；
+        # 被模板赋值的内置名字在上下文中没有时默认为内置对象
+        header = ["def _render(_context):"]
+        for name in sorted(loads - (_BUILTINS - stores)):
+            default = f", _builtins.{name}" if name in _BUILTINS else ""
+            header.append(f"    {name} = _context.get({name!r}{default})")
+        return "\n".join(header + body + ["    return", ""])
+
+    def render_iter(self, **context) -> Iterator[str]:
+        """逐段产出渲染结果，适合直接写入文件流"""
+        return self._render(context)
+
+    def render(self, **context) -> str:
+        """渲染为完整字符串"""
+        return "".join(self._render(context))
@@ -0,0 +1,136 @@
+"""
+本地抽取式预摘要模块（TextRank）
+在构建提示词之前把长资讯压缩为最核心的若干句，减少输入 token：
+句子用 TF-IDF 特征向量表示（特征哈希到固定维度），余弦相似度矩阵作为句子图，
+用 PageRank 幂迭代计算句子中心度，按压缩比保留得分最高的句子并恢复原文顺序
+"""
+import re
+import zlib
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from src.config import (
+    SUMMARY_COMPRESSION_RATIO,
+    SUMMARIZE_MIN_TOKENS
+)
+from src.pre_classifier import tokenize
+from src.token_budget import estimate_tokens
+
+# 句子特征向量维度（特征哈希），句子数很多时也能控制相似度计算的内存
+FEATURE_DIM = 4096
+# 单次 TextRank 最多处理的句子数，超出部分按原顺序分块处理
+MAX_SENTENCES = 1500
+
+_SENTENCE_RE = re.compile(r"[^。！？!?\n]+?(?:[。！？!?]+|\.(?=\s)|\n|$)")
+_MARKDOWN_PREFIX_RE = re.compile(r"^\s*(?:[#>*\-+]+|\d+[.)])\s*")
+
+
+@dataclass
+class SummaryResult:
+    """预摘要结果"""
+    text: str
+    original_tokens: int
+    summary_tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.summary_tokens
+
+
+def split_sentences(text: str) -> List[str]:
+    """按中英文句末标点和换行切分句子，去掉 markdown 列表/标题标记和过短的片段"""
+    sentences = []
+    for match in _SENTENCE_RE.finditer(text or ""):
+        sentence = _MARKDOWN_PREFIX_RE.sub("", match.group(0)).strip()
+        if len(sentence) >= 4:
+            sentences.append(sentence)
+    return sentences
+
+
+def _feature_matrix(sentences: List[str]) -> np.ndarray:
+    """句子的 TF-IDF 特征矩阵（行已归一化），词通过 crc32 哈希到 FEATURE_DIM 维"""
+    n = len(sentences)
+    counts = np.zeros((n, FEATURE_DIM), dtype=np.float32)
+    for row, sentence in enumerate(sentences):
+        for token in tokenize(sentence):
+            counts[row, zlib.crc32(token.encode("utf-8")) % FEATURE_DIM] += 1
+    df = np.count_nonzero(counts, axis=0)
+    # 去掉没有出现的维度，相似度矩阵乘法的规模只与实际词表大小有关
+    used = df > 0
+    idf = np.log((1 + n) / (1 + df[used])).astype(np.float32) + 1
+    features = counts[:, used] * idf
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    return features / np.maximum(norms, 1e-9)
+
+
+def textrank(sentences: List[str], damping: float = 0.85, iterations: int = 50, tol: float = 1e-6) -> np.ndarray:
+    """
+    计算句子中心度
+
+    Returns:
+        与 sentences 对应的得分数组（和为 1）
+    """
+    n = len(sentences)
+    if n <= 2:
+        return np.full(n, 1.0 / max(n, 1))
+
+    features = _feature_matrix(sentences)
+    similarity = (features @ features.T).astype(np.float64)
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    # 与其他句子都不相似的句子均匀跳转
+    transition = np.where(row_sums > 0, similarity / np.maximum(row_sums, 1e-9), 1.0 / n)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * (scores @ transition)
+        if np.abs(updated - scores).sum() < tol:
+            scores = updated
+            break
+        scores = updated
+    return scores / scores.sum()
+
+
+def summarize(text: str, ratio: float = None, min_tokens: int = None, max_tokens: int = None) -> SummaryResult:
+    """
+    抽取式压缩长文本
+
+    Args:
+        text: 原文
+        ratio: 保留的 token 比例，默认 SUMMARY_COMPRESSION_RATIO
+        min_tokens: 原文不超过该 token 数时不压缩，默认 SUMMARIZE_MIN_TOKENS
+        max_tokens: 摘要的 token 上限（如提示词预算），超长原文按中心度选句而不是截取开头
+
+    Returns:
+        预摘要结果（不需要压缩时 text 为原文）
+    """
+    ratio = SUMMARY_COMPRESSION_RATIO if ratio is None else ratio
+    min_tokens = SUMMARIZE_MIN_TOKENS if min_tokens is None else min_tokens
+    original_tokens = estimate_tokens(text)
+    target = int(original_tokens * ratio)
+    if max_tokens is not None:
+        target = min(target, max_tokens)
+    if original_tokens <= min_tokens or target >= original_tokens:
+        return SummaryResult(text, original_tokens, original_tokens)
+
+    # 完全重复的句子（重复的标题、引用）只保留第一次出现，否则会互相抬高中心度
+    sentences = list(dict.fromkeys(split_sentences(text)))
+    if len(sentences) <= 3:
+        return SummaryResult(text, original_tokens, original_tokens)
+
+    # 分块得分乘以块内句子数，使不同大小的块之间可比
+    chunks = [sentences[start:start + MAX_SENTENCES] for start in range(0, len(sentences), MAX_SENTENCES)]
+    scores = np.concatenate([textrank(chunk) * len(chunk) for chunk in chunks])
+
+    keep, used = [], 0
+    for index in np.argsort(-scores, kind="stable"):
+        tokens = estimate_tokens(sentences[index])
+        if used + tokens > target and keep:
+            continue
+        keep.append(index)
+        used += tokens
+
+    summary = "\n".join(sentences[i] for i in sorted(keep))
+    return SummaryResult(summary, original_tokens, estimate_tokens(summary))
@@ -0,0 +1,178 @@
+"""
+Token 预算模块
+- 本地估算 token 数（区分中日韩字符和英文），不调用 API
+- 按输入 token 预算挑选资讯并分配每条资讯的摘录长度，让提示词大小（以及延迟）可预期
+"""
+import re
+import heapq
+from typing import Callable, Dict, Any, List, Optional, Sequence
+
+from src.config import (
+    PROMPT_TOKEN_BUDGET,
+    ENTRY_MIN_EXCERPT_TOKENS,
+    ENTRY_MAX_EXCERPT_TOKENS
+)
+
+# 每个字符对应的 token 数：中日韩字符约 1 个 token，英文约 4 个字符 1 个 token，
+# 其他非 ASCII 字符（重音字母、符号、emoji 等）按 0.5 计。取值偏保守，用于预算和限流预占
+CJK_TOKENS_PER_CHAR = 1.0
+ASCII_TOKENS_PER_CHAR = 0.25
+OTHER_TOKENS_PER_CHAR = 0.5
+
+# 摘录每次扩展的 token 数
+EXCERPT_CHUNK_TOKENS = 50
+
+_CJK_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿＀-￯]")
+_SENTENCE_END_RE = re.compile(r"[。！？；.!?;]\s|[。！？；]|\n")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本的 token 数
+
+    Args:
+        text: 任意文本
+
+    Returns:
+        估算的 token 数（非空文本至少为 1）
+    """
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    cjk_chars = len(_CJK_RE.findall(text))
+    other_chars = len(text) - ascii_chars - cjk_chars
+    tokens = (
+        cjk_chars * CJK_TOKENS_PER_CHAR
+        + ascii_chars * ASCII_TOKENS_PER_CHAR
+        + other_chars * OTHER_TOKENS_PER_CHAR
+    )
+    return max(1, int(tokens + 0.999))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    截取不超过 max_tokens 的前缀，尽量在句子结尾处截断
+
+    Returns:
+        截取后的文本（被截断时末尾加省略号）
+    """
+    if not text or max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # 二分查找满足预算的最长前缀
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens - 1:  # 为省略号留 1 个 token
+            low = mid
+        else:
+            high = mid - 1
+    prefix = text[:low]
+
+    # 句子边界保留至少 60% 的长度时在边界处截断
+    ends = [match.end() for match in _SENTENCE_END_RE.finditer(prefix)]
+    if ends and ends[-1] >= len(prefix) * 0.6:
+        prefix = prefix[:ends[-1]]
+    return prefix.rstrip() + "…"
+
+
+def pack_entries(
+    entries: Sequence[Dict[str, Any]],
+    scores: Sequence[float],
+    budget: int = None,
+    max_entries: int = None,
+    header_tokens: Sequence[int] = None,
+    min_excerpt: int = None,
+    max_excerpt: int = None,
+    prepare: Optional[Callable[[int], str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    在输入 token 预算内挑选资讯并分配摘录长度，尽量提高总相关度
+
+    收益模型：收录一条资讯获得其得分；摘录每多一段 EXCERPT_CHUNK_TOKENS，
+    第 k 段额外获得 得分/(k+1)（边际收益递减）。按「收益/token」贪心分配。
+    收录一条资讯有固定的标题等开销（header_tokens），收益不是凹函数，贪心只是启发式，
+    不保证最优。得分不大于 0（没有命中查询词）的资讯排在最后：有得分的资讯分配完之后，
+    剩余的预算和条数再按原有顺序（视为得分相同）分配给它们。
+
+    Args:
+        entries: 候选资讯，需要 summary 字段
+        scores: 与 entries 对应的相关度得分（不大于 0 的最后收录）
+        budget: 输入 token 预算，默认 PROMPT_TOKEN_BUDGET
+        max_entries: 最多收录条数
+        header_tokens: 每条资讯标题/来源/链接等固定部分的 token 数，默认按标题估算
+        min_excerpt: 收录时的最短摘录 token 数，默认 ENTRY_MIN_EXCERPT_TOKENS
+        max_excerpt: 单条摘录的最大 token 数，默认 ENTRY_MAX_EXCERPT_TOKENS
+        prepare: 收录一条资讯前调用 prepare(下标)，返回实际用于摘录的文本（如预摘要）；
+            只对轮到收录的资讯调用，候选很多时开销只与收录条数有关
+
+    Returns:
+        按得分从高到低排列的 [{"index": 下标, "excerpt": 摘录, "tokens": 该条占用的 token 数}]
+    """
+    budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+    min_excerpt = ENTRY_MIN_EXCERPT_TOKENS if min_excerpt is None else min_excerpt
+    max_excerpt = ENTRY_MAX_EXCERPT_TOKENS if max_excerpt is None else max_excerpt
+    max_entries = len(entries) if max_entries is None else max_entries
+    if header_tokens is None:
+        header_tokens = [estimate_tokens(entry.get("title", "")) + 20 for entry in entries]
+
+    texts = [entry.get("summary", "") or "" for entry in entries]
+    available = [min(estimate_tokens(text), max_excerpt) for text in texts]
+
+    allocated: Dict[int, int] = {}   # 下标 -> 已分配的摘录 token 数
+    chunks: Dict[int, int] = {}      # 下标 -> 已扩展段数
+    remaining = budget
+
+    # 先分配有得分的资讯，再把剩余的预算按相同得分分配给没有得分的资讯
+    weights = [score if score > 0 else 1.0 for score in scores]
+    phases = [
+        [i for i, score in enumerate(scores) if score > 0],
+        [i for i, score in enumerate(scores) if score <= 0]
+    ]
+    for phase in phases:
+        # 堆元素：(-收益/token, 下标, 类型)，类型 0 为收录，1 为扩展一段
+        heap = []
+        for i in phase:
+            cost = header_tokens[i] + min(min_excerpt, available[i])
+            heapq.heappush(heap, (-weights[i] / max(cost, 1), i, 0))
+
+        while heap and remaining > 0:
+            _, i, kind = heapq.heappop(heap)
+            if kind == 0:
+                if len(allocated) >= max_entries:
+                    continue
+                excerpt = min(min_excerpt, available[i])
+                cost = header_tokens[i] + excerpt
+                if cost > remaining:
+                    continue
+                if prepare is not None:
+                    texts[i] = prepare(i) or ""
+                    available[i] = min(estimate_tokens(texts[i]), max_excerpt)
+                    excerpt = min(min_excerpt, available[i])
+                    cost = header_tokens[i] + excerpt
+                allocated[i] = excerpt
+                chunks[i] = 0
+                remaining -= cost
+            else:
+                step = min(EXCERPT_CHUNK_TOKENS, available[i] - allocated[i], remaining)
+                if step <= 0:
+                    continue
+                allocated[i] += step
+                chunks[i] += 1
+                remaining -= step
+
+            if allocated[i] < available[i]:
+                gain = weights[i] / (chunks[i] + 2)
+                heapq.heappush(heap, (-gain / EXCERPT_CHUNK_TOKENS, i, 1))
+
+    packed = []
+    for i in sorted(allocated, key=lambda index: (-scores[index], index)):
+        excerpt = truncate_to_tokens(texts[i], allocated[i])
+        packed.append({
+            "index": i,
+            "excerpt": excerpt,
+            "tokens": header_tokens[i] + estimate_tokens(excerpt)
+        })
+    return packed
@@ -8,6 +8,8 @@ from pathlib import Path
 from datetime import datetime
 
 from src.config import OUTPUT_DIR
+from src.build_manifest import get_build_manifest
+from src.minify import minify_html
 
 
 class XiaohongshuGenerator:
@@ -70,8 +72,7 @@ class XiaohongshuGenerator:
         filename = f"xhs-{date}.html"
         filepath = self.output_dir / filename
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        get_build_manifest(self.output_dir.parent).write(filepath, minify_html(html_content))
 
         return str(filepath)
 
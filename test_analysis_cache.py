@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+单条资讯分析缓存测试
+规范化 URL + 内容哈希作为缓存键：追踪参数、大小写和空白差异仍命中，内容变化则不命中
+"""
+import sys
+import json
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.analysis_cache import AnalysisCache, canonical_url, entry_cache_key
+
+ENTRY = {
+    "title": "Google releases MedGemma 1.5",
+    "summary": "Google released MedGemma 1.5, an open medical imaging model.",
+    "link": "https://Example.com:443/news/medgemma/?utm_source=rss&b=2&a=1#comments"
+}
+ANALYSIS = {"category": "model", "title": "谷歌发布 MedGemma 1.5", "summary": "医疗多模态模型"}
+
+
+def test_canonical_url():
+    """小写协议和主机、去掉默认端口、片段、追踪参数和末尾斜杠，查询参数排序"""
+    assert canonical_url(ENTRY["link"]) == "https://example.com/news/medgemma?a=1&b=2"
+    assert canonical_url("HTTP://example.com:8080/?ref=hn&fbclid=x") == "http://example.com:8080/"
+    assert canonical_url("https://example.com/a?q=") == "https://example.com/a?q="
+    assert canonical_url("") == ""
+
+
+def test_cache_key_ignores_tracking_and_whitespace():
+    """同一资讯换了追踪参数、摘要空白不同时缓存键不变；摘录长度不同但 full_summary 相同时也不变"""
+    variant = {
+        **ENTRY,
+        "link": "https://example.com/news/medgemma?a=1&b=2&utm_medium=social",
+        "summary": "  Google released MedGemma 1.5,\nan open   medical imaging model. "
+    }
+    assert entry_cache_key(variant) == entry_cache_key(ENTRY)
+
+    full = "Google released MedGemma 1.5. " * 20
+    assert entry_cache_key({**ENTRY, "summary": full[:50], "full_summary": full}) == \
+        entry_cache_key({**ENTRY, "summary": full[:80], "full_summary": full})
+
+
+def test_hit_and_miss():
+    """写入后命中（返回副本），保存后新实例同样命中；标题或正文变化、链接不同都不命中"""
+    cache_dir = tempfile.mkdtemp()
+    cache = AnalysisCache(cache_dir)
+    assert cache.get(ENTRY) is None
+    cache.put(ENTRY, ANALYSIS)
+
+    hit = cache.get({**ENTRY, "link": "https://example.com/news/medgemma?b=2&a=1"})
+    assert hit == ANALYSIS
+    hit["title"] = "被修改"
+    assert cache.get(ENTRY)["title"] == ANALYSIS["title"]
+
+    assert cache.get({**ENTRY, "title": "Google releases MedGemma 2"}) is None
+    assert cache.get({**ENTRY, "summary": "Different content."}) is None
+    assert cache.get({**ENTRY, "link": "https://example.com/news/other"}) is None
+
+    cache.save()
+    reloaded = AnalysisCache(cache_dir)
+    assert len(reloaded) == 1 and reloaded.get(ENTRY) == ANALYSIS
+
+
+def test_eviction_by_last_use():
+    """超过 max_age_days 未被使用的记录在保存时淘汰；损坏的缓存文件被忽略"""
+    cache_dir = tempfile.mkdtemp()
+    cache = AnalysisCache(cache_dir, max_age_days=7)
+    cache.put(ENTRY, ANALYSIS)
+    cache.put({**ENTRY, "link": "https://example.com/old"}, ANALYSIS)
+    old_key = entry_cache_key({**ENTRY, "link": "https://example.com/old"})
+    cache._entries[old_key]["used"] = (datetime.now() - timedelta(days=8)).isoformat()
+    cache.save()
+
+    data = json.loads((Path(cache_dir) / AnalysisCache.FILENAME).read_text(encoding="utf-8"))
+    assert list(data) == [entry_cache_key(ENTRY)]
+
+    (Path(cache_dir) / AnalysisCache.FILENAME).write_text("{broken", encoding="utf-8")
+    assert len(AnalysisCache(cache_dir)) == 0
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Claude 分析器重试与对冲请求测试
+使用本地模拟的 Anthropic Messages API 服务，不访问真实 API
+"""
+import sys
+import json
+import time
+import tempfile
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.claude_analyzer import ClaudeAnalyzer
+from src.analysis_cache import AnalysisCache
+from src.retry import RetryPolicy
+from src.rate_limiter import RateLimiter, TokenBucket
+from src.telemetry import LLMLedger
+
+
+TARGET_DATE = "2026-01-13"
+CONTENT = {
+    "title": "AI 资讯日报 - 2026-01-13",
+    "link": "https://news.smol.ai/issues/26-01-13-not-much/",
+    "content": "## 1. MedGemma 1.5 发布\n\nGoogle 发布 4B 参数医疗多模态模型"
+}
+
+
+class StubServer:
+    """
+    本地模拟 API 服务
+
+    按顺序返回 responses 中的 (状态码, 响应头, 延迟秒数)，用完后一直返回最后一个；
+    contents 为每次成功响应的内容块列表，未提供时返回完整日报 JSON 文本
+    """
+
+    def __init__(self, responses, summary="模拟摘要", contents=None):
+        self.responses = list(responses)
+        self.summary = summary
+        self.contents = list(contents or [])
+        self.bodies = []
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._server.block_on_close = False
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next_response(self, body):
+        with self._lock:
+            index = min(self.requests, len(self.responses) - 1)
+            self.requests += 1
+            self.bodies.append(body)
+            status = self.responses[index]
+            content = self.contents.pop(0) if status[0] == 200 and self.contents else None
+            return status, content
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length))
+                (status, headers, delay), content = stub._next_response(body)
+                time.sleep(delay)
+
+                if status == 200:
+                    if content is None:
+                        text = json.dumps({
+                            "status": "success",
+                            "date": TARGET_DATE,
+                            "theme": "blue",
+                            "summary": [stub.summary],
+                            "keywords": ["Google"],
+                            "categories": []
+                        }, ensure_ascii=False)
+                        content = [{"type": "text", "text": text}]
+                    payload = {
+                        "id": "msg_stub",
+                        "type": "message",
+                        "role": "assistant",
+                        "model": body.get("model"),
+                        "content": content,
+                        "stop_reason": "end_turn",
+                        "stop_sequence": None,
+                        "usage": {"input_tokens": 100, "output_tokens": 50}
+                    }
+                else:
+                    payload = {"type": "error", "error": {"type": "api_error", "message": f"stub {status}"}}
+
+                if status == 200 and body.get("stream"):
+                    content_type = "text/event-stream"
+                    data = _sse_events(payload).encode("utf-8")
+                else:
+                    content_type = "application/json"
+                    data = json.dumps(payload).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(data)))
+                    for key, value in headers.items():
+                        self.send_header(key, value)
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # 对冲请求胜出后，另一路请求会被客户端取消
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _sse_events(message) -> str:
+    """把完整消息拆成 Messages API 的流式事件"""
+    def event(data):
+        return f"event: {data['type']}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    events = [event({
+        "type": "message_start",
+        "message": dict(message, content=[], stop_reason=None,
+                        usage={"input_tokens": message["usage"]["input_tokens"], "output_tokens": 1})
+    })]
+    for index, block in enumerate(message["content"]):
+        if block["type"] == "tool_use":
+            start = dict(block, input={})
+            delta = {"type": "input_json_delta", "partial_json": json.dumps(block["input"], ensure_ascii=False)}
+        else:
+            start = dict(block, text="")
+            delta = {"type": "text_delta", "text": block["text"]}
+        events.append(event({"type": "content_block_start", "index": index, "content_block": start}))
+        events.append(event({"type": "content_block_delta", "index": index, "delta": delta}))
+        events.append(event({"type": "content_block_stop", "index": index}))
+    events.append(event({
+        "type": "message_delta",
+        "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+        "usage": {"output_tokens": message["usage"]["output_tokens"]}
+    }))
+    events.append(event({"type": "message_stop"}))
+    return "".join(events)
+
+
+def _analyzer(server: StubServer, hedge: StubServer = None, hedge_delay: float = 0.2,
+              max_retries: int = 3, ledger: LLMLedger = None, rate_limiter: RateLimiter = None):
+    return ClaudeAnalyzer(
+        api_key="test-key",
+        base_url=server.url,
+        rate_limiter=rate_limiter,
+        retry_policy=RetryPolicy(max_retries=max_retries, base_delay=0.01, max_delay=2.0),
+        hedge_base_url=hedge.url if hedge else None,
+        hedge_delay=hedge_delay,
+        cache=AnalysisCache(tempfile.mkdtemp()),
+        ledger=ledger or LLMLedger(Path(tempfile.mkdtemp()) / "ledger.jsonl")
+    )
+
+
+def test_retry_on_transient_5xx():
+    """瞬时 5xx 后重试成功，不进入降级结果"""
+    server = StubServer([(503, {}, 0), (500, {}, 0), (200, {}, 0)])
+    try:
+        result = _analyzer(server).analyze(CONTENT, TARGET_DATE)
+        assert server.requests == 3
+        assert result["summary"] == ["模拟摘要"]
+    finally:
+        server.close()
+
+
+def test_retry_honors_retry_after():
+    """429 响应带 Retry-After 时按服务端要求等待"""
+    server = StubServer([(429, {"Retry-After": "1"}, 0), (200, {}, 0)])
+    try:
+        start = time.monotonic()
+        result = _analyzer(server).analyze(CONTENT, TARGET_DATE)
+        elapsed = time.monotonic() - start
+        assert server.requests == 2
+        assert elapsed >= 0.9
+        assert result["summary"] == ["模拟摘要"]
+    finally:
+        server.close()
+
+
+def test_no_retry_on_client_error():
+    """4xx 请求错误不重试，直接降级"""
+    server = StubServer([(400, {}, 0), (200, {}, 0)])
+    try:
+        result = _analyzer(server).analyze(CONTENT, TARGET_DATE)
+        assert server.requests == 1
+        assert "AI 资讯分析遇到技术问题" in result["summary"][0]
+    finally:
+        server.close()
+
+
+def test_retries_exhausted_falls_back():
+    """重试耗尽后降级为原始内容摘要"""
+    server = StubServer([(503, {}, 0)])
+    try:
+        result = _analyzer(server, max_retries=2).analyze(CONTENT, TARGET_DATE)
+        assert server.requests == 3
+        assert "AI 资讯分析遇到技术问题" in result["summary"][0]
+    finally:
+        server.close()
+
+
+def test_hedge_slow_primary():
+    """主端点超过阈值未响应时，备用端点先返回的结果胜出"""
+    primary = StubServer([(200, {}, 3.0)], summary="主端点")
+    secondary = StubServer([(200, {}, 0)], summary="备用端点")
+    try:
+        start = time.monotonic()
+        result = _analyzer(primary, hedge=secondary, hedge_delay=0.2).analyze(CONTENT, TARGET_DATE)
+        elapsed = time.monotonic() - start
+        assert result["summary"] == ["备用端点"]
+        assert secondary.requests == 1
+        assert elapsed < 2.0
+    finally:
+        primary.close()
+        secondary.close()
+
+
+def test_hedge_record_and_loser_refund():
+    """对冲胜出时调用记录取胜出端点的用量、累加两路的重试；落败和失败的请求归还预占的输出 token"""
+    primary = StubServer([(503, {}, 0), (200, {}, 3.0)], summary="主端点")
+    secondary = StubServer([(200, {}, 0)], summary="备用端点")
+    ledger = LLMLedger(Path(tempfile.mkdtemp()) / "ledger.jsonl")
+    limiter = RateLimiter(rpm=0, tpm=10 ** 6)
+    limiter.tokens = TokenBucket(10 ** 6, per_seconds=10 ** 9)  # 测试期间几乎不回填
+    try:
+        with _analyzer(primary, hedge=secondary, hedge_delay=0.3, ledger=ledger, rate_limiter=limiter) as analyzer:
+            result = analyzer.analyze(CONTENT, TARGET_DATE)
+        assert result["summary"] == ["备用端点"]
+        record = list(ledger.read())[0]
+        assert record["endpoint"] == secondary.url
+        assert record["hedged"] and record["retries"] == 1
+        assert (record["input_tokens"], record["output_tokens"]) == (100, 50)
+        # 主端点两次请求（503 和被取消的慢请求）各只保留提示词部分的预占
+        deficit = limiter.tokens.capacity - limiter.tokens.tokens
+        assert primary.requests == 2
+        assert 0 < deficit < 2 * (record["max_tokens"] + 1)
+        assert round(deficit) % 2 == 0
+    finally:
+        primary.close()
+        secondary.close()
+
+
+def test_hedge_not_sent_for_fast_primary():
+    """主端点在阈值内响应时不发送对冲请求"""
+    primary = StubServer([(200, {}, 0)], summary="主端点")
+    secondary = StubServer([(200, {}, 0)], summary="备用端点")
+    try:
+        result = _analyzer(primary, hedge=secondary, hedge_delay=1.0).analyze(CONTENT, TARGET_DATE)
+        assert result["summary"] == ["主端点"]
+        assert secondary.requests == 0
+    finally:
+        primary.close()
+        secondary.close()
+
+
+def test_hedge_failover_on_primary_error():
+    """主端点重试耗尽后立即切换到备用端点"""
+    primary = StubServer([(500, {}, 0)], summary="主端点")
+    secondary = StubServer([(200, {}, 0)], summary="备用端点")
+    try:
+        result = _analyzer(primary, hedge=secondary, hedge_delay=5.0, max_retries=1).analyze(CONTENT, TARGET_DATE)
+        assert primary.requests == 2
+        assert result["summary"] == ["备用端点"]
+    finally:
+        primary.close()
+        secondary.close()
+
+
+def _tool_use(name, tool_input):
+    return [{"type": "tool_use", "id": "toolu_stub", "name": name, "input": tool_input}]
+
+
+def test_tool_use_response():
+    """按工具调用返回的结构化结果直接使用，分类补全名称和图标"""
+    server = StubServer([(200, {}, 0)], contents=[_tool_use("submit_daily_report", {
+        "status": "success",
+        "theme": "green",
+        "summary": ["MedGemma 1.5 发布"],
+        "keywords": ["Google"],
+        "categories": [{"key": "model", "items": [{"title": "MedGemma 1.5", "summary": "医疗多模态模型"}]}]
+    })])
+    try:
+        result = _analyzer(server).analyze(CONTENT, TARGET_DATE)
+        assert server.bodies[0]["tool_choice"] == {"type": "tool", "name": "submit_daily_report"}
+        assert result["theme"] == "green"
+        assert result["categories"][0]["name"] == "模型发布"
+        assert "parse_error" not in result
+    finally:
+        server.close()
+
+
+def test_truncated_json_repaired():
+    """文本 JSON 被截断时保留已完整输出的部分，只重新请求缺失的字段；标签和关键词在本地提取"""
+    truncated = '```json\n{"status": "success", "theme": "blue", "summary": ["第一条", "第二条", "第三'
+    server = StubServer([(200, {}, 0)], contents=[
+        [{"type": "text", "text": truncated}],
+        _tool_use("submit_daily_report", {"categories": [
+            {"key": "model", "items": [{"title": "谷歌发布 MedGemma 1.5", "summary": "医疗多模态模型"}]}
+        ]})
+    ])
+    try:
+        result = _analyzer(server).analyze(CONTENT, TARGET_DATE)
+        assert server.requests == 2
+        retry_schema = server.bodies[1]["tools"][0]["input_schema"]
+        assert retry_schema["required"] == ["categories"]
+        assert result["summary"] == ["第一条", "第二条"]
+        assert result["categories"][0]["items"][0]["tags"] == ["Google", "MedGemma 1.5"]
+        assert result["keywords"][:2] == ["Google", "MedGemma 1.5"]
+    finally:
+        server.close()
+
+
+def test_ledger_records_call():
+    """每次调用写入一条记录：token 用量、首 token 延迟、重试次数和费用"""
+    server = StubServer([(503, {}, 0), (200, {}, 0.1)])
+    ledger = LLMLedger(Path(tempfile.mkdtemp()) / "ledger.jsonl")
+    try:
+        _analyzer(server, ledger=ledger).analyze(CONTENT, TARGET_DATE)
+        records = list(ledger.read())
+        assert len(records) == 1
+        record = records[0]
+        assert record["status"] == "ok"
+        assert record["stage"] == "daily_report"
+        assert record["retries"] == 1
+        assert (record["input_tokens"], record["output_tokens"]) == (100, 50)
+        assert record["ttft_ms"] >= 100
+        assert record["latency_ms"] >= record["ttft_ms"]
+        assert record["cost_usd"] > 0
+    finally:
+        server.close()
+
+
+def test_long_content_presummarized():
+    """长原文在构建提示词前做抽取式预摘要：多次被提及的要点保留，互不相关的闲聊被去掉"""
+    key_points = [
+        "Google released MedGemma 1.5, an open medical imaging model.",
+        "MedGemma 1.5 from Google improves medical imaging accuracy over the previous MedGemma model.",
+        "Developers can fine-tune the open MedGemma model from Google for medical imaging tasks.",
+    ]
+    chatter = [
+        "The weather in Lisbon was unusually warm this weekend.",
+        "Someone posted a photo of their cat sleeping on a keyboard.",
+        "A long thread debated tabs versus spaces once again.",
+        "The meetup next Tuesday moved to a bigger venue downtown.",
+        "One member recommended a new espresso grinder.",
+        "Discord had a brief outage during the evening hours.",
+        "Several people shared their favorite mechanical switches.",
+        "A podcast episode about startup hiring got a few reactions.",
+        "Somebody asked where to buy cheap monitor arms.",
+        "The moderators reminded everyone to keep threads on topic.",
+        "A user complained that their train was delayed again.",
+        "There was a poll about the best pizza topping.",
+    ]
+    content = {**CONTENT, "content": "\n".join(key_points + chatter * 4)}
+    server = StubServer([(200, {}, 0)])
+    try:
+        _analyzer(server).analyze(content, TARGET_DATE)
+        prompt = server.bodies[0]["messages"][0]["content"]
+        assert any(point in prompt for point in key_points)
+        assert prompt.count(chatter[0]) < 4
+    finally:
+        server.close()
+
+
+def test_incremental_cache_stores_tags():
+    """增量分析写入缓存的结果带本地提取的标签，下次启动时关键词提取器可以用来扩充词典"""
+    entries = [{
+        "title": "Google releases MedGemma 1.5",
+        "summary": "Google released MedGemma 1.5, an open medical imaging model.",
+        "link": "https://example.com/medgemma?utm_source=x",
+        "source": "Example"
+    }]
+    content = {**CONTENT, "entries": entries}
+    server = StubServer([(200, {}, 0)], contents=[
+        _tool_use("submit_entries", {"items": [
+            {"id": 1, "category": "model", "title": "谷歌发布 MedGemma 1.5", "summary": "医疗多模态模型"}
+        ]}),
+        _tool_use("submit_daily_summary", {"summary": ["MedGemma 1.5 发布"], "theme": "green"})
+    ])
+    cache_dir = tempfile.mkdtemp()
+    try:
+        analyzer = ClaudeAnalyzer(
+            api_key="test-key",
+            base_url=server.url,
+            retry_policy=RetryPolicy(max_retries=0),
+            cache=AnalysisCache(cache_dir),
+            ledger=LLMLedger(Path(tempfile.mkdtemp()) / "ledger.jsonl")
+        )
+        analyzer.pre_classifier = None
+        result = analyzer.analyze(content, TARGET_DATE)
+        tags = result["categories"][0]["items"][0]["tags"]
+        assert "MedGemma 1.5" in tags
+
+        cached = AnalysisCache(cache_dir).get(entries[0])
+        assert cached["tags"] == tags
+        assert [entry["summary"] for entry, _ in AnalysisCache(cache_dir).items(llm_labelled_only=True)] == [
+            entries[0]["summary"]
+        ]
+    finally:
+        server.close()
+
+
+def test_analyze_reuses_loop_and_client():
+    """多次同步调用复用同一个事件循环和客户端，close() 后关闭；关闭后再调用会新建事件循环"""
+    server = StubServer([(200, {}, 0)])
+    try:
+        with _analyzer(server) as analyzer:
+            analyzer.analyze(CONTENT, TARGET_DATE)
+            loop = analyzer._loop
+            client = analyzer._clients[loop][server.url]
+            analyzer.analyze(CONTENT, TARGET_DATE)
+            assert analyzer._loop is loop
+            assert analyzer._clients[loop] == {server.url: client}
+        assert loop.is_closed() and analyzer._loop is None
+        assert client.is_closed()
+
+        analyzer.analyze(CONTENT, TARGET_DATE)
+        assert server.requests == 3
+        analyzer.close()
+        analyzer.close()
+    finally:
+        server.close()
+
+
+def test_invalid_category_items_rerequested():
+    """categories 中有无效的资讯或分类时重新请求该字段，而不是静默丢弃"""
+    first = {
+        "status": "success", "theme": "blue", "summary": ["要点"],
+        "categories": [
+            {"key": "model", "items": [{"title": "MedGemma 1.5", "summary": "医疗模型"}, {"summary": "缺少标题"}]},
+            {"key": "unknown", "items": [{"title": "未知分类", "summary": "无效"}]}
+        ]
+    }
+    retried = {"categories": [
+        {"key": "model", "items": [
+            {"title": "MedGemma 1.5", "summary": "医疗模型"},
+            {"title": "Gemini 3", "summary": "新模型"}
+        ]}
+    ]}
+    server = StubServer([(200, {}, 0)], contents=[
+        _tool_use("submit_daily_report", first),
+        _tool_use("submit_daily_report", retried)
+    ])
+    try:
+        result = _analyzer(server).analyze(CONTENT, TARGET_DATE)
+        assert server.requests == 2
+        assert server.bodies[1]["tools"][0]["input_schema"]["required"] == ["categories"]
+        assert [item["title"] for item in result["categories"][0]["items"]] == ["MedGemma 1.5", "Gemini 3"]
+    finally:
+        server.close()
+
+
+def test_invalid_category_items_keep_valid_part():
+    """重新请求仍然无效时，保留第一次结果中的有效分类和资讯"""
+    first = {
+        "status": "success", "theme": "blue", "summary": ["要点"],
+        "categories": [{"key": "model", "items": [{"title": "MedGemma 1.5", "summary": "医疗模型"}, "坏数据"]}]
+    }
+    server = StubServer([(200, {}, 0)], contents=[
+        _tool_use("submit_daily_report", first),
+        _tool_use("submit_daily_report", {"categories": "坏数据"})
+    ])
+    try:
+        result = _analyzer(server).analyze(CONTENT, TARGET_DATE)
+        assert server.requests == 2
+        assert result["theme"] == "blue"
+        assert [item["title"] for item in result["categories"][0]["items"]] == ["MedGemma 1.5"]
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+关键 CSS 测试
+只保留当前页面用到的规则：当前主题、当前页面类型的 class，@media 按内部规则筛选，@keyframes 按引用保留
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.critical_css import PageFeatures, extract_critical_css, stylesheet_tags
+
+CSS = (
+    "body{margin:0}"
+    "body[data-theme=\"purple\"]{--accent:#a855f7}"
+    "body[data-theme=\"blue\"]{--accent:#3b82f6}"
+    ".news-card{padding:1rem}"
+    ".news-card:hover .news-title{color:var(--accent)}"
+    ".index-entry{display:flex}"
+    "#search-input{width:100%}"
+    ".glow{animation:glow-pulse 4s infinite}"
+    "@keyframes glow-pulse{0%{opacity:.5}to{opacity:1}}"
+    "@keyframes unused{0%{opacity:0}to{opacity:1}}"
+    "@media (max-width:768px){.news-card{padding:.5rem}.index-entry{display:block}}"
+)
+
+DAILY_PAGE = (
+    "<!DOCTYPE html><html><head></head><body data-theme=\"purple\">"
+    "<div class=\"news-card\"><h3 class=\"news-title\">标题</h3></div>"
+    "<div class=\"glow\"></div></body></html>"
+)
+
+
+def test_keeps_only_current_page_features():
+    """保留页面上出现的 class 和当前主题的规则，其他页面类型和主题的规则被去掉"""
+    critical = extract_critical_css(DAILY_PAGE, CSS)
+    assert "body{margin:0}" in critical
+    assert 'body[data-theme="purple"]' in critical
+    assert 'body[data-theme="blue"]' not in critical
+    assert ".news-card{padding:1rem}" in critical
+    assert ".news-card:hover .news-title" in critical
+    assert ".index-entry" not in critical
+    assert "#search-input" not in critical
+
+
+def test_media_and_keyframes():
+    """@media 只保留用到的内部规则；@keyframes 只在被用到的声明引用时保留"""
+    critical = extract_critical_css(DAILY_PAGE, CSS)
+    assert "@media (max-width:768px){.news-card{padding:.5rem}}" in critical
+    assert "@keyframes glow-pulse" in critical
+    assert "@keyframes unused" not in critical
+
+    plain = extract_critical_css("<html><body></body></html>", CSS)
+    assert plain == "body{margin:0}"
+
+
+def test_chunked_page_matches_whole_page():
+    """逐段产出的渲染结果（标签跨段）与完整页面的筛选结果相同"""
+    chunks = [DAILY_PAGE[i:i + 7] for i in range(0, len(DAILY_PAGE), 7)]
+    assert extract_critical_css(iter(chunks), CSS) == extract_critical_css(DAILY_PAGE, CSS)
+
+    whole, small = PageFeatures(frozenset({"data-theme"})), PageFeatures(frozenset({"data-theme"}), buffer_size=8)
+    whole.feed(DAILY_PAGE)
+    for chunk in chunks:
+        small.feed(chunk)
+    assert small.key() == whole.key()
+
+    other_theme = DAILY_PAGE.replace("purple", "blue")
+    critical = extract_critical_css(other_theme, CSS)
+    assert 'body[data-theme="blue"]' in critical and 'body[data-theme="purple"]' not in critical
+
+
+def test_stylesheet_tags():
+    """有关键 CSS 时内联并异步加载完整样式表，否则阻塞加载"""
+    assert stylesheet_tags("css/a.css") == '<link rel="stylesheet" href="css/a.css">'
+    tags = stylesheet_tags("css/a.css", "body{margin:0}")
+    assert tags.startswith("<style>body{margin:0}</style>")
+    assert 'rel="preload" href="css/a.css" as="style"' in tags
+    assert '<noscript><link rel="stylesheet" href="css/a.css"></noscript>' in tags
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+HTML 页面生成测试
+页面逐段渲染、压缩后写入文件流，验证输出与整体压缩一致、内容不变时不重写、超大日报内存占用不随条目数增长
+"""
+import sys
+import random
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.html_generator import HTMLGenerator, DAILY_TEMPLATE
+from src.minify import minify_html, minify_html_stream
+from benchmarks.synthetic import synthetic_result
+
+
+def test_stream_minify_matches_whole_page():
+    """write_daily_page 写出的页面与整体渲染后整体压缩的结果相同；任意切分、任意缓冲大小下逐段压缩也一致"""
+    generator = HTMLGenerator(tempfile.mkdtemp())
+    result = synthetic_result(8, 25)
+    path, _ = generator.write_daily_page(result)
+    html = "".join(generator._page_chunks(path, DAILY_TEMPLATE, **generator._daily_context(result)))
+    assert path.read_text(encoding="utf-8") == minify_html(html)
+
+    html = html.replace("<head>", "<head>\n<style>\n  a > b { color: red }\n</style>\n<pre>\n  keep\n</pre>\n", 1)
+    expected = minify_html(html)
+
+    rng = random.Random(7)
+    for buffer_size in (1, 64, 4096, 1 << 20):
+        cuts = sorted(rng.sample(range(len(html)), 300))
+        chunks = [html[a:b] for a, b in zip([0] + cuts, cuts + [len(html)])]
+        assert "".join(minify_html_stream(chunks, buffer_size=buffer_size)) == expected
+
+
+def test_streamed_page_skips_unchanged_rewrite():
+    """流式写入的页面内联当前主题的关键 CSS；内容不变时第二次不替换文件"""
+    output_dir = tempfile.mkdtemp()
+    generator = HTMLGenerator(output_dir)
+    result = synthetic_result(6, 9, theme="purple")
+
+    path, written = generator.write_daily_page(result)
+    assert written
+    html = path.read_text(encoding="utf-8")
+    assert html.startswith("<!DOCTYPE html>") and html.endswith("</html>")
+    assert 'body[data-theme="purple"]' in html and 'body[data-theme="blue"]' not in html
+    assert "资讯 5-8：Anthropic 发布 Claude 新版本" in html
+    assert "Agent 框架 &amp; 推理成本 &lt;下降&gt; 明显" in html
+    assert "https://example.com/2026-01-13/5/8?ref=bench&amp;id=8" in html
+
+    mtime = path.stat().st_mtime_ns
+    _, written = generator.write_daily_page(result)
+    assert not written
+    assert path.stat().st_mtime_ns == mtime
+    assert not list(Path(output_dir).glob(".*.tmp"))
+
+
+def test_large_digest_memory_flat():
+    """5 万条资讯的日报：页面超过 20MB，写入过程的峰值内存仍在几 MB 以内"""
+    generator = HTMLGenerator(tempfile.mkdtemp())
+    result = synthetic_result(8, 6250, tags=3, summary_chars=30)
+
+    tracemalloc.start()
+    try:
+        path, written = generator.write_daily_page(result)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    size = path.stat().st_size
+    assert written
+    assert size > 20 * 1024 * 1024
+    assert peak < 8 * 1024 * 1024, f"峰值内存 {peak / 1024 / 1024:.1f}MB"
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+卡片图片缓存测试
+缓存键覆盖全部请求参数和渲染后端；命中时跳过渲染并经构建清单写出图片；按最近使用时间淘汰
+"""
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src import card_renderer
+from src.build_manifest import get_build_manifest
+from src.card_renderer import CardRenderer
+from src.image_cache import ImageCache, image_cache_key
+from src.image_generator import ImageGenerator
+from test_card_renderer import FireflyStub, FONT, CARD
+
+REQUEST = {
+    "content": CARD,
+    "width": 480,
+    "height": 800,
+    "ratio": "3:4",
+    "padding": 24,
+    "fontScale": 1.0,
+    "temp": "tempBlackSun"
+}
+
+
+def test_key_covers_request_and_backend():
+    """任一参数或渲染后端变化时键不同；参数顺序不影响键"""
+    base = image_cache_key(REQUEST, "firefly:https://example.com")
+    assert image_cache_key(dict(reversed(list(REQUEST.items()))), "firefly:https://example.com") == base
+
+    changes = {
+        "content": CARD + "\n- 新资讯",
+        "width": 520,
+        "height": 900,
+        "ratio": "9:16",
+        "padding": 30,
+        "fontScale": 1.1,
+        "temp": "tempEasy"
+    }
+    keys = {base}
+    for field, value in changes.items():
+        keys.add(image_cache_key({**REQUEST, field: value}, "firefly:https://example.com"))
+    keys.add(image_cache_key(REQUEST, "local:DejaVuSans.ttf:2:1"))
+    assert len(keys) == len(changes) + 2
+
+
+def _generator(stub: FireflyStub, cache_dir: str) -> ImageGenerator:
+    generator = ImageGenerator(api_url=stub.url, backend="firefly")
+    generator.enabled = True
+    generator.cache = ImageCache(cache_dir, max_age_days=0, max_bytes=0)
+    return generator
+
+
+def test_firefly_miss_stores_and_hit_skips_request():
+    """未命中时调用 API 并写入缓存；命中时不再调用 API，图片经构建清单写到新的保存路径"""
+    stub = FireflyStub()
+    cache_dir, output_dir = tempfile.mkdtemp(), Path(tempfile.mkdtemp())
+    try:
+        generator = _generator(stub, cache_dir)
+        first = output_dir / "first.png"
+        assert generator.generate(CARD, output_path=str(first)) == str(first)
+        assert len(stub.bodies) == 1
+        assert [path.read_bytes() for path in Path(cache_dir).glob("*.png")] == [b"\x89PNGstub"]
+
+        second = output_dir / "second.png"
+        assert _generator(stub, cache_dir).generate(CARD, output_path=str(second)) == str(second)
+        assert len(stub.bodies) == 1
+        assert second.read_bytes() == b"\x89PNGstub"
+        assert second.resolve().as_posix() in get_build_manifest().changed
+    finally:
+        stub.close()
+
+
+def test_local_hit_skips_render():
+    """本地渲染未命中时渲染并写入缓存，命中时不再渲染"""
+    renders = []
+    original_font, original_render = card_renderer.find_cjk_font, CardRenderer.render
+
+    def counting_render(self, *args, **kwargs):
+        renders.append(args[0])
+        return original_render(self, *args, **kwargs)
+
+    card_renderer.find_cjk_font = lambda: FONT
+    CardRenderer.render = counting_render
+    try:
+        cache_dir, output_dir = tempfile.mkdtemp(), Path(tempfile.mkdtemp())
+        generator = ImageGenerator(backend="local")
+        generator.enabled = True
+        generator.cache = ImageCache(cache_dir, max_age_days=0, max_bytes=0)
+
+        generator.generate(CARD, output_path=str(output_dir / "a.png"))
+        generator.generate(CARD, output_path=str(output_dir / "b.png"))
+    finally:
+        card_renderer.find_cjk_font, CardRenderer.render = original_font, original_render
+
+    assert len(renders) == 1
+    assert (output_dir / "b.png").read_bytes() == (output_dir / "a.png").read_bytes()
+    assert len(list(Path(cache_dir).glob("*.png"))) == 1
+
+
+def _aged(cache: ImageCache, key: str, size: int, age_days: float):
+    """写入指定大小的图片并把最近使用时间设为 age_days 天前"""
+    path = cache.path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age_days * 86400
+    os.utime(path, (mtime, mtime))
+
+
+def test_evict_by_age():
+    """超过 max_age_days 未使用的图片被淘汰；命中会刷新使用时间"""
+    cache = ImageCache(tempfile.mkdtemp(), max_age_days=7, max_bytes=0)
+    _aged(cache, "old", 10, 8)
+    _aged(cache, "used", 10, 8)
+    _aged(cache, "recent", 10, 1)
+    assert cache.get("used") == b"x" * 10
+    assert cache.get("missing") is None
+
+    assert cache.evict() == 1
+    assert sorted(path.stem for path in cache.cache_dir.glob("*.png")) == ["recent", "used"]
+
+
+def test_evict_by_size_oldest_first():
+    """超出总大小上限时从最久未使用的开始淘汰，比被淘汰图片更旧的图片即使更小也一并淘汰"""
+    cache = ImageCache(tempfile.mkdtemp(), max_age_days=0, max_bytes=100)
+    _aged(cache, "newest", 50, 1)
+    _aged(cache, "middle", 60, 2)
+    _aged(cache, "oldest", 10, 3)
+
+    assert cache.evict() == 2
+    assert [path.stem for path in cache.cache_dir.glob("*.png")] == ["newest"]
+
+    cache.put("fresh", b"y" * 60)
+    assert sorted(path.stem for path in cache.cache_dir.glob("*.png")) == ["fresh"]
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
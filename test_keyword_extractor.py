@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+本地关键词与标签提取测试
+分析缓存中的历史标签加入别名词典，之后的资讯即使没有专有名词写法也能识别
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.analysis_cache import AnalysisCache
+from src.keyword_extractor import KeywordExtractor
+
+
+def test_fit_cache_learns_cached_tags():
+    """出现在多条历史资讯中的标签 Zorblax Engine 进入词典后，小写写法和中文正文中也能提取为标签"""
+    cache = AnalysisCache(tempfile.mkdtemp())
+    for i in range(2):
+        cache.put(
+            {"title": f"Zorblax Engine {i + 2} is out", "summary": "Zorblax Engine ships a new runtime.",
+             "link": f"https://example.com/{i}"},
+            {"category": "tools", "title": "Zorblax Engine 发布", "summary": "新的推理运行时", "tags": ["Zorblax Engine"]}
+        )
+    title, body = "zorblax engine 开放下载", "社区版的 zorblax engine 支持更多硬件"
+
+    assert "Zorblax Engine" not in KeywordExtractor().extract_tags(title, body)
+    extractor = KeywordExtractor().fit_cache(cache)
+    assert extractor.extract_tags(title, body)[0] == "Zorblax Engine"
+    assert extractor.doc_total == 2
+
+
+def test_fit_tag_threshold_and_limit():
+    """只出现在一条资讯中的标签不进入词典；学到的标签数有上限，按出现的资讯数保留"""
+    documents = [("text", ["Quuxbar", "Frobnik"]), ("text", ["quuxbar"]), ("text", ["Quuxbar", "Frobnik", "Once"])]
+    extractor = KeywordExtractor().fit(documents)
+    assert extractor.alias_map["quuxbar"] == "Quuxbar"
+    assert "frobnik" in extractor.alias_map
+    assert "once" not in extractor.alias_map
+
+    extractor = KeywordExtractor().fit(documents, max_tag_aliases=1)
+    assert "quuxbar" in extractor.alias_map and "frobnik" not in extractor.alias_map
+
+    builtin = len(KeywordExtractor().alias_map)
+    extractor = KeywordExtractor().fit([("text", [f"Tag{i}", "Claude"]) for i in range(1000)] * 2, max_tag_aliases=10)
+    assert len(extractor.alias_map) == builtin + 10
+
+
+def test_hyphen_is_not_word_boundary():
+    """连字符连接的词不匹配其中的实体，版本号后缀仍然匹配"""
+    extractor = KeywordExtractor()
+    assert extractor.match_entities("Advances in meta-learning and sub-agent design") == []
+    assert extractor.match_entities("Meta ships GPT-5 rival, gpt-4o and claude 4 compared") == [
+        "Meta", "GPT-5", "GPT-4o", "Claude 4"
+    ]
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+资源压缩测试
+CSS 只在声明块内压缩冒号两侧的空白，HTML 的原样元素不做改动，样式表文件名随内容指纹变化
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.html_generator import HTMLGenerator
+from src.minify import minify_css, minify_html, fingerprint
+
+
+def test_css_keeps_descendant_pseudo_selectors():
+    """选择器中冒号前的空白有含义（后代选择器），不能删除；声明中的空白照常删除"""
+    css = "div :first-child , .list  > li :hover {\n  color : red ;\n  margin: 0 auto;\n}"
+    assert minify_css(css) == "div :first-child,.list>li :hover{color:red;margin:0 auto}"
+
+
+def test_css_nested_blocks_and_at_rules():
+    """@media 内的规则、@font-face 和 @keyframes 的声明都被压缩，@media 条件中冒号后的空白删除"""
+    css = """
+    /* 注释 */
+    @media (max-width: 768px) { .card :first-child { padding: 8px; } }
+    @font-face { font-family: "Noto"; src: url(noto.woff2); }
+    @keyframes fade { from { opacity: 0; } to { opacity: 1 } }
+    .outer { color: red; & :hover { color: blue; } }
+    """
+    assert minify_css(css) == (
+        "@media (max-width:768px){.card :first-child{padding:8px}}"
+        '@font-face{font-family:"Noto";src:url(noto.woff2)}'
+        "@keyframes fade{from{opacity:0}to{opacity:1}}"
+        ".outer{color:red;& :hover{color:blue}}"
+    )
+
+
+def test_css_strings_untouched():
+    """字符串中的空白、冒号和注释符号原样保留"""
+    css = 'a[title="x : y"] :is(b) { content: "a :  b /* c */" ; }'
+    assert minify_css(css) == 'a[title="x : y"] :is(b){content:"a :  b /* c */"}'
+
+
+def test_html_preserves_raw_elements():
+    """pre、textarea 的内容（含缩进和换行）原样保留，其余标签之间的换行和缩进删除"""
+    html = (
+        "<div>\n    <p>段落</p>\n    <!-- 注释 -->\n"
+        "    <pre>\n  def f():\n      return 1\n</pre>\n"
+        "    <textarea name=\"t\">\n  第一行\n\n  第三行</textarea>\n</div>\n"
+    )
+    assert minify_html(html) == (
+        "<div><p>段落</p><pre>\n  def f():\n      return 1\n</pre>"
+        "<textarea name=\"t\">\n  第一行\n\n  第三行</textarea></div>"
+    )
+
+
+def test_html_keeps_inline_spaces():
+    """同一行内的空白保留（行内元素之间的空格影响显示）"""
+    assert minify_html("<p><b>粗体</b> <i>斜体</i></p>") == "<p><b>粗体</b> <i>斜体</i></p>"
+
+
+def test_stylesheet_fingerprint_naming():
+    """样式表文件名是压缩后内容的指纹；页面引用带指纹的文件名，并保留固定路径的副本"""
+    output_dir = Path(tempfile.mkdtemp())
+    generator = HTMLGenerator(str(output_dir))
+    generator.generate_css()
+
+    css = generator._get_minified_css()
+    assert generator.css_path == f"css/styles.{fingerprint(css)}.css"
+    assert len(fingerprint(css)) == 10 and fingerprint(css) != fingerprint(css + " ")
+    assert (output_dir / generator.css_path).read_text(encoding="utf-8") == css
+    assert (output_dir / "css" / "styles.css").read_text(encoding="utf-8") == css
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
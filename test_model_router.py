@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+模型分级路由测试
+默认所有阶段使用 CLAUDE_MODEL，快速模型需要通过 MODEL_ROUTING 显式启用
+"""
+import os
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.config import CLAUDE_MODEL, CLAUDE_FAST_MODEL
+from src.model_router import ModelRouter, parse_policy
+
+
+def test_default_policy_uses_large_model():
+    """默认策略下逐条分析、日级摘要和完整日报都使用大模型"""
+    router = ModelRouter.from_config(None if "MODEL_ROUTING" not in os.environ else "*=large")
+    for stage in ("entries", "daily_summary", "daily_report", "analyze"):
+        assert router.route(stage).model == CLAUDE_MODEL
+
+
+def test_fast_tier_opt_in():
+    """设置 entries=fast 后只有逐条分析使用快速模型"""
+    router = ModelRouter.from_config("entries=fast,*=large")
+    assert router.route("entries").model == CLAUDE_FAST_MODEL
+    assert router.route("daily_summary").model == CLAUDE_MODEL
+
+
+def test_unknown_tier_rejected():
+    """路由策略引用未定义的级别时报错，而不是静默回退"""
+    assert parse_policy(" entries = fast ,bad,*=large") == {"entries": "fast", "*": "large"}
+    try:
+        ModelRouter.from_config("entries=tiny")
+    except ValueError as e:
+        assert "tiny" in str(e)
+    else:
+        raise AssertionError("未定义的级别应报错")
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+本地预分类器测试
+只用分析缓存中由 LLM 给出的分类训练和评估，训练文本与预测时一致（标题、正文和链接）
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.analysis_cache import AnalysisCache
+from src.pre_classifier import PreClassifier, cache_samples, estimate_savings
+
+
+def entry(index: int, title: str, summary: str) -> dict:
+    return {"title": title, "summary": summary, "link": f"https://example.com/news/{index}"}
+
+
+def test_fit_cache_skips_self_labelled_entries():
+    """预分类器给出的分类不参与训练；LLM 给出的分类参与训练"""
+    cache = AnalysisCache(tempfile.mkdtemp())
+    for i in range(5):
+        cache.put(entry(i, f"Zorblax update {i}", "zorblax quuxification"), {"category": "funding"}, llm_labelled=False)
+    assert cache_samples(cache) == []
+
+    classifier = PreClassifier(use_seeds=False).fit_cache(cache)
+    assert sum(classifier.doc_counts.values()) == 0
+
+    for i in range(5, 10):
+        cache.put(entry(i, f"Zorblax update {i}", "zorblax quuxification"), {"category": "research"})
+    classifier = PreClassifier(use_seeds=False).fit_cache(cache)
+    assert classifier.doc_counts == {"research": 5}
+
+
+def test_fit_cache_trains_on_summary():
+    """只出现在正文中的词也会被学到，与预测时使用的字段一致"""
+    cache = AnalysisCache(tempfile.mkdtemp())
+    for i in range(6):
+        cache.put(entry(i, f"Weekly note {i}", "quuxification zorblax milestone"), {"category": "tools"})
+    cache.save()
+
+    classifier = PreClassifier().fit_cache(AnalysisCache(cache.cache_dir))
+    category, confidence = classifier.predict({"title": "Something", "summary": "quuxification zorblax"})
+    assert category == "tools" and confidence > 0.5
+
+
+def test_estimate_savings_uses_ledger_speed():
+    """节省的输出 token 按分类字段估算，延迟按 entries 阶段的生成速度换算"""
+    cache = AnalysisCache(tempfile.mkdtemp())
+    cache.put(entry(1, "a", "b"), {"category": "model", "title": "发布新模型", "summary": "一句话摘要"})
+    records = [
+        {"stage": "entries", "status": "ok", "output_tokens": 100, "latency_ms": 1200, "ttft_ms": 200},
+        {"stage": "daily_summary", "status": "ok", "output_tokens": 100, "latency_ms": 9000, "ttft_ms": 0},
+    ]
+    savings = estimate_savings(cache, coverage=0.5, records=records)
+    assert 0 < savings["category_tokens"] < savings["entry_tokens"]
+    assert savings["ms_per_token"] == 10.0
+    assert abs(savings["saved_ms_per_entry"] - savings["category_tokens"] * 0.5 * 10.0) < 1e-9
+    assert estimate_savings(cache, coverage=0.5)["saved_ms_per_entry"] is None
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+预压缩测试
+只压缩构建清单中本次变更的文本文件；跳过的文件不留下过期的压缩文件；按文件类型汇总大小
+"""
+import io
+import sys
+import gzip
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src import precompress as precompress_module
+from src.build_manifest import BuildManifest
+from src.precompress import precompress, precompress_changed, gzip_bytes, MIN_SIZE
+
+PAGE = ("<html><body>" + "<p>AI 资讯日报 · 模型发布与开源工具</p>" * 40 + "</body></html>").encode("utf-8")
+DATA = ('{"items": [' + ",".join('{"title": "资讯 %d"}' % i for i in range(40)) + "]}").encode("utf-8")
+
+
+def _site():
+    output_dir = Path(tempfile.mkdtemp())
+    return output_dir, BuildManifest(output_dir)
+
+
+def test_only_changed_text_files_compressed():
+    """只压缩清单中本次变更的文件；小于 MIN_SIZE 的文件和非文本类型跳过；.gz 解压后与源文件相同"""
+    output_dir, manifest = _site()
+    manifest.write(output_dir / "2026-01-13.html", PAGE)
+    manifest.write(output_dir / "api" / "index.json", DATA)
+    manifest.write(output_dir / "small.css", b"body{margin:0}")
+    manifest.write(output_dir / "images" / "card.png", b"\x89PNG" + bytes(MIN_SIZE * 4))
+    (output_dir / "untouched.html").write_bytes(PAGE)
+
+    with redirect_stdout(io.StringIO()):
+        totals = precompress(manifest, workers=2)
+
+    assert sorted(path.relative_to(output_dir).as_posix() for path in output_dir.rglob("*.gz")) == [
+        "2026-01-13.html.gz", "api/index.json.gz"
+    ]
+    assert gzip.decompress((output_dir / "2026-01-13.html.gz").read_bytes()) == PAGE
+    assert gzip.decompress((output_dir / "api" / "index.json.gz").read_bytes()) == DATA
+    assert sorted(totals) == [".html", ".json"]
+    assert "2026-01-13.html.gz" in manifest.changed
+
+
+def test_report_totals():
+    """按文件类型汇总文件数、原始大小和 gzip 后的大小，并输出节省比例"""
+    output_dir, manifest = _site()
+    pages = [PAGE, PAGE + b"<!-- 2 -->"]
+    for i, page in enumerate(pages):
+        manifest.write(output_dir / f"{i}.html", page)
+    manifest.write(output_dir / "feed.json", DATA)
+
+    out = io.StringIO()
+    with redirect_stdout(out):
+        totals = precompress(manifest)
+
+    assert totals[".html"]["files"] == 2
+    assert totals[".html"]["raw"] == sum(len(page) for page in pages)
+    assert totals[".html"]["gz"] == sum(len(gzip_bytes(page)) for page in pages)
+    assert (totals[".json"]["files"], totals[".json"]["raw"], totals[".json"]["gz"]) == (1, len(DATA), len(gzip_bytes(DATA)))
+    saving = round((1 - totals[".html"]["gz"] / totals[".html"]["raw"]) * 100)
+    assert "📦 预压缩: 3 个文件" in out.getvalue()
+    assert f"(-{saving}%)" in out.getvalue()
+
+
+def test_stale_siblings_removed():
+    """文件变小到 MIN_SIZE 以下或被删除时删除已有的 .gz/.br；未安装 brotli 时删除旧的 .br"""
+    output_dir, manifest = _site()
+    page = output_dir / "index.html"
+    manifest.write(page, PAGE)
+    (output_dir / "index.html.br").write_bytes(b"stale")
+    with redirect_stdout(io.StringIO()):
+        precompress(manifest)
+    assert (output_dir / "index.html.gz").exists()
+    assert (output_dir / "index.html.br").exists() == (precompress_module.brotli is not None)
+
+    manifest = BuildManifest(output_dir)
+    manifest.write(page, b"<html></html>")
+    (output_dir / "index.html.br").write_bytes(b"stale")
+    with redirect_stdout(io.StringIO()):
+        assert precompress(manifest) == {}
+    assert not (output_dir / "index.html.gz").exists()
+    assert not (output_dir / "index.html.br").exists()
+    assert "index.html.gz" in manifest.changed and "index.html.gz" not in manifest.hashes
+
+    (output_dir / "gone.json.gz").write_bytes(b"stale")
+    precompress(manifest, paths=[output_dir / "gone.json"])
+    assert not (output_dir / "gone.json.gz").exists()
+
+
+def test_missing_brotli_removes_br():
+    """未安装 brotli 时重新压缩的文件不保留旧的 .br"""
+    original = precompress_module.brotli
+    precompress_module.brotli = None
+    try:
+        output_dir, manifest = _site()
+        manifest.write(output_dir / "a.css", PAGE)
+        (output_dir / "a.css.br").write_bytes(b"stale")
+        with redirect_stdout(io.StringIO()):
+            totals = precompress(manifest)
+    finally:
+        precompress_module.brotli = original
+    assert totals[".css"]["br"] == 0
+    assert (output_dir / "a.css.gz").exists() and not (output_dir / "a.css.br").exists()
+
+
+def test_precompress_changed_follows_switch():
+    """precompress_changed 只在 ENABLE_PRECOMPRESS 开启时压缩清单中本次变更的文件"""
+    output_dir, manifest = _site()
+    manifest.write(output_dir / "index.html", PAGE)
+    original = precompress_module.ENABLE_PRECOMPRESS
+    try:
+        precompress_module.ENABLE_PRECOMPRESS = False
+        assert precompress_changed(manifest) is None
+        assert not (output_dir / "index.html.gz").exists()
+
+        precompress_module.ENABLE_PRECOMPRESS = True
+        with redirect_stdout(io.StringIO()):
+            assert precompress_changed(manifest)[".html"]["files"] == 1
+    finally:
+        precompress_module.ENABLE_PRECOMPRESS = original
+    assert (output_dir / "index.html.gz").exists()
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
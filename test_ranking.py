@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+资讯相关度排序测试
+BM25 查询词匹配（覆盖关键词过滤接受的资讯）、标题加权、来源权重和得分相同时的稳定排序
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.config import DEFAULT_KEYWORDS
+from src.ranking import BM25Ranker, source_weight
+from src.rss_fetcher import RSSFetcher
+
+BODY = "A long weekly roundup covering hardware, chips, datacenters and other industry news. " * 3
+
+
+def entry(title: str, summary: str = BODY, source: str = "", link: str = "") -> dict:
+    return {"title": title, "summary": summary, "source": source, "link": link}
+
+
+def test_matching_entries_rank_first():
+    """命中查询词的资讯排在前面，命中越多得分越高"""
+    ranker = BM25Ranker(["agent", "reasoning"])
+    entries = [
+        entry("Chip prices fall"),
+        entry("New agent framework released"),
+        entry("Agent benchmark for reasoning models"),
+    ]
+    assert [index for index, _ in ranker.rank(entries)] == [2, 1, 0]
+
+
+def test_title_match_outranks_body_match():
+    """同一个词出现在标题中比出现在正文中得分更高"""
+    ranker = BM25Ranker(["agent"])
+    entries = [
+        entry("Weekly roundup", BODY + " One item mentions an agent."),
+        entry("Agent toolkit", BODY),
+        entry("Chip prices fall"),
+    ]
+    scores = ranker.score(entries)
+    assert scores[1] > scores[0] > scores[2]
+
+
+def test_prefix_infix_and_cjk_terms():
+    """英文查询词在词首（含复数等变形）计 1，在单词中间按较低权重计；中文查询词按二元组直接匹配"""
+    ranker = BM25Ranker(["agent", "大模型"])
+    tf, _ = ranker.term_frequencies([
+        entry("Agents ship", ""), entry("Reagents shortage", ""), entry("国产大模型发布", ""), entry("Chip news", "")
+    ])
+    assert tf[0].sum() > tf[1].sum() > 0
+    assert tf[2].sum() > 0
+    assert tf[3].sum() == 0
+
+
+def test_entries_passing_keyword_filter_score_above_zero():
+    """通过关键词过滤的资讯（包括只在 RSS 标签中命中的）得分都大于 0"""
+    entries = [
+        entry("ChatGPT adds memory for all users"),
+        entry("LLMs are eating software"),
+        entry("GPT4 benchmarks"),
+        entry("New plugins and workflows for agents"),
+        entry("Model Context Protocol servers"),
+        {**entry("Weekly roundup"), "tags": [{"term": "Anthropic"}]},
+        entry("Chip prices fall"),
+    ]
+    filtered = RSSFetcher().filter_by_keywords(entries, DEFAULT_KEYWORDS)
+    assert len(filtered) == len(entries) - 1
+    assert BM25Ranker(DEFAULT_KEYWORDS).score(filtered).all()
+
+
+def test_source_weights():
+    """来源权重按来源名称或链接匹配，取最长的键，并乘到得分上"""
+    weights = {"example": 2.0, "blog.example": 0.5}
+    assert source_weight(entry("a", source="Example News"), weights) == 2.0
+    assert source_weight(entry("a", link="https://blog.example.com/post"), weights) == 0.5
+    assert source_weight(entry("a", source="Other"), weights) == 1.0
+
+    ranker = BM25Ranker(["agent"])
+    entries = [entry("Agent news", source="Other"), entry("Agent news", source="Example")]
+    assert [index for index, _ in ranker.rank(entries, source_weights=weights)] == [1, 0]
+
+
+def test_ties_keep_original_order_and_limit():
+    """没有命中查询词的资讯得分为 0，按来源权重、再按原有顺序排列；limit 截取前几条，空列表返回空结果"""
+    ranker = BM25Ranker(["agent"])
+    entries = [entry(f"Chip news {i}") for i in range(5)]
+    assert [index for index, _ in ranker.rank(entries, limit=3, source_weights={})] == [0, 1, 2]
+    assert not ranker.score(entries).any()
+
+    entries[3]["source"] = "Example"
+    ranked = ranker.rank(entries, source_weights={"example": 2.0})
+    assert [index for index, _ in ranked] == [3, 0, 1, 2, 4]
+    assert all(score == 0 for _, score in ranked)
+    assert ranker.rank([]) == []
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
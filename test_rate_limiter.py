@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+API 限流测试
+令牌桶按传入的时间点计算，不依赖真实时钟
+"""
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.rate_limiter import TokenBucket, RateLimiter
+
+
+def test_token_bucket_queues_callers():
+    """桶内余额足够时不等待；余额为负时依次排队，等待时间按回填速率计算"""
+    bucket = TokenBucket(60, per_seconds=60.0)
+    now = bucket.updated
+    assert bucket.reserve(50, now) == (0.0, 50)
+    assert bucket.reserve(10, now) == (0.0, 10)
+    assert bucket.reserve(5, now) == (5.0, 5)
+    assert bucket.reserve(5, now) == (10.0, 5)
+
+
+def test_token_bucket_refills_up_to_capacity():
+    """回填不超过容量；单次超过容量的请求按容量预占并返回实际预占数"""
+    bucket = TokenBucket(10, per_seconds=10.0)
+    now = bucket.updated
+    bucket.reserve(10, now)
+    bucket.reserve(0, now + 4)
+    assert bucket.tokens == 4
+    bucket.reserve(0, now + 100)
+    assert bucket.tokens == 10
+    assert bucket.reserve(1000, now + 100) == (0.0, 10)
+    assert bucket.tokens == 0
+
+
+def test_token_bucket_adjust():
+    """归还的令牌不超过容量，追扣可以让余额为负"""
+    bucket = TokenBucket(100)
+    bucket.adjust(50)
+    assert bucket.tokens == 100
+    bucket.adjust(-150)
+    assert bucket.tokens == -50
+
+
+def test_rate_limiter_rpm_and_tpm():
+    """请求数和 token 数分别限流，等待时间取两者的较大值"""
+    limiter = RateLimiter(rpm=2, tpm=600)
+    assert limiter.reserve(100) == (0.0, 100)
+    assert limiter.reserve(100) == (0.0, 100)
+    # 第三个请求：RPM 桶缺 1 个（30 秒），TPM 还有余额
+    assert abs(limiter.reserve(100)[0] - 30.0) < 0.1
+    # TPM 桶缺 200 个（20 秒），RPM 桶再缺 1 个（60 秒）
+    assert abs(limiter.reserve(500)[0] - 60.0) < 0.1
+
+
+def test_rate_limiter_settle():
+    """请求完成后按实际用量校正：预估偏高时归还，偏低时追扣"""
+    limiter = RateLimiter(rpm=0, tpm=1000)
+    assert limiter.requests is None
+    _, reserved = limiter.reserve(800)
+    limiter.settle(reserved, 300)
+    assert abs(limiter.tokens.tokens - 700) < 1
+    limiter.settle(100, 900)
+    assert abs(limiter.tokens.tokens - (-100)) < 1
+    assert limiter.reserve(100)[0] > 0
+
+    unlimited = RateLimiter(rpm=0, tpm=0)
+    unlimited.settle(100, 900)
+    assert unlimited.reserve(10 ** 9) == (0.0, 10 ** 9)
+
+
+def test_oversized_request_refunds_reserved_amount():
+    """超过 TPM 容量的请求按容量预占，校正时按实际预占数计算，不会归还从未扣除的令牌"""
+    limiter = RateLimiter(rpm=0, tpm=1000)
+    _, reserved = limiter.reserve(5000)
+    assert reserved == 1000
+    limiter.settle(reserved, 200)
+    assert abs(limiter.tokens.tokens - 800) < 1
+
+
+def test_acquire_waits_for_reservation():
+    """acquire 按 reserve 返回的时间等待"""
+    limiter = RateLimiter(rpm=600, tpm=0)
+    for _ in range(600):
+        limiter.reserve(0)
+    start = time.monotonic()
+    delay, reserved = asyncio.run(limiter.acquire(0))
+    assert 0 < delay <= 0.11 and reserved == 0
+    assert time.monotonic() - start >= delay * 0.9
+
+
+def test_acquire_cancelled_while_queued_releases():
+    """排队等待时被取消，归还预占的请求数和 token"""
+    limiter = RateLimiter(rpm=60, tpm=1000)
+    limiter.reserve(1000)
+
+    async def run():
+        task = asyncio.ensure_future(limiter.acquire(500))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    assert abs(limiter.tokens.tokens) < 1
+    assert abs(limiter.requests.tokens - 59) < 0.1
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+对冲请求测试
+直接用协程模拟主请求和备用请求，覆盖被取消、失败切换和落败请求的清理
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.retry import hedge_async
+
+
+def test_cancelled_primary_fails_over():
+    """主请求在阈值内被取消时切换到备用请求，不会在读取异常时抛出 CancelledError"""
+    reasons = []
+
+    async def primary():
+        raise asyncio.CancelledError()
+
+    async def secondary():
+        return "备用"
+
+    assert asyncio.run(hedge_async(primary, secondary, 1.0, reasons.append)) == "备用"
+    assert reasons == ["failed"]
+
+
+def test_cancelled_primary_reports_secondary_error():
+    """主请求被取消、备用请求失败时抛出备用请求的异常"""
+    async def primary():
+        raise asyncio.CancelledError()
+
+    async def secondary():
+        raise ValueError("备用失败")
+
+    try:
+        asyncio.run(hedge_async(primary, secondary, 1.0))
+    except ValueError as e:
+        assert str(e) == "备用失败"
+    else:
+        raise AssertionError("应抛出备用请求的异常")
+
+
+def test_primary_error_preferred_when_both_fail():
+    """两路都失败时抛出主请求的异常"""
+    async def primary():
+        await asyncio.sleep(0.05)
+        raise ValueError("主请求失败")
+
+    async def secondary():
+        raise KeyError("备用失败")
+
+    try:
+        asyncio.run(hedge_async(primary, secondary, 0.01))
+    except ValueError as e:
+        assert str(e) == "主请求失败"
+    else:
+        raise AssertionError("应抛出主请求的异常")
+
+
+def test_loser_cleanup_runs_before_return():
+    """备用请求胜出时，主请求被取消且其清理逻辑在 hedge_async 返回前执行完毕"""
+    cleaned = []
+
+    async def primary():
+        try:
+            await asyncio.sleep(10)
+        finally:
+            cleaned.append("主请求")
+
+    async def secondary():
+        return "备用"
+
+    async def run():
+        result = await hedge_async(primary, secondary, 0.01)
+        return result, list(cleaned)
+
+    assert asyncio.run(run()) == ("备用", ["主请求"])
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
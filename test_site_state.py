@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+站点增量状态测试
+搜索索引、归档索引、JSON 接口和订阅源都在已有文件的基础上逐天更新，
+验证多次运行（每次新建生成器、从磁盘读取上次的状态）之后历史仍然完整
+"""
+import sys
+import json
+import hashlib
+import tempfile
+from xml.dom import minidom
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.build_manifest import BuildManifest
+from src.html_generator import HTMLGenerator
+from src.archive_index import ArchiveIndex
+from src.site_api import SiteAPI
+from src.search_index import SearchIndex
+from src.result_archive import ResultArchive
+from src.rebuild import rebuild
+
+
+def day_result(date: str, title: str, keywords: list) -> dict:
+    """一天的分析结果（一个分类、一条资讯）"""
+    return {
+        "date": date,
+        "theme": "blue",
+        "summary": [f"{title} 的要点"],
+        "keywords": keywords,
+        "categories": [{
+            "key": "model",
+            "name": "模型发布",
+            "icon": "🤖",
+            "items": [{
+                "title": title,
+                "summary": f"{title} 的一句话摘要",
+                "url": f"https://example.com/{date}",
+                "tags": keywords
+            }]
+        }]
+    }
+
+
+def test_search_add_keeps_earlier_days():
+    """两次运行分别索引两天：两天都能搜到，共同的词命中两天，文档数为 2"""
+    output_dir = tempfile.mkdtemp()
+    SearchIndex(output_dir, BuildManifest(output_dir)).add(
+        day_result("2026-01-12", "Anthropic 发布 Claude 新版本", ["Claude", "OpenAI"])
+    )
+    index = SearchIndex(output_dir, BuildManifest(output_dir))
+    index.add(day_result("2026-01-13", "OpenAI 发布 GPT-5", ["GPT-5", "OpenAI"]))
+
+    assert index.meta()["docs"] == 2
+    assert index.search("claude") == ["2026-01-12"]
+    assert index.search("gpt-5") == ["2026-01-13"]
+    assert index.search("openai") == ["2026-01-13", "2026-01-12"]
+
+
+def test_rebuild_refuses_incomplete_archive():
+    """归档只剩一天（如 CI 未恢复 docs/data）时拒绝重建，已发布的历史不被覆盖"""
+    output_dir = tempfile.mkdtemp()
+    full_archive, partial_archive = ResultArchive(tempfile.mkdtemp()), ResultArchive(tempfile.mkdtemp())
+    for day in ("2026-01-11", "2026-01-12", "2026-01-13"):
+        full_archive.save(day_result(day, f"{day} 的资讯", ["Claude"]))
+    partial_archive.save(day_result("2026-01-13", "2026-01-13 的资讯", ["Claude"]))
+
+    assert rebuild(output_dir, str(full_archive.archive_dir), workers=1)["pages"] == 3
+    try:
+        rebuild(output_dir, str(partial_archive.archive_dir), workers=1)
+    except RuntimeError as e:
+        assert "少于站点索引" in str(e)
+    else:
+        raise AssertionError("归档不完整时应拒绝重建")
+    assert SearchIndex(output_dir).meta()["docs"] == 3
+    assert rebuild(output_dir, str(partial_archive.archive_dir), workers=1, force=True)["pages"] == 1
+
+
+def test_rebuild_records_changed_index_shard():
+    """修改一天的摘要后重建：当月索引分片进入变更列表，清单中的哈希与磁盘上的文件一致"""
+    output_dir = tempfile.mkdtemp()
+    archive = ResultArchive(tempfile.mkdtemp())
+    for day in ("2026-01-12", "2026-01-13"):
+        archive.save(day_result(day, f"{day} 的资讯", ["Claude"]))
+    rebuild(output_dir, str(archive.archive_dir), workers=1)
+
+    archive.save(day_result("2026-01-13", "改写后的资讯", ["Claude"]))
+    rebuild(output_dir, str(archive.archive_dir), workers=1)
+
+    changed = (Path(output_dir) / ".changed_files.txt").read_text(encoding="utf-8").split()
+    assert "index/2026-01.json" in changed
+    shard = (Path(output_dir) / "index" / "2026-01.json").read_bytes()
+    assert "改写后的资讯" in shard.decode("utf-8")
+    assert BuildManifest(output_dir).hashes["index/2026-01.json"] == hashlib.sha256(shard).hexdigest()
+
+
+def test_archive_index_across_months():
+    """跨月的两次运行：两个月都在月份列表和各自的分片中，相邻月份页互相链接"""
+    output_dir = tempfile.mkdtemp()
+    for day in ("2026-01-31", "2026-02-01"):
+        HTMLGenerator(output_dir).update_index(day, day_result(day, f"{day} 的资讯", ["Claude"]))
+
+    index = ArchiveIndex(output_dir, BuildManifest(output_dir))
+    assert index.months() == [{"month": "2026-02", "count": 1}, {"month": "2026-01", "count": 1}]
+    assert [e["date"] for e in index.load_shard("2026-01")] == ["2026-01-31"]
+    assert index.neighbors("2026-02") == {"newer": None, "older": "2026-01"}
+    january = (Path(output_dir) / "archive" / "2026" / "01.html").read_text(encoding="utf-8")
+    assert "2026-01-31" in january and "02.html" in january
+
+
+def test_sync_with_archive_restores_missing_state():
+    """输出目录为空（站点状态没有恢复）而归档有历史时，按归档重建索引、搜索和接口"""
+    output_dir = tempfile.mkdtemp()
+    archive = ResultArchive(Path(output_dir) / "data")
+    for day in ("2026-01-30", "2026-01-31", "2026-02-01"):
+        archive.save(day_result(day, f"{day} 的资讯", ["Claude"]))
+
+    generator = HTMLGenerator(output_dir)
+    assert generator.sync_with_archive(archive, pending="2026-02-01")
+    assert sum(m["count"] for m in generator.archive_index.months()) == 3
+    assert generator.search_index.meta()["docs"] == 3
+    assert len(generator.site_api.months()) == 2
+    # 状态完整后不再重建
+    generator.update_index("2026-02-02", day_result("2026-02-02", "新的一天", ["GPT-5"]))
+    assert not HTMLGenerator(output_dir).sync_with_archive(archive, pending="2026-02-02")
+
+
+def test_site_api_and_feeds_across_days():
+    """三次运行各发布一天：清单、月分页和两个 feed 都包含之前的日期；重复发布同一天不改 updated"""
+    output_dir = tempfile.mkdtemp()
+    days = ("2026-01-30", "2026-01-31", "2026-02-01")
+    for day in days:
+        SiteAPI(output_dir, BuildManifest(output_dir), base_url="https://example.com", feed_size=2).add(
+            day_result(day, f"{day} 的资讯", ["Claude"])
+        )
+
+    api_dir = Path(output_dir) / "api"
+    index = json.loads((api_dir / "index.json").read_text(encoding="utf-8"))
+    assert index["total"] == 3
+    assert [(m["month"], m["count"]) for m in index["months"]] == [("2026-02", 1), ("2026-01", 2)]
+    january = json.loads((api_dir / "months" / "2026-01.json").read_text(encoding="utf-8"))
+    assert [d["date"] for d in january["days"]] == ["2026-01-31", "2026-01-30"]
+
+    feed = json.loads((Path(output_dir) / "feed.json").read_text(encoding="utf-8"))
+    assert [item["id"] for item in feed["items"]] == ["urn:ai-daily:2026-02-01", "urn:ai-daily:2026-01-31"]
+    atom = minidom.parse(str(Path(output_dir) / "feed.xml"))
+    assert [e.firstChild.data for e in atom.getElementsByTagName("id")][1:] == [item["id"] for item in feed["items"]]
+
+    updated = json.loads((api_dir / "2026-01-31.json").read_text(encoding="utf-8"))["updated"]
+    SiteAPI(output_dir, BuildManifest(output_dir), base_url="https://example.com", feed_size=2).add(
+        day_result("2026-01-31", "2026-01-31 的资讯", ["Claude"])
+    )
+    assert json.loads((api_dir / "2026-01-31.json").read_text(encoding="utf-8"))["updated"] == updated
+    assert json.loads((api_dir / "index.json").read_text(encoding="utf-8"))["total"] == 3
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+并发阶段执行测试
+覆盖正常完成、异常、超时，以及超时阶段在保存构建清单前被等待结束
+"""
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.build_manifest import BuildManifest
+from src.stage_runner import run_stages, join_timed_out
+
+
+def test_stages_run_concurrently():
+    """各阶段并发执行，总耗时接近最慢的阶段，返回值按阶段记录"""
+    start = time.perf_counter()
+    results = run_stages({
+        "a": (lambda: time.sleep(0.2) or "a", 5.0),
+        "b": (lambda: time.sleep(0.2) or "b", 5.0),
+    })
+    assert time.perf_counter() - start < 0.35
+    assert [(r.status, r.value) for r in results.values()] == [("ok", "a"), ("ok", "b")]
+    assert all(r.thread is None for r in results.values())
+
+
+def test_exception_only_fails_its_stage():
+    """阶段抛出的异常记录在该阶段的结果中，其他阶段正常完成"""
+    def broken():
+        raise ValueError("渲染失败")
+
+    results = run_stages({"broken": (broken, 5.0), "fine": (lambda: 1, 5.0)})
+    assert results["broken"].status == "error" and results["broken"].error == "渲染失败"
+    assert results["fine"].status == "ok" and results["fine"].value == 1
+
+
+def test_timeout_returns_without_waiting():
+    """超时的阶段不再等待，结果带有仍在运行的线程"""
+    release = threading.Event()
+    start = time.perf_counter()
+    results = run_stages({"slow": (release.wait, 0.1), "fast": (lambda: None, 5.0)})
+    assert time.perf_counter() - start < 1.0
+    assert results["slow"].status == "timeout"
+    assert results["slow"].thread.is_alive()
+    assert results["fast"].status == "ok"
+
+    assert join_timed_out(results, timeout=0.05) == ["slow"]
+    release.set()
+    assert join_timed_out(results) == []
+
+
+def test_late_write_lands_before_manifest_save():
+    """超时后才写入的图片，在等待超时阶段结束后保存构建清单时出现在变更列表中"""
+    output_dir = tempfile.mkdtemp()
+    manifest = BuildManifest(output_dir)
+
+    def slow_image():
+        time.sleep(0.3)
+        manifest.write(Path(output_dir) / "images" / "2026-01-13.png", b"png")
+
+    results = run_stages({"分享卡片": (slow_image, 0.05), "邮件通知": (lambda: None, 5.0)})
+    assert results["分享卡片"].status == "timeout"
+    assert join_timed_out(results, ["分享卡片", "不存在的阶段"]) == []
+    assert "images/2026-01-13.png" in manifest.save()
+
+
+def test_hung_stage_does_not_block_manifest_save():
+    """永不结束的图片阶段只等待给定的时间，构建清单照常保存，其图片不在变更列表中"""
+    output_dir = tempfile.mkdtemp()
+    manifest = BuildManifest(output_dir)
+    manifest.write(Path(output_dir) / "2026-01-13.html", "<html></html>")
+    never = threading.Event()
+
+    def hung_image():
+        never.wait()
+        manifest.write(Path(output_dir) / "images" / "2026-01-13.png", b"png")
+
+    results = run_stages({"分享卡片": (hung_image, 0.05)})
+    start = time.perf_counter()
+    assert join_timed_out(results, ["分享卡片"], timeout=0.1) == ["分享卡片"]
+    assert time.perf_counter() - start < 1.0
+    assert manifest.save() == ["2026-01-13.html"]
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+模板引擎测试
+覆盖转义、for/if/set 语法、语法错误、单独占一行的标签去除空白，以及逐段渲染
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.template_engine import Template, TemplateError, Markup, escape
+
+
+def test_autoescape_safe_and_markup():
+    """输出默认转义；|safe 和 Markup 原样输出；None 输出为空字符串"""
+    template = Template("<p title=\"{{ title }}\">{{ body|safe }}{{ trusted }}{{ missing }}</p>")
+    html = template.render(title="\"A\" & <B>", body="<b>粗体</b>", trusted=Markup("<i>斜体</i>"))
+    assert html == "<p title=\"&quot;A&quot; &amp; &lt;B&gt;\"><b>粗体</b><i>斜体</i></p>"
+    assert escape(Markup("<br>")) == "<br>"
+    assert escape(None) == ""
+
+
+def test_for_if_set():
+    """for 支持元组目标，if/elif/else 分支，set 赋值；读取后重新赋值的上下文变量先取上下文的值"""
+    template = Template(
+        "{% for name, score in items %}"
+        "{% if score > 80 %}{{ name }}:优{% elif score > 60 %}{{ name }}:良{% else %}{{ name }}:差{% endif %};"
+        "{% endfor %}"
+        "{% set total = len(items) %}{{ total }}"
+    )
+    assert template.render(items=[("a", 90), ("b", 70), ("c", 10)]) == "a:优;b:良;c:差;3"
+
+    assert Template("{{ x }}{% set x = x + 1 %}{{ x }}").render(x=1) == "12"
+    assert Template("{% set max = 1 %}{{ max }}").render() == "1"
+    assert Template("{{ max(a, b) }}").render(a=1, b=2) == "2"
+
+
+def test_syntax_errors():
+    """未闭合的块、多余的结束标签、不在 if 内的 else、未知标签和表达式语法错误都抛出 TemplateError"""
+    for source in (
+        "{% for i in items %}{{ i }}",
+        "{% if a %}x{% endfor %}",
+        "{% endif %}",
+        "{% else %}",
+        "{% while a %}",
+        "{% for i items %}{% endfor %}",
+        "{% set x %}",
+        "{{ a + }}",
+    ):
+        with pytest.raises(TemplateError):
+            Template(source)
+
+
+def test_line_tags_strip_whitespace():
+    """单独占一行的标签连同缩进和换行一起去掉；与其他内容同行的标签只替换标签本身"""
+    template = Template("<ul>\n  {% for i in items %}\n  <li>{{ i }}</li>\n  {% endfor %}\n</ul>\n")
+    assert template.render(items=[1, 2]) == "<ul>\n  <li>1</li>\n  <li>2</li>\n</ul>\n"
+
+    assert Template("{% if a %} x\n{% endif %}\n").render(a=True) == " x\n"
+    assert Template("{% if a %} x\n{% endif %}\n").render(a=False) == ""
+    assert Template("  {% if a %}\ny\n  {% endif %}").render(a=True) == "y\n"
+
+
+def test_inline_tags_at_line_start():
+    """行首的行内标签不会延伸到后面的标签或下一行"""
+    assert Template("{% for i in items %}{{ i }}{% endfor %}").render(items=[1, 2]) == "12"
+    assert Template("{% if a %}y{% endif %}").render(a=True) == "y"
+    assert Template("{% if a %}y{% endif %}\n{% if b %}z{% endif %}\n").render(a=True, b=False) == "y\n\n"
+
+
+def test_render_iter_chunks():
+    """render_iter 逐段产出，拼接结果与 render 相同；循环体每次迭代单独产出"""
+    template = Template("<ul>{% for i in items %}<li>{{ i }}</li>{% endfor %}</ul>")
+    chunks = list(template.render_iter(items=["a", "b"]))
+    assert chunks == ["<ul>", "<li>", "a", "</li>", "<li>", "b", "</li>", "</ul>"]
+    assert "".join(chunks) == template.render(items=["a", "b"])
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
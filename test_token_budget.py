@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+输入 token 预算测试
+本地 token 估算、按句子边界截断，以及按预算挑选资讯和分配摘录长度
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.token_budget import estimate_tokens, truncate_to_tokens, pack_entries
+
+LONG_TEXT = "Agents now plan multi-step tasks. " * 40
+
+
+def test_estimate_tokens_cjk_and_ascii():
+    """中日韩字符每字 1 个 token，ASCII 每 4 个字符 1 个 token，其他字符按 0.5 计，向上取整"""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a") == 1
+    assert estimate_tokens("abcd" * 10) == 10
+    assert estimate_tokens("大模型发布") == 5
+    assert estimate_tokens("の한") == 2
+    assert estimate_tokens("新模型 released") == 3 + 3
+    assert estimate_tokens("é") == 1
+    assert estimate_tokens("éé") == 1
+
+
+def test_truncate_to_tokens():
+    """未超出预算时原样返回；超出时不超过预算，尽量在句子结尾截断并加省略号"""
+    assert truncate_to_tokens("短文本", 10) == "短文本"
+    assert truncate_to_tokens("任意文本", 0) == ""
+
+    truncated = truncate_to_tokens(LONG_TEXT, 30)
+    assert estimate_tokens(truncated) <= 30
+    assert truncated.endswith("tasks.…")
+
+    cjk = truncate_to_tokens("第一句话。第二句话。第三句话。", 12)
+    assert cjk == "第一句话。第二句话。…"
+    assert estimate_tokens(cjk) <= 12
+
+
+def test_pack_entries_respects_budget():
+    """总占用不超过预算，按得分从高到低收录，预算不足以收录的低分资讯被舍弃"""
+    entries = [{"title": f"News {i}", "summary": LONG_TEXT} for i in range(10)]
+    scores = [float(i) for i in range(10)]
+    packed = pack_entries(entries, scores, budget=600, min_excerpt=40, max_excerpt=200)
+
+    assert sum(item["tokens"] for item in packed) <= 600
+    assert [item["index"] for item in packed] == sorted((item["index"] for item in packed), reverse=True)
+    assert packed[0]["index"] == 9
+    assert 0 < len(packed) < 10
+    assert all(estimate_tokens(item["excerpt"]) <= 200 for item in packed)
+
+
+def test_pack_entries_max_entries_and_excerpt_growth():
+    """max_entries 限制收录条数，剩余预算用于延长高分资讯的摘录"""
+    entries = [{"title": f"News {i}", "summary": LONG_TEXT} for i in range(5)]
+    scores = [1.0, 5.0, 2.0, 4.0, 3.0]
+    packed = pack_entries(entries, scores, budget=2000, max_entries=2, min_excerpt=40, max_excerpt=200)
+
+    assert [item["index"] for item in packed] == [1, 3]
+    assert all(estimate_tokens(item["excerpt"]) > 40 for item in packed)
+
+
+def test_pack_entries_short_summary_and_header_tokens():
+    """摘要短于最短摘录时按实际长度计；header_tokens 超出预算的资讯不收录"""
+    entries = [{"title": "a", "summary": "短摘要"}, {"title": "b", "summary": LONG_TEXT}]
+    packed = pack_entries(entries, [2.0, 1.0], budget=100, header_tokens=[10, 200], min_excerpt=40, max_excerpt=200)
+    assert packed == [{"index": 0, "excerpt": "短摘要", "tokens": 13}]
+
+
+def test_pack_entries_zero_relevance_fills_remaining_budget():
+    """得分为 0 的资讯排在最后，用剩余的预算和条数按原有顺序收录"""
+    entries = [{"title": f"News {i}", "summary": LONG_TEXT} for i in range(4)]
+    packed = pack_entries(entries, [2.0, 0.0, 1.0, 0.0], budget=10000, min_excerpt=40, max_excerpt=200)
+    assert [item["index"] for item in packed] == [0, 2, 1, 3]
+    assert [item["index"] for item in pack_entries(entries, [0.0] * 4, budget=10000)] == [0, 1, 2, 3]
+
+    # 条数上限先留给有得分的资讯
+    packed = pack_entries(entries, [0.0, 0.0, 1.0, 0.0], budget=10000, max_entries=2, min_excerpt=40, max_excerpt=200)
+    assert [item["index"] for item in packed] == [2, 0]
+
+
+
+def test_pack_entries_prepares_only_packed_entries():
+    """prepare 只对轮到收录的资讯调用，摘录取自 prepare 返回的文本"""
+    entries = [{"title": f"News {i}", "summary": LONG_TEXT} for i in range(200)]
+    scores = [float(i + 1) for i in range(200)]
+    prepared = []
+
+    def prepare(i):
+        prepared.append(i)
+        return "Compressed summary."
+
+    packed = pack_entries(entries, scores, budget=2000, max_entries=3, min_excerpt=40, max_excerpt=200, prepare=prepare)
+    assert [item["index"] for item in packed] == [199, 198, 197]
+    assert sorted(prepared) == [197, 198, 199]
+    assert all(item["excerpt"] == "Compressed summary." for item in packed)
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")